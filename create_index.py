@@ -1,15 +1,31 @@
-from utils import load_documents, split_texts, create_embeddings, create_vectorstore
-
-def main():
-    directory = 'readme_files'
-    documents = load_documents(directory)
-    texts = [doc['text'] for doc in documents]
-    chunks = split_texts(texts)
-    embeddings = create_embeddings(chunks)
-    vectorstore = create_vectorstore(embeddings, chunks)
-    faiss.write_index(vectorstore.index, 'readme_index.faiss')
-    with open('chunks.npy', 'wb') as f:
-        np.save(f, chunks)
+from loaders.document_loaders import LOADERS_BY_EXTENSION, load_file, get_document_text
+from loaders.text_splitters import split_texts_recursive
+from embeddings.embedding_models import create_embeddings
+from vectorstores.incremental_index import update_index
+from utils.config import get_huggingface_api_key
+
+# Recorded in the manifest; changing it re-embeds every file.
+EMBEDDING_MODEL = 'sentence-transformers/all-mpnet-base-v2'
+
+def chunk_file(path):
+    texts = [get_document_text(doc) for doc in load_file(path)]
+    return split_texts_recursive(texts)
+
+def main(directory='readme_files', index_dir='readme_index'):
+    api_key = get_huggingface_api_key()
+    index, report = update_index(
+        directory,
+        index_dir,
+        chunk_file=chunk_file,
+        embed_fn=lambda chunks: create_embeddings(chunks, api_key=api_key),
+        embedding_model=EMBEDDING_MODEL,
+        extensions=set(LOADERS_BY_EXTENSION),
+    )
+    print(
+        f"{report['added']} added, {report['modified']} modified, {report['deleted']} deleted, "
+        f"{report['unchanged']} unchanged files; embedded {report['chunks_embedded']} chunks"
+    )
+    return index
 
 if __name__ == "__main__":
     main()
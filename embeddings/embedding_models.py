@@ -4,4 +4,20 @@ from langchain.embeddings import HuggingFaceEmbeddings
 def create_embeddings(texts, api_key):
     tokenizer = HuggingFaceEmbeddings(api_key=api_key)
     embeddings = [tokenizer.embed(text) for text in texts]
-    return np.array(embeddings)
+    # float32 halves the memory of NumPy's float64 default; see vectorstores.quantization for smaller storage.
+    return np.array(embeddings, dtype=np.float32)
+
+def iter_embeddings(chunk_batches, api_key):
+    """
+    Embed a stream of chunk batches, loading the embedding model once.
+
+    Args:
+        chunk_batches (iterable of list of str): Batches of text chunks.
+        api_key (str): Hugging Face API key.
+
+    Yields:
+        tuple: (chunks, embeddings) for each batch, where embeddings is an np.ndarray.
+    """
+    tokenizer = HuggingFaceEmbeddings(api_key=api_key)
+    for chunks in chunk_batches:
+        yield chunks, np.array([tokenizer.embed(text) for text in chunks], dtype=np.float32)
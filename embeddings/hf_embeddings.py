@@ -1,8 +1,8 @@
 #pip install transformers torch
 
 import numpy as np
-import torch
-from transformers import AutoTokenizer, AutoModel
+from utils.lazy_imports import get_backend
+from embeddings.tokenizer_service import encode_for_model
 
 def create_hf_minilm_embeddings(texts):
     """
@@ -25,11 +25,10 @@ def create_hf_minilm_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 'sentence-transformers/all-MiniLM-L6-v2'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -55,11 +54,10 @@ def create_hf_bert_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 'bert-base-uncased'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -85,11 +83,10 @@ def create_hf_roberta_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 'roberta-base'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -115,11 +112,10 @@ def create_hf_distilbert_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 'distilbert-base-uncased'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -144,11 +140,10 @@ def create_hf_t5_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 't5-base'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -174,11 +169,10 @@ def create_hf_gpt2_embeddings(texts):
     np.ndarray: Array of embeddings.
     """
     model_name = 'gpt2'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    tokens = encode_for_model(texts, model_name)
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
 
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
+    with get_backend("torch").no_grad():
         embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
     
     return np.array(embeddings)
@@ -1,7 +1,8 @@
 #pip install transformers torch
+from functools import lru_cache
 import numpy as np
-import torch
-from transformers import AutoTokenizer, AutoModel
+from utils.lazy_imports import get_backend
+from embeddings.tokenizer_service import encode_for_model
 
 """
 Local Embeddings
@@ -24,6 +25,47 @@ Use Cases:
 - Applications with strict data privacy requirements.
 """
 
+@lru_cache(maxsize=None)
+def get_model(model_name):
+    """
+    Return the cached model for a model name, loading it on first use.
+
+    Callers such as the semantic splitter embed in many small batches, so the
+    weights are loaded once per process instead of once per call.
+
+    Args:
+        model_name (str): Hugging Face model name, e.g. 'bert-base-uncased'.
+
+    Returns:
+        transformers.PreTrainedModel: The model, in evaluation mode.
+    """
+    model = get_backend("transformers").AutoModel.from_pretrained(model_name)
+    model.eval()
+    return model
+
+def mean_pooled_embeddings(texts, model_name):
+    """
+    Embed texts as the mean of their token states, ignoring padding.
+
+    Padding positions are masked out of the mean, so a text gets the same vector
+    whichever batch it is embedded in and however long the other texts are.
+
+    Args:
+        texts (list of str): List of texts to embed.
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        np.ndarray: Array of embeddings of shape (len(texts), hidden size).
+    """
+    torch = get_backend("torch")
+    tokens = encode_for_model(texts, model_name)
+    model = get_model(model_name)
+    with torch.no_grad():
+        hidden = model(**tokens).last_hidden_state
+        mask = tokens["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    return np.asarray(embeddings.numpy(), dtype=np.float32)
+
 def create_local_minilm_embeddings(texts):
     """
     Creates embeddings using the local 'all-MiniLM-L6-v2' model.
@@ -44,15 +86,7 @@ def create_local_minilm_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 'sentence-transformers/all-MiniLM-L6-v2'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 'sentence-transformers/all-MiniLM-L6-v2')
 
 def create_local_bert_embeddings(texts):
     """
@@ -74,15 +108,7 @@ def create_local_bert_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 'bert-base-uncased'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 'bert-base-uncased')
 
 def create_local_roberta_embeddings(texts):
     """
@@ -104,15 +130,7 @@ def create_local_roberta_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 'roberta-base'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 'roberta-base')
 
 def create_local_distilbert_embeddings(texts):
     """
@@ -134,15 +152,7 @@ def create_local_distilbert_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 'distilbert-base-uncased'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 'distilbert-base-uncased')
 
 def create_local_t5_embeddings(texts):
     """
@@ -163,15 +173,7 @@ def create_local_t5_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 't5-base'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 't5-base')
 
 def create_local_gpt2_embeddings(texts):
     """
@@ -193,12 +195,4 @@ def create_local_gpt2_embeddings(texts):
     Returns:
     np.ndarray: Array of embeddings.
     """
-    model_name = 'gpt2'
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
-
-    tokens = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
-    with torch.no_grad():
-        embeddings = model(**tokens).last_hidden_state.mean(dim=1).numpy()
-    
-    return np.array(embeddings)
+    return mean_pooled_embeddings(texts, 'gpt2')
@@ -0,0 +1,140 @@
+"""
+Cached fast tokenizers with batched token counting.
+
+One Rust-backed (fast) tokenizer is loaded per model and reused for every call,
+so token counting, offset encoding and token-aware splitting never reload a
+tokenizer. Batched calls let the tokenizer parallelize across texts.
+
+This lives in `embeddings` rather than the top-level `tokenizers` directory
+because that directory name is shadowed by the Hugging Face `tokenizers`
+package that transformers depends on.
+"""
+
+import warnings
+from functools import lru_cache
+import numpy as np
+from utils.lazy_imports import get_backend
+
+# Models whose configs report no usable maximum length.
+_DEFAULT_MAX_LENGTH = 512
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name):
+    """
+    Return the cached fast tokenizer for a model, loading it on first use.
+
+    Args:
+        model_name (str): Hugging Face model name, e.g. 'bert-base-uncased'.
+
+    Returns:
+        tokenizer (transformers.PreTrainedTokenizerFast): The fast tokenizer.
+    """
+    tokenizer = get_backend("transformers").AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    if not tokenizer.is_fast:
+        raise ValueError(f"No fast tokenizer is available for {model_name}.")
+    return tokenizer
+
+def max_tokens(model_name):
+    """
+    Return the number of content tokens that fit in one model input.
+
+    Args:
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        int: Maximum sequence length minus the special tokens the model adds.
+    """
+    tokenizer = get_tokenizer(model_name)
+    max_length = tokenizer.model_max_length
+    if not max_length or max_length > 1_000_000:
+        max_length = _DEFAULT_MAX_LENGTH
+    return max_length - tokenizer.num_special_tokens_to_add()
+
+def count_tokens(texts, model_name):
+    """
+    Count the content tokens of each text in one batched call.
+
+    Args:
+        texts (list of str): Texts to count.
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        np.ndarray: Token count of each text, excluding special tokens.
+    """
+    if not texts:
+        return np.zeros(0, dtype=np.int64)
+    encodings = get_tokenizer(model_name)(list(texts), add_special_tokens=False)["input_ids"]
+    return np.fromiter((len(ids) for ids in encodings), dtype=np.int64, count=len(texts))
+
+def encode_offsets(texts, model_name):
+    """
+    Encode texts in one batched call and return the character offsets of every token.
+
+    Args:
+        texts (list of str): Texts to encode.
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        list of np.ndarray: For each text, an array of shape (num_tokens, 2) with the
+            (start, end) character offsets of each token, excluding special tokens.
+    """
+    if not texts:
+        return []
+    encodings = get_tokenizer(model_name)(list(texts), add_special_tokens=False, return_offsets_mapping=True)
+    return [np.asarray(offsets, dtype=np.int64).reshape(-1, 2) for offsets in encodings["offset_mapping"]]
+
+def _warn_truncated(too_long, total, model_name):
+    """
+    Warn that the texts at indices `too_long` exceed the model's input length.
+    """
+    if len(too_long):
+        warnings.warn(
+            f"{len(too_long)} of {total} texts exceed the {max_tokens(model_name)}-token limit of {model_name} "
+            f"and will be truncated; split them with split_texts_model_tokens first."
+        )
+
+def warn_if_truncated(texts, model_name):
+    """
+    Warn when any text exceeds the model's input length and would be truncated.
+
+    This tokenizes the texts; embedders use encode_for_model, which checks the
+    lengths as part of the tokenization they need anyway.
+
+    Args:
+        texts (list of str): Texts about to be embedded.
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        np.ndarray: Indices of the texts that exceed the limit.
+    """
+    too_long = np.flatnonzero(count_tokens(texts, model_name) > max_tokens(model_name))
+    _warn_truncated(too_long, len(texts), model_name)
+    return too_long
+
+def encode_for_model(texts, model_name):
+    """
+    Tokenize texts into padded, truncated model inputs, warning about truncated texts.
+
+    The tokenizer returns the part of an over-length text that does not fit as
+    extra overflow rows, so truncation is detected from the same call that
+    builds the inputs instead of a second tokenizer pass. Only the first row of
+    each text is kept, which is the truncated encoding.
+
+    Args:
+        texts (list of str): Texts to embed.
+        model_name (str): Hugging Face model name.
+
+    Returns:
+        dict: Model inputs ("input_ids", "attention_mask", ...) as torch tensors,
+            one row per text.
+    """
+    tokenizer = get_tokenizer(model_name)
+    tokens = tokenizer(
+        list(texts), padding=True, truncation=True, return_overflowing_tokens=True, return_tensors="pt",
+        max_length=max_tokens(model_name) + tokenizer.num_special_tokens_to_add(),
+    )
+    sample_of_row = np.asarray(tokens.pop("overflow_to_sample_mapping"))
+    _, first_rows, rows_per_text = np.unique(sample_of_row, return_index=True, return_counts=True)
+    _warn_truncated(np.flatnonzero(rows_per_text > 1), len(texts), model_name)
+    first_rows = first_rows.tolist()
+    return {name: values[first_rows] for name, values in tokens.items()}
@@ -5,5 +5,22 @@ from .document_loaders import (
     load_markdown,
     load_html,
     load_word,
-    load_excel
+    load_excel,
+    load_csv,
+    load_file,
+    load_documents_parallel,
+    iter_documents_parallel,
+    iter_documents,
+    get_document_text,
+    get_document_metadata
 )
+from .pdf_extraction import extract_pdf, iter_pdf_pages
+from .spreadsheet_loaders import iter_spreadsheet_documents, iter_excel_documents, iter_csv_documents
+from .deduplication import deduplicate_documents, minhash_signatures, prediction_text, date_bucket
+from .splitter_engine import detect_boundaries, split_texts_multi
+from .chunk_spans import ChunkSpans
+from .text_splitters import split_texts_spans
+from .text_splitters import split_texts_model_tokens
+from .text_splitters import split_texts_parallel
+from .semantic_splitter import split_texts_semantic
+from .path_metadata import parse_path_metadata
@@ -0,0 +1,135 @@
+"""
+Offset-based chunk representation.
+
+A ChunkSpans holds chunks as (doc id, start, end) spans over the original texts,
+stored in compact NumPy arrays. Chunk strings are only built when a chunk is
+accessed, so overlapping chunks do not copy their overlap and every chunk keeps
+the exact character offsets it was cut from for citations.
+"""
+
+import numpy as np
+
+def _offset_dtype(max_value):
+    return np.int32 if max_value < np.iinfo(np.int32).max else np.int64
+
+class ChunkSpans:
+    """
+    A sequence of text chunks stored as spans over the source texts.
+
+    Indexing with an int materializes a single chunk string; indexing with a
+    slice, boolean mask or index array returns a ChunkSpans view over the same
+    source texts.
+
+    Args:
+        texts (list of str): Source texts. Kept by reference, not copied.
+        doc_ids (array-like): Index of the source text of each chunk.
+        starts (array-like): Start character offset of each chunk.
+        ends (array-like): End character offset (exclusive) of each chunk.
+    """
+
+    def __init__(self, texts, doc_ids, starts, ends):
+        self.texts = texts
+        max_offset = max((len(text) for text in texts), default=0)
+        self.doc_ids = np.asarray(doc_ids, dtype=_offset_dtype(len(texts)))
+        self.starts = np.asarray(starts, dtype=_offset_dtype(max_offset))
+        self.ends = np.asarray(ends, dtype=_offset_dtype(max_offset))
+        if not len(self.doc_ids) == len(self.starts) == len(self.ends):
+            raise ValueError("doc_ids, starts and ends must have the same length.")
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.texts[self.doc_ids[index]][self.starts[index]:self.ends[index]]
+        return ChunkSpans(self.texts, self.doc_ids[index], self.starts[index], self.ends[index])
+
+    def __iter__(self):
+        for doc_id, start, end in zip(self.doc_ids.tolist(), self.starts.tolist(), self.ends.tolist()):
+            yield self.texts[doc_id][start:end]
+
+    def span(self, index):
+        """
+        Return the source span of a chunk.
+
+        Args:
+            index (int): Chunk index.
+
+        Returns:
+            tuple: (doc id, start, end) character offsets into the source text.
+        """
+        return int(self.doc_ids[index]), int(self.starts[index]), int(self.ends[index])
+
+    def citation(self, index):
+        """
+        Return a citation record for a chunk.
+
+        Args:
+            index (int): Chunk index.
+
+        Returns:
+            dict: "doc_id", "start", "end" and the cited "text".
+        """
+        doc_id, start, end = self.span(index)
+        return {"doc_id": doc_id, "start": start, "end": end, "text": self.texts[doc_id][start:end]}
+
+    def chunk_ids(self, doc_keys=None):
+        """
+        Return stable identifiers for the chunks.
+
+        A chunk id is "<doc key>:<ordinal of the chunk within its document>", so ids
+        only depend on the source documents and the splitting parameters, not on
+        how the work was scheduled. Chunks must be grouped by document, as every
+        splitter produces them.
+
+        Args:
+            doc_keys (list): Key of each source text, e.g. its file path. Defaults to the doc id.
+
+        Returns:
+            list of str: Chunk ids, in order.
+        """
+        if not len(self):
+            return []
+        new_doc = np.concatenate(([True], self.doc_ids[1:] != self.doc_ids[:-1]))
+        group_starts = np.flatnonzero(new_doc)
+        group_sizes = np.diff(np.append(group_starts, len(self)))
+        ordinals = np.arange(len(self)) - np.repeat(group_starts, group_sizes)
+        keys = self.doc_ids.tolist() if doc_keys is None else [doc_keys[doc_id] for doc_id in self.doc_ids.tolist()]
+        return [f"{key}:{ordinal}" for key, ordinal in zip(keys, ordinals.tolist())]
+
+    def materialize(self):
+        """
+        Build the chunk strings.
+
+        Returns:
+            list of str: All chunks, in order.
+        """
+        return list(self)
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the span arrays, excluding the shared source texts.
+        """
+        return self.doc_ids.nbytes + self.starts.nbytes + self.ends.nbytes
+
+    @classmethod
+    def concatenate(cls, texts, spans_list):
+        """
+        Concatenate span sets that refer to the same source texts.
+
+        Args:
+            texts (list of str): Shared source texts.
+            spans_list (list of ChunkSpans): Span sets to join, in order.
+
+        Returns:
+            ChunkSpans: Joined spans.
+        """
+        if not spans_list:
+            return cls(texts, [], [], [])
+        return cls(
+            texts,
+            np.concatenate([spans.doc_ids for spans in spans_list]),
+            np.concatenate([spans.starts for spans in spans_list]),
+            np.concatenate([spans.ends for spans in spans_list]),
+        )
@@ -0,0 +1,193 @@
+"""
+Near-duplicate document elimination with MinHash and locality-sensitive hashing.
+
+Documents are shingled into word n-grams, summarized as MinHash signatures and
+bucketed with LSH banding. Candidate pairs whose estimated Jaccard similarity
+reaches the threshold are merged, and each group is collapsed to its first
+document, which keeps the sources of the dropped duplicates as provenance.
+Only documents of the same date bucket are compared, so a prediction repeated
+on another day or for another period keeps its own date metadata.
+"""
+
+import re
+import zlib
+import numpy as np
+from .document_loaders import get_document_text
+
+_PRIME = 4294967311
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_PATTERN = re.compile(r"\w+")
+_PREDICTION_MARKER = "**Prediction:**"
+
+def _shingles(text, shingle_size):
+    """
+    Hash the word n-grams of a text.
+
+    Args:
+        text (str): Text to shingle.
+        shingle_size (int): Number of words per shingle.
+
+    Returns:
+        np.ndarray: Unique 32-bit shingle hashes.
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= shingle_size:
+        grams = [" ".join(tokens)]
+    else:
+        grams = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64))
+
+def minhash_signatures(texts, num_perm=128, shingle_size=3, seed=1):
+    """
+    Compute MinHash signatures for a list of texts.
+
+    Args:
+        texts (list of str): Texts to sign.
+        num_perm (int): Number of hash permutations (signature length).
+        shingle_size (int): Number of words per shingle.
+        seed (int): Seed for the permutation coefficients.
+
+    Returns:
+        np.ndarray: Signatures of shape (len(texts), num_perm).
+    """
+    rng = np.random.default_rng(seed)
+    # Coefficients below 2**31 keep (a * x + b) within uint64 for 32-bit shingle hashes.
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = _shingles(text, shingle_size)
+        permuted = ((hashes[:, None] * a + b) % _PRIME) & _MAX_HASH
+        signatures[i] = permuted.min(axis=0)
+    return signatures
+
+def _lsh_bands(num_perm, threshold):
+    """
+    Choose the LSH band count whose collision threshold is closest to `threshold`.
+
+    Args:
+        num_perm (int): Signature length.
+        threshold (float): Target Jaccard similarity.
+
+    Returns:
+        tuple: (bands, rows) with bands * rows <= num_perm.
+    """
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1)]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+def _document_metadata(document):
+    if isinstance(document, dict):
+        return document.setdefault("metadata", {})
+    return document.metadata
+
+def _document_source(document, index):
+    metadata = _document_metadata(document)
+    return metadata.get("source") or metadata.get("file_path") or index
+
+def prediction_text(document):
+    """
+    Return the prediction body of a scraped horoscope, ignoring the templated header.
+
+    Files written by data/scraper.py share a header (sign, period, date) that would
+    otherwise dominate the similarity of short predictions. Documents without the
+    marker are compared on their full text.
+
+    Args:
+        document (object): Loaded document.
+
+    Returns:
+        str: Text to compare for deduplication.
+    """
+    text = get_document_text(document)
+    _, marker, prediction = text.partition(_PREDICTION_MARKER)
+    return prediction if marker else text
+
+def date_bucket(document):
+    """
+    Return the date bucket of a document, as set by loaders.path_metadata.
+
+    Args:
+        document (object): Loaded document.
+
+    Returns:
+        tuple: (period, date) of the document, (None, None) when it is undated.
+    """
+    metadata = _document_metadata(document)
+    return metadata.get("period"), metadata.get("date")
+
+def deduplicate_documents(documents, threshold=0.8, num_perm=128, shingle_size=3, key=None, scope=date_bucket):
+    """
+    Collapse near-duplicate documents to one canonical document per group.
+
+    The first document of each group is kept and its metadata gains a
+    "duplicates" list with the sources of the documents merged into it. Only
+    documents with the same `scope` are merged, so by default every date bucket
+    keeps its own copy of a repeated text.
+
+    Args:
+        documents (list): Loaded documents.
+        threshold (float): Minimum estimated Jaccard similarity for two documents to be merged.
+        num_perm (int): Number of MinHash permutations.
+        shingle_size (int): Number of words per shingle.
+        key (callable): Function returning the text to compare for a document.
+            Defaults to the full document text.
+        scope (callable): Function returning a hashable value; documents are only merged
+            with documents of the same value. Defaults to date_bucket. Pass None to
+            compare every document with every other.
+
+    Returns:
+        tuple: (canonical documents, report) where report holds the document counts,
+            the "dedup_ratio" (fraction of documents dropped) and the duplicate groups.
+    """
+    key = key or get_document_text
+    if not documents:
+        return [], {"documents": 0, "unique": 0, "duplicates": 0, "dedup_ratio": 0.0, "groups": []}
+
+    signatures = minhash_signatures([key(doc) for doc in documents], num_perm, shingle_size)
+    scopes = [scope(doc) for doc in documents] if scope else [None] * len(documents)
+    bands, rows = _lsh_bands(num_perm, threshold)
+    parents = list(range(len(documents)))
+    for band in range(bands):
+        buckets = {}
+        band_rows = signatures[:, band * rows:(band + 1) * rows]
+        for i, row in enumerate(band_rows):
+            buckets.setdefault((scopes[i], row.tobytes()), []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = _find(parents, first), _find(parents, other)
+                if root_first == root_other:
+                    continue
+                similarity = np.mean(signatures[first] == signatures[other])
+                if similarity >= threshold:
+                    parents[max(root_first, root_other)] = min(root_first, root_other)
+
+    groups = {}
+    for i in range(len(documents)):
+        groups.setdefault(_find(parents, i), []).append(i)
+
+    canonical = []
+    duplicate_groups = []
+    for root, members in sorted(groups.items()):
+        document = documents[root]
+        duplicates = [_document_source(documents[i], i) for i in members[1:]]
+        if duplicates:
+            _document_metadata(document)["duplicates"] = duplicates
+            duplicate_groups.append({"canonical": _document_source(document, root), "duplicates": duplicates})
+        canonical.append(document)
+
+    dropped = len(documents) - len(canonical)
+    report = {
+        "documents": len(documents),
+        "unique": len(canonical),
+        "duplicates": dropped,
+        "dedup_ratio": dropped / len(documents),
+        "groups": duplicate_groups,
+    }
+    return canonical, report
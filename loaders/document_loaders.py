@@ -1,8 +1,15 @@
 import os
-from langchain.document_loaders import SimpleDirectoryReader, PyPDFLoader, TextLoader
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from langchain.document_loaders import SimpleDirectoryReader, TextLoader
 from langchain.document_loaders.html_loader import HTMLLoader
 from langchain.document_loaders.word_loader import WordLoader
-from langchain.document_loaders.excel_loader import ExcelLoader
+from .path_metadata import parse_path_metadata, parse_date_header
+from .pdf_extraction import iter_pdf_pages
+from .spreadsheet_loaders import iter_spreadsheet_documents
 
 def load_documents(directory):
     """
@@ -17,18 +24,24 @@ def load_documents(directory):
     loader = SimpleDirectoryReader(directory)
     return loader.load()
 
-def load_pdf(file):
+def load_pdf(file, ocr=True, dpi=300, max_workers=1):
     """
-    Load a PDF document.
+    Load a PDF document page by page with iter_pdf_pages, using OCR for scanned pages.
+
+    Pages are extracted in the calling process by default, because load_file already
+    runs inside the loader pool; a page pool per worker would start up to cpu² processes.
 
     Args:
         file (str): File path to the PDF document.
+        ocr (bool): Whether to OCR pages that have no text layer.
+        dpi (int): Rendering resolution used for OCR.
+        max_workers (int): Worker processes for page extraction, or None for the CPU count.
+            Raise it (e.g. through `loader_options`) only when loading a few large PDFs serially.
 
     Returns:
-        list: Loaded PDF document.
+        iterator: One document per page, extracted as they are consumed.
     """
-    pdf_loader = PyPDFLoader(file)
-    return pdf_loader.load()
+    return iter_pdf_pages(file, max_workers=max_workers, ocr=ocr, dpi=dpi)
 
 def load_text(file):
     """
@@ -45,7 +58,7 @@ def load_text(file):
 
 def load_markdown(file):
     """
-    Load a markdown document.
+    Load a markdown document with the metadata encoded in its path.
 
     Args:
         file (str): File path to the markdown document.
@@ -55,7 +68,7 @@ def load_markdown(file):
     """
     with open(file, 'r', encoding='utf-8') as f:
         content = f.read()
-    return [{"content": content}]
+    return [{"content": content, "metadata": parse_path_metadata(file, parse_date_header(content))}]
 
 def load_html(file):
     """
@@ -83,15 +96,263 @@ def load_word(file):
     word_loader = WordLoader(file)
     return word_loader.load()
 
-def load_excel(file):
+def load_excel(file, rows_per_document=100, columns=None):
+    """
+    Load an Excel spreadsheet as row-group documents, streaming its rows.
+
+    Args:
+        file (str): File path to the Excel spreadsheet (.xlsx, .xlsm or .xls).
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+
+    Returns:
+        iterator: Row-group documents, read as they are consumed.
+    """
+    return iter_spreadsheet_documents(file, rows_per_document, columns)
+
+def load_csv(file, rows_per_document=100, columns=None):
+    """
+    Load a CSV file as row-group documents, streaming its rows.
+
+    Args:
+        file (str): File path to the CSV file.
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+
+    Returns:
+        iterator: Row-group documents, read as they are consumed.
+    """
+    return iter_spreadsheet_documents(file, rows_per_document, columns)
+
+LOADERS_BY_EXTENSION = {
+    ".pdf": load_pdf,
+    ".txt": load_text,
+    ".md": load_markdown,
+    ".markdown": load_markdown,
+    ".html": load_html,
+    ".htm": load_html,
+    ".docx": load_word,
+    ".doc": load_word,
+    ".xlsx": load_excel,
+    ".xlsm": load_excel,
+    ".xls": load_excel,
+    ".csv": load_csv,
+}
+
+def load_file(file, loader_options=None):
+    """
+    Load a single file with the loader registered for its extension.
+
+    Args:
+        file (str): File path to load.
+        loader_options (dict): Extension mapped to keyword arguments for its loader,
+            e.g. {".csv": {"columns": ["sign", "prediction"]}}.
+
+    Returns:
+        list or iterator: Loaded documents. PDF and spreadsheet loaders return an
+            iterator that reads pages or rows as it is consumed.
+    """
+    extension = os.path.splitext(file)[1].lower()
+    loader = LOADERS_BY_EXTENSION.get(extension)
+    if loader is None:
+        raise ValueError(f"Unsupported file extension: {extension or '(none)'}")
+    return loader(file, **(loader_options or {}).get(extension, {}))
+
+def _load_file(file, spill_dir, loader_options=None):
+    """
+    Load a single file with load_file, spilling its documents to disk as they are produced.
+
+    Runs inside a worker process. Documents are pickled one at a time into a
+    spill file, so neither the worker nor the result sent back to the parent
+    holds the whole file; failures are captured and returned rather than raised.
+
+    Args:
+        file (str): File path to load.
+        spill_dir (str): Directory for the spill file.
+        loader_options (dict): Per-extension loader arguments, see load_file.
+
+    Returns:
+        dict: Result with the file path, spill file path, number of documents,
+            elapsed seconds and error message.
+    """
+    start = time.perf_counter()
+    count, error = 0, None
+    fd, spill_path = tempfile.mkstemp(suffix=".pkl", dir=spill_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for document in load_file(file, loader_options):
+                pickle.dump(document, f, protocol=pickle.HIGHEST_PROTOCOL)
+                count += 1
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "file": file,
+        "spill": spill_path,
+        "count": count,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+    }
+
+def _iter_spilled(path):
+    """
+    Read the documents of a spill file one at a time, deleting the file once read.
+    """
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _collect(future):
+    result = future.result()
+    spill_path = result.pop("spill")
+    if result["error"]:
+        if os.path.exists(spill_path):
+            os.remove(spill_path)
+        result["documents"] = iter(())
+    else:
+        result["documents"] = _iter_spilled(spill_path)
+    return result
+
+def iter_documents_parallel(directory, max_workers=None, max_in_flight=None, loader_options=None):
+    """
+    Load the files in a directory across a process pool, yielding results as they complete.
+
+    Each file is dispatched to the loader registered for its extension in
+    LOADERS_BY_EXTENSION. At most `max_in_flight` files are submitted at any
+    time, so results stream back without queueing the whole directory.
+
+    Workers write each file's documents to a temporary spill file as the loader
+    produces them, and "documents" reads them back one at a time, so a large
+    spreadsheet or PDF is never held whole in either process. The spill files
+    live until this generator finishes, so consume "documents" before then.
+
+    Args:
+        directory (str): Directory path containing documents.
+        max_workers (int): Number of worker processes. Defaults to the CPU count.
+        max_in_flight (int): Maximum number of files submitted but not yet collected.
+            Defaults to twice the number of workers.
+        loader_options (dict): Per-extension loader arguments, see load_file.
+
+    Yields:
+        dict: Per-file result with keys "file", "documents" (an iterator), "count",
+            "seconds" and "error".
+    """
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * max_workers
+
+    spill_dir = tempfile.mkdtemp(prefix="documents-")
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for file in files:
+                pending.add(executor.submit(_load_file, file, spill_dir, loader_options))
+                if len(pending) < max_in_flight:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(future)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(future)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+def load_documents_parallel(directory, max_workers=None, max_in_flight=None, loader_options=None):
+    """
+    Load documents from a directory in parallel, collecting per-file timings and failures.
+
+    A file that fails to load is recorded in the report and does not abort the batch.
+
+    Args:
+        directory (str): Directory path containing documents.
+        max_workers (int): Number of worker processes. Defaults to the CPU count.
+        max_in_flight (int): Maximum number of files submitted but not yet collected.
+        loader_options (dict): Per-extension loader arguments, see load_file.
+
+    Returns:
+        tuple: (documents, report) where documents is the list of loaded documents and
+            report is a dict with per-file "timings", "failures" and the total "seconds".
+    """
+    start = time.perf_counter()
+    documents, timings, failures = [], {}, {}
+    for result in iter_documents_parallel(directory, max_workers, max_in_flight, loader_options):
+        timings[result["file"]] = result["seconds"]
+        if result["error"]:
+            failures[result["file"]] = result["error"]
+        else:
+            documents.extend(result["documents"])
+    report = {
+        "timings": timings,
+        "failures": failures,
+        "seconds": time.perf_counter() - start,
+    }
+    return documents, report
+
+def iter_documents(directory, max_workers=None, max_in_flight=None, loader_options=None):
+    """
+    Stream documents from a directory as their files finish loading.
+
+    Files that fail to load are skipped; use iter_documents_parallel to inspect failures.
+
+    Args:
+        directory (str): Directory path containing documents.
+        max_workers (int): Number of worker processes. Defaults to the CPU count.
+        max_in_flight (int): Maximum number of files submitted but not yet collected.
+        loader_options (dict): Per-extension loader arguments, see load_file.
+
+    Yields:
+        object: Loaded documents, one at a time.
+    """
+    for result in iter_documents_parallel(directory, max_workers, max_in_flight, loader_options):
+        if result["error"]:
+            print(f"Error occurred while loading {result['file']}: {result['error']}")
+            continue
+        yield from result["documents"]
+
+def get_document_text(document):
+    """
+    Return the text of a document produced by any of the loaders.
+
+    The loaders return either LangChain documents (`page_content`) or plain
+    dicts keyed by "text" or "content".
+
+    Args:
+        document (object): Loaded document.
+
+    Returns:
+        str: Document text.
+    """
+    if isinstance(document, dict):
+        for key in ("text", "content", "page_content"):
+            if key in document:
+                return document[key]
+        raise KeyError("Document has no text field.")
+    if hasattr(document, "page_content"):
+        return document.page_content
+    return document.text
+
+def get_document_metadata(document):
     """
-    Load an Excel spreadsheet.
+    Return the metadata of a document produced by any of the loaders.
 
     Args:
-        file (str): File path to the Excel spreadsheet.
+        document (object): Loaded document.
 
     Returns:
-        list: Loaded Excel spreadsheet.
+        dict: Document metadata, empty if the document has none.
     """
-    excel_loader = ExcelLoader(file)
-    return excel_loader.load()
+    if isinstance(document, dict):
+        return document.get("metadata") or {}
+    return getattr(document, "metadata", None) or {}
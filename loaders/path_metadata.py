@@ -0,0 +1,244 @@
+"""
+Structured metadata parsed from the layout of the `data/` directory.
+
+The scraper stores one Markdown file per sign under a folder that encodes
+the period of the horoscope:
+
+    data/06-29-2024/leo.md               daily, dated folder
+    data/week_26/leo_this_week.md        weekly, ISO week folder
+    data/June/leo_this_month.md          monthly
+    data/2024/leo_2024.md                yearly
+
+Relative labels ("this_week", "last_month") only mean something relative to
+the day the file was scraped, so every file is resolved to a concrete span
+when it is loaded: "date" is the ISO day ("2024-06-29"), ISO week
+("2024-W26"), month ("2024-06") or year ("2024") the file covers, and
+"start_date"/"end_date" are its first and last day. Week and month folders
+do not record a year; it is taken from the "**Date:**" header the scraper
+writes into each file, falling back to the load date.
+
+The same labels can be used in filters: resolve_relative_date turns
+"this_week" into the span of the current week and date_labels lists every
+"date" value that overlaps a span, so "date=this week" matches the week's
+daily files, the weekly file and the monthly and yearly files containing the
+week at query time.
+"""
+
+import calendar
+import os
+import re
+from datetime import date, datetime, timedelta
+
+SIGNS = (
+    "aries", "taurus", "gemini", "cancer", "leo", "virgo",
+    "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces",
+)
+MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+METADATA_FIELDS = ("source", "sign", "period", "date", "week", "month", "year", "relative", "start_date", "end_date")
+
+# Relative label -> (period of the span, offset in whole periods from the reference day).
+RELATIVE_DATES = {
+    "yesterday": ("daily", -1),
+    "today": ("daily", 0),
+    "tomorrow": ("daily", 1),
+    "last_week": ("weekly", -1),
+    "this_week": ("weekly", 0),
+    "next_week": ("weekly", 1),
+    "last_month": ("monthly", -1),
+    "this_month": ("monthly", 0),
+    "next_month": ("monthly", 1),
+    "last_year": ("yearly", -1),
+    "this_year": ("yearly", 0),
+}
+
+_DAILY_FOLDER = re.compile(r"^\d{2}-\d{2}-\d{4}$")
+_WEEK_FOLDER = re.compile(r"^week_(\d+)$")
+_YEAR_FOLDER = re.compile(r"^\d{4}$")
+_RELATIVE_SUFFIX = re.compile(r"_((?:last|this|next)_(?:week|month))$")
+_DATE_HEADER = re.compile(r"^\*\*Date:\*\*\s*(.+?)\s*$", re.MULTILINE)
+
+def _shift_month(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def bucket_span(period, day, offset=0):
+    """
+    Return the date span of the bucket of a period containing a day, shifted by whole buckets.
+
+    Args:
+        period (str): "daily", "weekly" (ISO weeks), "monthly" or "yearly".
+        day (datetime.date): Day inside the bucket.
+        offset (int): Number of buckets to shift, e.g. -1 for the previous week.
+
+    Returns:
+        tuple: (first day, last day) of the bucket.
+    """
+    if period == "daily":
+        start = day + timedelta(days=offset)
+        return start, start
+    if period == "weekly":
+        start = day - timedelta(days=day.weekday()) + timedelta(weeks=offset)
+        return start, start + timedelta(days=6)
+    if period == "monthly":
+        start = _shift_month(day, offset)
+        return start, start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    if period == "yearly":
+        return date(day.year + offset, 1, 1), date(day.year + offset, 12, 31)
+    raise ValueError(f"Unknown period: {period}")
+
+def iso_week_start(year, week):
+    """
+    Return the Monday of an ISO week.
+
+    Unlike date.fromisocalendar this does not reject week 53 of a 52-week year;
+    such a week is read as week 1 of the following year.
+
+    Args:
+        year (int): ISO year.
+        week (int): ISO week number, starting at 1.
+
+    Returns:
+        datetime.date: Monday of the week.
+    """
+    return date.fromisocalendar(year, 1, 1) + timedelta(weeks=week - 1)
+
+def date_label(period, start):
+    """
+    Return the "date" value of the bucket of a period starting on a day.
+
+    Args:
+        period (str): "daily", "weekly", "monthly" or "yearly".
+        start (datetime.date): First day of the bucket.
+
+    Returns:
+        str: ISO day, ISO week ("2024-W26"), month ("2024-06") or year ("2024").
+    """
+    if period == "daily":
+        return start.isoformat()
+    if period == "weekly":
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if period == "monthly":
+        return start.strftime("%Y-%m")
+    if period == "yearly":
+        return str(start.year)
+    raise ValueError(f"Unknown period: {period}")
+
+def resolve_relative_date(label, today=None):
+    """
+    Resolve a relative label such as "this_week" to a concrete span.
+
+    Args:
+        label (str): One of RELATIVE_DATES.
+        today (datetime.date): Reference day. Defaults to today.
+
+    Returns:
+        tuple: (period, first day, last day).
+    """
+    if label not in RELATIVE_DATES:
+        raise ValueError(f"Unknown relative date: {label}. Available labels: {', '.join(RELATIVE_DATES)}")
+    period, offset = RELATIVE_DATES[label]
+    start, end = bucket_span(period, today or date.today(), offset)
+    return period, start, end
+
+def date_labels(period, start, end):
+    """
+    Return every "date" value that overlaps a span.
+
+    These are the days of the span and the weeks, months and years that contain
+    any of them, so an equality filter on "date" matches the daily files of the
+    span, the file for the span itself and the weekly, monthly and yearly files
+    that cover part of it. For a week, that is its days, the week, its month
+    (both months if it straddles two) and its year.
+
+    Args:
+        period (str): Period of the span.
+        start (datetime.date): First day.
+        end (datetime.date): Last day.
+
+    Returns:
+        list of str: Labels, without duplicates.
+    """
+    labels = {date_label(period, start)}
+    day = start
+    while day <= end:
+        labels.add(day.isoformat())
+        for containing in ("weekly", "monthly", "yearly"):
+            labels.add(date_label(containing, bucket_span(containing, day)[0]))
+        day += timedelta(days=1)
+    return sorted(labels)
+
+def parse_date_header(content):
+    """
+    Return the scrape date from the "**Date:** June 29, 2024" header of a data file.
+
+    Args:
+        content (str): File contents.
+
+    Returns:
+        datetime.date: The date, or None if the file has no parsable header.
+    """
+    match = _DATE_HEADER.search(content)
+    if match is None:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%B %d, %Y").date()
+    except ValueError:
+        return None
+
+def parse_path_metadata(path, scraped_on=None):
+    """
+    Parse sign, period and date fields from a data file path.
+
+    Fields that do not apply to a file are empty strings, so every record has
+    the same columns.
+
+    Args:
+        path (str): File path, e.g. 'data/week_26/leo_this_week.md'.
+        scraped_on (datetime.date): Day the file was scraped, from its date header.
+            Gives the year of week and month folders. Defaults to today.
+
+    Returns:
+        dict: Metadata with the keys in METADATA_FIELDS.
+    """
+    folder = os.path.basename(os.path.dirname(path))
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    metadata = dict.fromkeys(METADATA_FIELDS, "")
+    metadata["source"] = path
+    metadata["sign"] = next((sign for sign in SIGNS if stem.startswith(sign)), "")
+    relative = _RELATIVE_SUFFIX.search(stem)
+    metadata["relative"] = relative.group(1) if relative else ""
+    reference = scraped_on or date.today()
+
+    start = None
+    if _DAILY_FOLDER.match(folder):
+        period, start = "daily", datetime.strptime(folder, "%m-%d-%Y").date()
+    elif _WEEK_FOLDER.match(folder):
+        # The folder holds the resolved ISO week; its year is the one around the scrape date.
+        week = int(_WEEK_FOLDER.match(folder).group(1))
+        offset = RELATIVE_DATES[metadata["relative"]][1] if relative else 0
+        year = (reference + timedelta(weeks=offset)).isocalendar()[0]
+        period, start = "weekly", iso_week_start(year, week)
+    elif folder.lower() in MONTHS:
+        offset = RELATIVE_DATES[metadata["relative"]][1] if relative else 0
+        year = _shift_month(reference, offset).year
+        period, start = "monthly", date(year, MONTHS.index(folder.lower()) + 1, 1)
+    elif _YEAR_FOLDER.match(folder):
+        period, start = "yearly", date(int(folder), 1, 1)
+
+    if start is not None:
+        start, end = bucket_span(period, start)
+        metadata.update(
+            period=period,
+            date=date_label(period, start),
+            month=MONTHS[start.month - 1] if period != "yearly" else "",
+            year=str(start.isocalendar()[0] if period == "weekly" else start.year),
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+        )
+        if period == "weekly":
+            metadata["week"] = str(start.isocalendar()[1])
+    return metadata
@@ -0,0 +1,274 @@
+"""
+Page-parallel PDF extraction with OCR fallback.
+
+Large PDFs can be split into page ranges that are extracted across a process
+pool, and pages are yielded in order as their range finishes, so only a bounded
+number of ranges is held in memory at a time. load_pdf extracts in the calling
+process, since the loader pool already runs one file per worker.
+Pages without a text layer (scanned pages) are rendered with pdf2image and run
+through Tesseract. Extracted pages are cached on disk:
+
+- `files/<file hash>.json` maps each page number of a known file to its page digest,
+  so a re-uploaded file is served from the cache without being parsed.
+- `pages/<page digest>.<mode>.json` holds the extracted text of a page, keyed by a digest
+  of the page's content streams and resources (images, fonts and their ToUnicode maps), so an
+  edited file only reprocesses the pages that changed.
+  The mode records the extraction settings ("text", or "ocr<dpi>"), so a page extracted
+  without OCR or at another resolution is not served for a different setting.
+
+Dependencies:
+- PyPDF2
+- pdf2image (requires poppler)
+- pytesseract (requires tesseract)
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+from pdf2image import convert_from_path
+import pytesseract
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "pdf_pages")
+
+def _file_hash(file):
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        file (str): File path.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _object_digest(obj, memo):
+    """
+    Compute a digest of a PDF object together with every stream and object it references.
+
+    Indirect objects are digested once per file and memoized by object number, so
+    fonts and images shared by many pages are hashed only once. A reference back
+    to an object that is still being digested hashes as a placeholder.
+
+    Args:
+        obj (PyPDF2.generic.PdfObject): Object to fingerprint.
+        memo (dict): Digests of the indirect objects seen so far, keyed by (idnum, generation).
+
+    Returns:
+        str: Hex digest of the object.
+    """
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            memo[key] = None
+            memo[key] = _object_digest(obj.get_object(), memo)
+        return memo[key] or "cycle"
+    digest = hashlib.sha256()
+    if isinstance(obj, StreamObject):
+        digest.update(obj.get_data())
+    if isinstance(obj, DictionaryObject):
+        for name, value in sorted(obj.items()):
+            digest.update(name.encode("utf-8"))
+            digest.update(_object_digest(value, memo).encode("ascii"))
+    elif isinstance(obj, ArrayObject):
+        for value in obj:
+            digest.update(_object_digest(value, memo).encode("ascii"))
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+    return digest.hexdigest()
+
+def _page_digest(page, memo=None):
+    """
+    Compute a digest of a page's content stream and everything its resources reference.
+
+    The resources are hashed recursively: XObjects (scanned pages usually share
+    an identical content stream that only differs in the embedded image) with
+    the resources of nested form XObjects, and fonts with their embedded font
+    files and ToUnicode maps, which change the extracted text without changing
+    the content stream.
+
+    Args:
+        page (PyPDF2.PageObject): Page to fingerprint.
+        memo (dict): Digests of indirect objects, shared across the pages of one file.
+
+    Returns:
+        str: Hex digest identifying the page contents.
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.get("/Resources")
+    if resources is not None:
+        digest.update(_object_digest(resources, memo).encode("ascii"))
+    return digest.hexdigest()
+
+def _page_cache_path(cache_dir, page_digest, ocr, dpi):
+    """
+    Return the cache path of a page extracted with the given settings.
+    """
+    mode = f"ocr{dpi}" if ocr else "text"
+    return os.path.join(cache_dir, "pages", f"{page_digest}.{mode}.json")
+
+def _read_json(path):
+    """
+    Read a cache entry, returning None if it does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    """
+    Write a cache entry atomically so concurrent extractions never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _ocr_page(file, page_number, dpi):
+    """
+    Render a single page and extract its text with Tesseract.
+
+    Args:
+        file (str): File path to the PDF document.
+        page_number (int): Zero-based page number.
+        dpi (int): Rendering resolution.
+
+    Returns:
+        str: Recognized text.
+    """
+    images = convert_from_path(file, dpi=dpi, first_page=page_number + 1, last_page=page_number + 1)
+    return "\n".join(pytesseract.image_to_string(image) for image in images)
+
+def _extract_pages(file, page_numbers, ocr=True, dpi=300):
+    """
+    Extract the text of the given pages, falling back to OCR for pages without a text layer.
+
+    Runs inside a worker process; each worker opens its own reader.
+
+    Args:
+        file (str): File path to the PDF document.
+        page_numbers (list of int): Zero-based page numbers to extract.
+        ocr (bool): Whether to OCR pages that have no text layer.
+        dpi (int): Rendering resolution used for OCR.
+
+    Returns:
+        list of tuple: (page_number, text, method) for each page, where method is "text" or "ocr".
+    """
+    reader = PdfReader(file)
+    results = []
+    for page_number in page_numbers:
+        text = reader.pages[page_number].extract_text() or ""
+        method = "text"
+        if ocr and not text.strip():
+            text = _ocr_page(file, page_number, dpi)
+            method = "ocr"
+        results.append((page_number, text, method))
+    return results
+
+def _iter_extracted(file, tasks, max_workers, ocr, dpi):
+    """
+    Extract page ranges in order, with at most two ranges per worker submitted ahead.
+
+    Yields:
+        tuple: (page_number, text, method) for each page of each task, in task order.
+    """
+    if len(tasks) <= 1 or max_workers == 1:
+        for task in tasks:
+            yield from _extract_pages(file, task, ocr, dpi)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        max_ahead = 2 * (max_workers or os.cpu_count() or 1)
+        pending = deque()
+        remaining = iter(tasks)
+        for task in itertools.islice(remaining, max_ahead):
+            pending.append(executor.submit(_extract_pages, file, task, ocr, dpi))
+        while pending:
+            results = pending.popleft().result()
+            for task in itertools.islice(remaining, 1):
+                pending.append(executor.submit(_extract_pages, file, task, ocr, dpi))
+            yield from results
+
+def iter_pdf_pages(file, max_workers=None, pages_per_task=25, cache_dir=DEFAULT_CACHE_DIR, ocr=True, dpi=300):
+    """
+    Extract a PDF page by page, yielding each page in order as soon as it is available.
+
+    Uncached pages are extracted in ranges across a process pool, with OCR fallback,
+    and only a bounded number of ranges is extracted ahead of the consumer, so a
+    large PDF is never held whole in memory.
+
+    Args:
+        file (str): File path to the PDF document.
+        max_workers (int): Number of worker processes. Defaults to the CPU count; 1
+            extracts every page in the calling process.
+        pages_per_task (int): Number of pages extracted per worker task. PDFs with no more
+            uncached pages than this are extracted in the calling process.
+        cache_dir (str): Directory for the page cache, or None to disable caching.
+        ocr (bool): Whether to OCR pages that have no text layer.
+        dpi (int): Rendering resolution used for OCR.
+
+    Yields:
+        dict: One document per page, with "content" and "metadata"
+            ("source", "page" and "extraction" method).
+    """
+    file_hash = _file_hash(file)
+    file_entry_path = os.path.join(cache_dir, "files", f"{file_hash}.json") if cache_dir else None
+    page_digests = _read_json(file_entry_path) if cache_dir else None
+    if page_digests is None:
+        reader = PdfReader(file)
+        memo = {}
+        page_digests = [_page_digest(page, memo) for page in reader.pages]
+
+    missing = [
+        page_number for page_number, page_digest in enumerate(page_digests)
+        if not cache_dir or not os.path.exists(_page_cache_path(cache_dir, page_digest, ocr, dpi))
+    ]
+    tasks = [missing[i:i + pages_per_task] for i in range(0, len(missing), pages_per_task)]
+    extracted = _iter_extracted(file, tasks, max_workers, ocr, dpi)
+    missing = set(missing)
+
+    for page_number, page_digest in enumerate(page_digests):
+        page_path = _page_cache_path(cache_dir, page_digest, ocr, dpi) if cache_dir else None
+        if page_number in missing:
+            _, text, method = next(extracted)
+            if cache_dir:
+                _write_json(page_path, {"text": text, "extraction": method})
+        else:
+            cached = _read_json(page_path)
+            text, method = cached["text"], cached["extraction"]
+        yield {"content": text, "metadata": {"source": file, "page": page_number, "extraction": method}}
+    if cache_dir:
+        _write_json(file_entry_path, page_digests)
+
+def extract_pdf(file, max_workers=None, pages_per_task=25, cache_dir=DEFAULT_CACHE_DIR, ocr=True, dpi=300):
+    """
+    Extract a PDF page by page across a process pool, with OCR fallback and a per-page cache.
+
+    Args:
+        file (str): File path to the PDF document.
+        max_workers (int): Number of worker processes. Defaults to the CPU count.
+        pages_per_task (int): Number of pages extracted per worker task. PDFs with no more
+            uncached pages than this are extracted in the calling process.
+        cache_dir (str): Directory for the page cache, or None to disable caching.
+        ocr (bool): Whether to OCR pages that have no text layer.
+        dpi (int): Rendering resolution used for OCR.
+
+    Returns:
+        list: One document per page, as dicts with "content" and "metadata"
+            ("source", "page" and "extraction" method).
+    """
+    return list(iter_pdf_pages(file, max_workers, pages_per_task, cache_dir, ocr, dpi))
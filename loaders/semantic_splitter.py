@@ -0,0 +1,125 @@
+"""
+Semantic chunking with sentence embeddings.
+
+Texts are split into sentences, every sentence in the corpus is embedded in
+length-sorted batches through a local embedding model, which mean-pools over
+real tokens only so a sentence's vector does not depend on its batch, and the
+cosine distance between each pair of adjacent sentences is computed in one
+vectorized operation. Chunks are cut at distance peaks (topic shifts), subject
+to minimum and maximum token limits, so chunks follow the structure of the
+text instead of a fixed size.
+"""
+
+import numpy as np
+from embeddings.local_embeddings import create_local_minilm_embeddings
+from embeddings.tokenizer_service import count_tokens
+from utils.batching import batched
+from .chunk_spans import ChunkSpans
+from .splitter_engine import detect_boundaries, derive_spans
+
+MINILM_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+def adjacent_cosine_distances(embeddings):
+    """
+    Compute the cosine distance between each row and the next.
+
+    Args:
+        embeddings (np.ndarray): Sentence embeddings of shape (n, dim).
+
+    Returns:
+        np.ndarray: Distances of shape (n - 1,).
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.maximum(norms, 1e-12)
+    return 1.0 - np.einsum("ij,ij->i", normalized[:-1], normalized[1:])
+
+def _semantic_cuts(distances, token_counts, threshold, min_tokens, max_tokens):
+    """
+    Choose the sentences after which a document is cut.
+
+    A cut is placed after sentence i when the distance to sentence i + 1 is a
+    local peak at or above `threshold` and the chunk has reached `min_tokens`,
+    or when adding the next sentence would exceed `max_tokens`.
+
+    Args:
+        distances (np.ndarray): Distances between adjacent sentences of one document.
+        token_counts (np.ndarray): Token count of each sentence.
+        threshold (float): Minimum distance for a peak to be a cut.
+        min_tokens (int): Minimum tokens per chunk before a peak may cut it.
+        max_tokens (int): Maximum tokens per chunk.
+
+    Returns:
+        list of int: Indices of the last sentence of each chunk.
+    """
+    padded = np.concatenate(([-np.inf], distances, [-np.inf]))
+    peaks = (distances >= threshold) & (distances >= padded[:-2]) & (distances >= padded[2:])
+    cuts = []
+    chunk_tokens = 0
+    for i, tokens in enumerate(token_counts.tolist()):
+        chunk_tokens += tokens
+        if i == len(token_counts) - 1:
+            cuts.append(i)
+        elif chunk_tokens + token_counts[i + 1] > max_tokens or (peaks[i] and chunk_tokens >= min_tokens):
+            cuts.append(i)
+            chunk_tokens = 0
+    return cuts
+
+def split_texts_semantic(texts, embed_fn=create_local_minilm_embeddings, model_name=MINILM_MODEL_NAME,
+                         min_tokens=32, max_tokens=256, breakpoint_percentile=90, batch_size=64):
+    """
+    Split texts into semantically coherent chunks.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        embed_fn (callable): Embedding function taking a list of texts and returning an np.ndarray,
+            e.g. one of the functions in embeddings.local_embeddings.
+        model_name (str): Hugging Face model name used to count tokens; should match `embed_fn`.
+        min_tokens (int): Minimum tokens per chunk before a topic shift may end it.
+        max_tokens (int): Maximum tokens per chunk. A single sentence longer than this
+            becomes its own chunk.
+        breakpoint_percentile (float): Percentile of the corpus' adjacent-sentence distances
+            above which a distance peak counts as a topic shift.
+        batch_size (int): Number of sentences embedded per call.
+
+    Returns:
+        ChunkSpans: Chunks as spans over the source texts.
+    """
+    sentence_spans = [derive_spans(detect_boundaries(text), "sentence") for text in texts]
+    sentences = [
+        text[start:end]
+        for text, (starts, ends) in zip(texts, sentence_spans)
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+    if not sentences:
+        return ChunkSpans(texts, [], [], [])
+
+    # Batches of similar-length sentences carry little padding; rows are put back in sentence order.
+    order = np.argsort([len(sentence) for sentence in sentences], kind="stable")
+    sorted_embeddings = np.concatenate([
+        np.asarray(embed_fn([sentences[i] for i in batch]), dtype=np.float32)
+        for batch in batched(order.tolist(), batch_size)
+    ])
+    embeddings = np.empty_like(sorted_embeddings)
+    embeddings[order] = sorted_embeddings
+    distances = adjacent_cosine_distances(embeddings)
+    token_counts = count_tokens(sentences, model_name)
+
+    sentence_counts = np.array([len(starts) for starts, _ in sentence_spans])
+    doc_offsets = np.concatenate(([0], np.cumsum(sentence_counts)))
+    # Distances across a document boundary are not topic shifts within a document.
+    within_doc = np.ones(len(distances), dtype=bool)
+    doc_starts = doc_offsets[1:-1]
+    within_doc[doc_starts[(doc_starts > 0) & (doc_starts < len(sentences))] - 1] = False
+    threshold = np.percentile(distances[within_doc], breakpoint_percentile) if within_doc.any() else np.inf
+
+    doc_ids, chunk_starts, chunk_ends = [], [], []
+    for doc_id, (starts, ends) in enumerate(sentence_spans):
+        if not len(starts):
+            continue
+        first, last = doc_offsets[doc_id], doc_offsets[doc_id + 1]
+        cuts = _semantic_cuts(distances[first:last - 1], token_counts[first:last], threshold, min_tokens, max_tokens)
+        first_sentences = [0] + [cut + 1 for cut in cuts[:-1]]
+        doc_ids.extend([doc_id] * len(cuts))
+        chunk_starts.extend(starts[first_sentences].tolist())
+        chunk_ends.extend(ends[cuts].tolist())
+    return ChunkSpans(texts, doc_ids, chunk_starts, chunk_ends)
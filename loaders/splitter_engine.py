@@ -0,0 +1,219 @@
+"""
+Single-pass multi-strategy text splitting.
+
+Each text is scanned once to record its word, sentence and paragraph boundaries
+as offset arrays. Every chunking strategy (recursive, sentence, paragraph, word)
+is then derived from those shared boundaries, so comparing strategies costs one
+scan of the corpus instead of one per strategy.
+
+Words are whitespace-delimited; chunk sizes for the "recursive" strategy are in
+characters, matching split_texts_recursive, and for the "word" strategy in words.
+Model tokens need a tokenizer, so token-based splitting stays in
+split_texts_token and split_texts_model_tokens.
+"""
+
+import re
+import numpy as np
+from .chunk_spans import ChunkSpans
+
+STRATEGIES = ("recursive", "sentence", "paragraph", "word")
+
+_WORD_PATTERN = re.compile(r"\S+")
+_SENTENCE_END_PATTERN = re.compile(r"[.!?][\"')\]]*$")
+
+def detect_boundaries(text):
+    """
+    Record the word, sentence and paragraph boundaries of a text in one pass.
+
+    A sentence ends at a word ending in terminal punctuation, a paragraph at a
+    blank line; the end of a paragraph is also the end of a sentence.
+
+    Args:
+        text (str): Text to scan.
+
+    Returns:
+        dict: Boundary arrays:
+            - "word_starts", "word_ends": character offsets of each word.
+            - "sentence_ends": indices of the words that end a sentence.
+            - "paragraph_ends": indices of the words that end a paragraph.
+    """
+    word_starts, word_ends, sentence_ends, paragraph_ends = [], [], [], []
+    previous_end = None
+    for match in _WORD_PATTERN.finditer(text):
+        start = match.start()
+        if previous_end is not None and text.count("\n", previous_end, start) >= 2:
+            last = len(word_starts) - 1
+            paragraph_ends.append(last)
+            if not sentence_ends or sentence_ends[-1] != last:
+                sentence_ends.append(last)
+        if _SENTENCE_END_PATTERN.search(match.group()):
+            sentence_ends.append(len(word_starts))
+        word_starts.append(start)
+        previous_end = match.end()
+        word_ends.append(previous_end)
+
+    last = len(word_starts) - 1
+    if last >= 0:
+        if not sentence_ends or sentence_ends[-1] != last:
+            sentence_ends.append(last)
+        paragraph_ends.append(last)
+    return {
+        "word_starts": np.array(word_starts, dtype=np.int64),
+        "word_ends": np.array(word_ends, dtype=np.int64),
+        "sentence_ends": np.array(sentence_ends, dtype=np.int64),
+        "paragraph_ends": np.array(paragraph_ends, dtype=np.int64),
+    }
+
+def _segments(boundaries, end_words):
+    """
+    Convert segment-ending word indices into character spans.
+
+    Args:
+        boundaries (dict): Boundaries from detect_boundaries.
+        end_words (np.ndarray): Sorted indices of the last word of each segment.
+
+    Returns:
+        tuple: (starts, ends) character offset arrays.
+    """
+    first_words = np.concatenate(([0], end_words[:-1] + 1)) if len(end_words) else end_words
+    return boundaries["word_starts"][first_words], boundaries["word_ends"][end_words]
+
+def _word_windows(boundaries, chunk_size, chunk_overlap):
+    """
+    Slide a window of `chunk_size` words with `chunk_overlap` words of overlap.
+
+    The overlap is capped at `chunk_size - 1` words, so every window starts one
+    word further at least and the windows cover the whole text.
+
+    Returns:
+        tuple: (starts, ends) character offset arrays.
+    """
+    count = len(boundaries["word_starts"])
+    if count == 0:
+        return boundaries["word_starts"], boundaries["word_ends"]
+    chunk_size = max(chunk_size, 1)
+    chunk_overlap = min(chunk_overlap, chunk_size - 1)
+    step = chunk_size - chunk_overlap
+    first_words = np.arange(0, max(count - chunk_overlap, 1), step)
+    last_words = np.minimum(first_words + chunk_size, count) - 1
+    return boundaries["word_starts"][first_words], boundaries["word_ends"][last_words]
+
+def _last_boundary(ends, low, high):
+    """
+    Return the largest boundary index in [low, high], or None.
+    """
+    position = np.searchsorted(ends, high, side="right") - 1
+    if position >= 0 and ends[position] >= low:
+        return int(ends[position])
+    return None
+
+def _recursive_chunks(boundaries, chunk_size, chunk_overlap):
+    """
+    Pack words into chunks of at most `chunk_size` characters.
+
+    Each chunk is cut at the last paragraph boundary that fits, falling back to
+    the last sentence boundary and then to the last whole word, like
+    RecursiveCharacterTextSplitter. Consecutive chunks overlap by up to
+    `chunk_overlap` characters of whole words; a chunk is only cut at a boundary
+    that lies past the end of the previous chunk, and the overlap is dropped when
+    it leaves no room for a new word, so no chunk consists of overlap only.
+
+    Returns:
+        tuple: (starts, ends) character offset arrays.
+    """
+    word_starts, word_ends = boundaries["word_starts"], boundaries["word_ends"]
+    count = len(word_starts)
+    starts, ends = [], []
+    first = 0
+    previous_last = -1
+    while first < count:
+        last = int(np.searchsorted(word_ends, word_starts[first] + chunk_size, side="right")) - 1
+        if last <= previous_last:
+            first = previous_last + 1
+            last = int(np.searchsorted(word_ends, word_starts[first] + chunk_size, side="right")) - 1
+        last = max(last, first)
+        if last < count - 1:
+            for boundary_ends in (boundaries["paragraph_ends"], boundaries["sentence_ends"]):
+                boundary = _last_boundary(boundary_ends, max(first, previous_last + 1), last)
+                if boundary is not None:
+                    last = boundary
+                    break
+        starts.append(word_starts[first])
+        ends.append(word_ends[last])
+        if last >= count - 1:
+            break
+        overlap_start = int(np.searchsorted(word_starts, word_ends[last] - chunk_overlap, side="left"))
+        first = min(max(overlap_start, first + 1), last + 1)
+        previous_last = last
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+def derive_spans(boundaries, strategy, chunk_size=512, chunk_overlap=50):
+    """
+    Derive the chunk spans of one strategy from precomputed boundaries.
+
+    Args:
+        boundaries (dict): Boundaries from detect_boundaries.
+        strategy (str): One of STRATEGIES.
+        chunk_size (int): Maximum chunk size (characters for "recursive", words for "word").
+        chunk_overlap (int): Overlap between chunks, in the same unit as chunk_size.
+
+    Returns:
+        tuple: (starts, ends) character offset arrays.
+    """
+    if strategy == "recursive":
+        return _recursive_chunks(boundaries, chunk_size, chunk_overlap)
+    if strategy == "sentence":
+        return _segments(boundaries, boundaries["sentence_ends"])
+    if strategy == "paragraph":
+        return _segments(boundaries, boundaries["paragraph_ends"])
+    if strategy == "word":
+        return _word_windows(boundaries, chunk_size, chunk_overlap)
+    raise ValueError(f"Invalid splitting strategy: {strategy}")
+
+def derive_chunk_spans(texts, strategies=STRATEGIES, chunk_size=512, chunk_overlap=50):
+    """
+    Split texts with several strategies into offset-based chunks, scanning each text once.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        strategies (tuple of str): Strategies to derive, from STRATEGIES.
+        chunk_size (int): Maximum chunk size (characters for "recursive", words for "word").
+        chunk_overlap (int): Overlap between chunks, in the same unit as chunk_size.
+
+    Returns:
+        dict: Strategy name mapped to a ChunkSpans over `texts`.
+    """
+    collected = {strategy: ([], [], []) for strategy in strategies}
+    for doc_id, text in enumerate(texts):
+        boundaries = detect_boundaries(text)
+        for strategy in strategies:
+            starts, ends = derive_spans(boundaries, strategy, chunk_size, chunk_overlap)
+            doc_ids, all_starts, all_ends = collected[strategy]
+            doc_ids.append(np.full(len(starts), doc_id, dtype=np.int64))
+            all_starts.append(starts)
+            all_ends.append(ends)
+    return {
+        strategy: ChunkSpans(
+            texts,
+            np.concatenate(doc_ids) if doc_ids else [],
+            np.concatenate(starts) if starts else [],
+            np.concatenate(ends) if ends else [],
+        )
+        for strategy, (doc_ids, starts, ends) in collected.items()
+    }
+
+def split_texts_multi(texts, strategies=STRATEGIES, chunk_size=512, chunk_overlap=50):
+    """
+    Split texts with several strategies from a single boundary-detection pass per text.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        strategies (tuple of str): Strategies to derive, from STRATEGIES.
+        chunk_size (int): Maximum chunk size (characters for "recursive", words for "word").
+        chunk_overlap (int): Overlap between chunks, in the same unit as chunk_size.
+
+    Returns:
+        dict: Strategy name mapped to its list of text chunks.
+    """
+    spans = derive_chunk_spans(texts, strategies, chunk_size, chunk_overlap)
+    return {strategy: chunk_spans.materialize() for strategy, chunk_spans in spans.items()}
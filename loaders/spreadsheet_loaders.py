@@ -0,0 +1,171 @@
+"""
+Streaming loaders for Excel workbooks and CSV files.
+
+Rows are read iteratively (openpyxl read-only mode for workbooks, the csv module
+for CSV files) and emitted as documents of `rows_per_document` rows each, so memory
+is bounded by the row-group size rather than the file size. Each document repeats
+the header line so a chunk keeps its column context after splitting.
+
+Legacy .xls workbooks are a binary format openpyxl cannot read; they are parsed
+one sheet at a time with pandas (xlrd engine) and then grouped the same way.
+
+Dependencies:
+- openpyxl
+- pandas and xlrd (for .xls only)
+"""
+
+import csv
+import os
+from itertools import islice
+from openpyxl import load_workbook
+
+def _resolve_columns(header, columns):
+    """
+    Resolve a column selection against a header row.
+
+    Args:
+        header (list): Header row values.
+        columns (list): Column names or zero-based indices, or None for all columns.
+
+    Returns:
+        list of int: Indices of the selected columns.
+    """
+    if columns is None:
+        return list(range(len(header)))
+    names = [str(name) if name is not None else "" for name in header]
+    indices = []
+    for column in columns:
+        if isinstance(column, int):
+            if not 0 <= column < len(header):
+                raise ValueError(f"Column index out of range: {column}")
+            indices.append(column)
+        elif column in names:
+            indices.append(names.index(column))
+        else:
+            raise ValueError(f"Unknown column: {column}")
+    return indices
+
+def _format_row(row, indices):
+    return " | ".join("" if i >= len(row) or row[i] is None else str(row[i]) for i in indices)
+
+def _iter_row_groups(rows, source, sheet, rows_per_document, columns):
+    """
+    Group an iterator of rows into documents that carry the header line.
+
+    Args:
+        rows (iterator): Row iterator whose first row is the header.
+        source (str): File path, recorded in the document metadata.
+        sheet (str): Sheet name, or None for CSV files.
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or indices to keep, or None for all columns.
+
+    Yields:
+        dict: Documents with "content" and "metadata".
+    """
+    header = next(rows, None)
+    if header is None:
+        return
+    indices = _resolve_columns(list(header), columns)
+    header_line = _format_row(header, indices)
+    first_row = 1
+    while True:
+        group = [_format_row(row, indices) for row in islice(rows, rows_per_document)]
+        if not group:
+            return
+        lines = [f"Sheet: {sheet}"] if sheet is not None else []
+        lines.append(header_line)
+        lines.extend(group)
+        yield {
+            "content": "\n".join(lines),
+            "metadata": {
+                "source": source,
+                "sheet": sheet,
+                "first_row": first_row,
+                "last_row": first_row + len(group) - 1,
+            },
+        }
+        first_row += len(group)
+
+def iter_excel_documents(file, rows_per_document=100, columns=None, sheets=None):
+    """
+    Stream an Excel workbook as row-group documents.
+
+    The workbook is opened in read-only mode so rows are parsed lazily.
+
+    Args:
+        file (str): File path to the Excel workbook (.xlsx).
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+        sheets (list of str): Sheet names to read, or None for all sheets.
+
+    Yields:
+        dict: Documents with "content" and "metadata".
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for sheet_name in sheets or workbook.sheetnames:
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            yield from _iter_row_groups(rows, file, sheet_name, rows_per_document, columns)
+    finally:
+        workbook.close()
+
+def iter_xls_documents(file, rows_per_document=100, columns=None, sheets=None):
+    """
+    Stream a legacy Excel workbook (.xls) as row-group documents.
+
+    Each sheet is parsed in full with pandas before its rows are grouped, so memory
+    is bounded by the largest sheet rather than the whole workbook.
+
+    Args:
+        file (str): File path to the Excel workbook (.xls).
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+        sheets (list of str): Sheet names to read, or None for all sheets.
+
+    Yields:
+        dict: Documents with "content" and "metadata".
+    """
+    import pandas as pd
+    with pd.ExcelFile(file) as workbook:
+        for sheet_name in sheets or workbook.sheet_names:
+            frame = workbook.parse(sheet_name, header=None, dtype=object)
+            frame = frame.astype(object).where(frame.notna(), None)
+            rows = frame.itertuples(index=False, name=None)
+            yield from _iter_row_groups(rows, file, sheet_name, rows_per_document, columns)
+
+def iter_csv_documents(file, rows_per_document=100, columns=None, encoding="utf-8"):
+    """
+    Stream a CSV file as row-group documents.
+
+    Args:
+        file (str): File path to the CSV file.
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+        encoding (str): File encoding.
+
+    Yields:
+        dict: Documents with "content" and "metadata".
+    """
+    with open(file, "r", encoding=encoding, newline="") as f:
+        yield from _iter_row_groups(csv.reader(f), file, None, rows_per_document, columns)
+
+def iter_spreadsheet_documents(file, rows_per_document=100, columns=None):
+    """
+    Stream an Excel workbook or CSV file as row-group documents, chosen by extension.
+
+    Args:
+        file (str): File path to the spreadsheet.
+        rows_per_document (int): Number of data rows per document.
+        columns (list): Column names or zero-based indices to keep, or None for all columns.
+
+    Yields:
+        dict: Documents with "content" and "metadata".
+    """
+    extension = os.path.splitext(file)[1].lower()
+    if extension == ".csv":
+        return iter_csv_documents(file, rows_per_document, columns)
+    if extension in (".xlsx", ".xlsm"):
+        return iter_excel_documents(file, rows_per_document, columns)
+    if extension == ".xls":
+        return iter_xls_documents(file, rows_per_document, columns)
+    raise ValueError(f"Unsupported spreadsheet extension: {extension}")
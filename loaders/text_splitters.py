@@ -1,4 +1,12 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter, SentenceTextSplitter, ParagraphTextSplitter, TokenTextSplitter
+from embeddings.tokenizer_service import count_tokens, encode_offsets, max_tokens
+from utils.batching import batched
+from .chunk_spans import ChunkSpans
+from .splitter_engine import split_texts_multi, derive_chunk_spans, detect_boundaries, derive_spans
 
 def split_texts_recursive(texts, chunk_size=512, chunk_overlap=50):
     """
@@ -53,13 +61,210 @@ def split_texts_token(texts, chunk_size=512, chunk_overlap=50):
     Returns:
         list of str: List of text chunks.
     """
-    text_splitter = TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    text_splitter = _token_text_splitter(chunk_size, chunk_overlap)
     return text_splitter.split_texts(texts)
 
+@lru_cache(maxsize=None)
+def _token_text_splitter(chunk_size, chunk_overlap):
+    return TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def split_texts_model_tokens(texts, model_name, chunk_size=None, chunk_overlap=50, batch_size=256):
+    """
+    Split texts into chunks that fit the token limit of a specific embedding model.
+
+    Texts are tokenized in batches with the model's cached fast tokenizer and cut
+    on token offsets, so no chunk is truncated when it is embedded. Chunks whose
+    re-tokenized length still exceeds the limit are shortened token by token.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        model_name (str): Hugging Face model name of the embedding model.
+        chunk_size (int): Maximum tokens per chunk. Defaults to, and is capped at,
+            the model's input length minus its special tokens.
+        chunk_overlap (int): Number of tokens to overlap between chunks.
+        batch_size (int): Number of texts tokenized per call.
+
+    Returns:
+        ChunkSpans: Chunks as spans over the source texts.
+    """
+    limit = max_tokens(model_name)
+    chunk_size = min(chunk_size or limit, limit)
+    step = max(chunk_size - chunk_overlap, 1)
+    windows = []
+    doc_id = 0
+    for batch in batched(texts, batch_size):
+        for offsets in encode_offsets(batch, model_name):
+            count = len(offsets)
+            for first in range(0, max(count - chunk_overlap, 1) if count else 0, step):
+                windows.append((doc_id, offsets, first, min(first + chunk_size, count) - 1))
+            doc_id += 1
+
+    doc_ids = [window[0] for window in windows]
+    starts = [int(window[1][window[2], 0]) for window in windows]
+    ends = [int(window[1][window[3], 1]) for window in windows]
+    spans = ChunkSpans(texts, doc_ids, starts, ends)
+
+    counts = count_tokens(spans.materialize(), model_name)
+    for i in np.flatnonzero(counts > limit):
+        doc_id, offsets, first, last = windows[i]
+        while last > first and count_tokens([texts[doc_id][starts[i]:int(offsets[last, 1])]], model_name)[0] > limit:
+            last -= 1
+        spans.ends[i] = offsets[last, 1]
+    return spans
+
+def iter_split_texts(texts, chunk_size=512, chunk_overlap=50):
+    """
+    Lazily split a stream of texts into chunks using RecursiveCharacterTextSplitter.
+
+    Only one text is held at a time, so this can sit between a streaming loader
+    and a batched embedder.
+
+    Args:
+        texts (iterable of str): Text documents to split.
+        chunk_size (int): Maximum size of each chunk.
+        chunk_overlap (int): Number of characters to overlap between chunks.
+
+    Yields:
+        str: Text chunks, in document order.
+    """
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for text in texts:
+        yield from text_splitter.split_text(text)
+
+def split_texts_spans(texts, strategy="recursive", chunk_size=512, chunk_overlap=50):
+    """
+    Split texts into offset-based chunks instead of new strings.
+
+    Chunks are (doc id, start, end) spans over `texts` and are only turned into
+    strings when accessed, so overlapping chunks share the source text and keep
+    their exact offsets for citations.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        strategy (str): "recursive", "sentence", "paragraph" or "word" (see loaders.splitter_engine).
+        chunk_size (int): Maximum size of each chunk.
+        chunk_overlap (int): Overlap between chunks.
+
+    Returns:
+        ChunkSpans: Chunks as spans over the source texts.
+    """
+    return derive_chunk_spans(texts, (strategy,), chunk_size, chunk_overlap)[strategy]
+
+def _cut_point(text, start, target):
+    """
+    Find where to cut a long text near `start + target`, preferring a paragraph break.
+
+    Returns:
+        int: Offset of the cut, greater than `start`.
+    """
+    limit = start + target
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, start + 1, limit)
+        if cut != -1:
+            return cut + len(separator)
+    return limit
+
+SEGMENT_CHARS = 1 << 20
+
+def _shard_texts(texts, target_chars, segment_chars=SEGMENT_CHARS):
+    """
+    Group texts into contiguous shards of roughly `target_chars` characters.
+
+    Texts longer than `segment_chars` are first cut into segments at paragraph
+    breaks so that a single large document is spread over several shards. The
+    cut points only depend on `segment_chars`, never on `target_chars`, so the
+    chunks produced are the same however the segments are grouped into shards.
+
+    Args:
+        texts (list of str): Texts to shard.
+        target_chars (int): Target number of characters per shard.
+        segment_chars (int): Maximum length of a segment cut from a long text.
+
+    Returns:
+        list of list of tuple: Shards of (doc id, offset, segment text).
+    """
+    shards, shard, shard_chars = [], [], 0
+    for doc_id, text in enumerate(texts):
+        start = 0
+        while True:
+            end = len(text) if len(text) - start <= segment_chars else _cut_point(text, start, segment_chars)
+            shard.append((doc_id, start, text[start:end]))
+            shard_chars += end - start
+            if shard_chars >= target_chars:
+                shards.append(shard)
+                shard, shard_chars = [], 0
+            if end >= len(text):
+                break
+            start = end
+    if shard:
+        shards.append(shard)
+    return shards
+
+def _split_shard(segments, chunk_size, chunk_overlap):
+    """
+    Split the segments of one shard with the recursive strategy.
+
+    Runs inside a worker process and returns offsets only, relative to the original texts.
+
+    Returns:
+        tuple: (doc_ids, starts, ends) arrays.
+    """
+    doc_ids, starts, ends = [], [], []
+    for doc_id, offset, segment in segments:
+        segment_starts, segment_ends = derive_spans(detect_boundaries(segment), "recursive", chunk_size, chunk_overlap)
+        doc_ids.append(np.full(len(segment_starts), doc_id, dtype=np.int64))
+        starts.append(segment_starts + offset)
+        ends.append(segment_ends + offset)
+    return np.concatenate(doc_ids), np.concatenate(starts), np.concatenate(ends)
+
+def split_texts_parallel(texts, chunk_size=512, chunk_overlap=50, max_workers=None, shards_per_worker=4, segment_chars=SEGMENT_CHARS):
+    """
+    Split texts with the recursive strategy across a process pool.
+
+    Texts are sharded by character count rather than document count, and long
+    documents are cut at paragraph breaks, so one huge document does not become
+    the straggler. Chunks are returned in document order regardless of which
+    worker produced them; use ChunkSpans.chunk_ids for stable chunk ids.
+
+    Chunks never span a cut inside a long document, so results can differ from
+    a serial split at those cut points. Cuts are made every `segment_chars`
+    characters at most, independently of the number of workers, so the chunks
+    and their ids are the same for any `max_workers` or `shards_per_worker`.
+
+    Args:
+        texts (list of str): List of text documents to split.
+        chunk_size (int): Maximum size of each chunk.
+        chunk_overlap (int): Number of characters to overlap between chunks.
+        max_workers (int): Number of worker processes. Defaults to the CPU count.
+        shards_per_worker (int): Number of shards per worker, for load balancing.
+        segment_chars (int): Maximum length of a segment cut from a long document.
+
+    Returns:
+        ChunkSpans: Chunks as spans over the source texts.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    total_chars = sum(len(text) for text in texts)
+    target_chars = max(total_chars // (max_workers * shards_per_worker), chunk_size * 4, 1)
+    shards = _shard_texts(texts, target_chars, max(segment_chars, chunk_size * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_split_shard, shards, [chunk_size] * len(shards), [chunk_overlap] * len(shards)))
+    if not results:
+        return ChunkSpans(texts, [], [], [])
+    return ChunkSpans(
+        texts,
+        np.concatenate([doc_ids for doc_ids, _, _ in results]),
+        np.concatenate([starts for _, starts, _ in results]),
+        np.concatenate([ends for _, _, ends in results]),
+    )
+
 def handle_text_splitting(texts):
     """
     Handle text splitting for a given list of texts.
 
+    The recursive, sentence and paragraph chunks are derived from a single
+    boundary-detection pass over each text (see loaders.splitter_engine) instead
+    of one full pass per splitter; the token chunks still count model tokens.
+
     Args:
         texts (list of str): List of text documents to split.
 
@@ -67,17 +272,9 @@ def handle_text_splitting(texts):
         dict: Dictionary containing different types of text chunks.
     """
     try:
-        chunks_recursive = split_texts_recursive(texts)
-        chunks_sentence = split_texts_sentence(texts)
-        chunks_paragraph = split_texts_paragraph(texts)
-        chunks_token = split_texts_token(texts)
-        
-        return {
-            "recursive": chunks_recursive,
-            "sentence": chunks_sentence,
-            "paragraph": chunks_paragraph,
-            "token": chunks_token
-        }
+        chunks = split_texts_multi(texts, strategies=("recursive", "sentence", "paragraph"))
+        chunks["token"] = split_texts_token(texts)
+        return chunks
     except Exception as e:
         print(f"Error occurred during text splitting: {e}")
         return {}
@@ -1,26 +1,122 @@
 import os
-from loaders.document_loaders import load_documents, load_pdf, load_text
-from loaders.text_splitters import split_texts
-from embeddings.embedding_models import create_embeddings
-from vectorstores.vectorstores import create_vectorstore
+import time
+from loaders.document_loaders import (
+    LOADERS_BY_EXTENSION, load_documents, load_pdf, load_text, iter_documents, get_document_text, load_file
+)
+from loaders.deduplication import deduplicate_documents, prediction_text
+from loaders.text_splitters import split_texts_recursive, iter_split_texts
+from embeddings.embedding_models import create_embeddings, iter_embeddings
+from vectorstores.disk_store import integrate_disk_stream
+from vectorstores.snapshots import SnapshotManager
+from vectorstores.mutable_index import MutableIndex
+from vectorstores.live_index import LiveIndex
 from retrieval.retrievers import create_retriever
 from chains.conversational_chain import setup_conversational_chain, get_answer
+from utils.batching import batched, prefetch
 from utils.config import get_huggingface_api_key
 
-def setup_retrieval_chain(directory):
+def setup_retrieval_chain(directory, deduplicate=True, index_dir="index"):
     documents = load_documents(directory)
+    if deduplicate:
+        documents, report = deduplicate_documents(documents, key=prediction_text)
+        print(f"Dropped {report['duplicates']} near-duplicate documents (dedup ratio {report['dedup_ratio']:.1%})")
     texts = [doc['text'] for doc in documents]
-    chunks = split_texts(texts)
-    embeddings = create_embeddings(chunks, api_key=get_huggingface_api_key())
-    vectorstore, metadata = create_vectorstore(embeddings, chunks)
-    retriever = create_retriever(vectorstore, metadata)
+    chunks = split_texts_recursive(texts)
+    api_key = get_huggingface_api_key()
+    embeddings = create_embeddings(chunks, api_key=api_key)
+    vectorstore = integrate_disk_stream([(chunks, embeddings)], index_dir)
+    retriever = create_retriever(vectorstore, lambda query: create_embeddings([query], api_key=api_key)[0])
     return retriever
 
+def setup_retrieval_chain_streaming(directory, index_dir="stream_index", batch_size=64, max_pending_batches=2):
+    """
+    Build the retriever by streaming documents through loading, splitting, embedding and indexing.
+
+    Loader workers spill each file's pages or row groups to disk as they are read,
+    each stage runs ahead of the next by at most `max_pending_batches` batches, and
+    each indexed batch is written to disk, so memory stays bounded by the batch size
+    rather than the size of the largest file or of the corpus.
+
+    Args:
+        directory (str): Directory path containing documents.
+        index_dir (str): Directory the vectors and chunk texts are written to, batch by batch.
+        batch_size (int): Number of chunks embedded and indexed per batch.
+        max_pending_batches (int): Maximum number of batches buffered between stages.
+
+    Returns:
+        Retriever: Retriever over the indexed chunks.
+    """
+    api_key = get_huggingface_api_key()
+    texts = (get_document_text(doc) for doc in iter_documents(directory))
+    chunks = iter_split_texts(prefetch(texts, max_pending_batches))
+    chunk_batches = prefetch(batched(chunks, batch_size), max_pending_batches)
+    embedding_batches = iter_embeddings(chunk_batches, api_key=api_key)
+    vectorstore = integrate_disk_stream(prefetch(embedding_batches, max_pending_batches), index_dir)
+    retriever = create_retriever(vectorstore, lambda query: create_embeddings([query], api_key=api_key)[0])
+    return retriever
+
+def build_index(directory):
+    """
+    Load, split and embed a directory for publishing as an index snapshot.
+
+    Args:
+        directory (str): Directory path containing documents.
+
+    Returns:
+        tuple: (embeddings, chunks, metadata) ready for SnapshotManager.publish.
+    """
+    texts = [get_document_text(doc) for doc in iter_documents(directory)]
+    chunks = split_texts_recursive(texts)
+    embeddings = create_embeddings(chunks, api_key=get_huggingface_api_key())
+    return embeddings, chunks, None
+
+def reindex_in_background(directory, snapshot_root="index_snapshots"):
+    """
+    Rebuild the index snapshot in the background while queries keep using the current one.
+
+    Args:
+        directory (str): Directory path containing documents.
+        snapshot_root (str): Directory holding the index snapshots.
+
+    Returns:
+        tuple: (manager, future). The SnapshotManager serves the current snapshot, swaps to
+            the new one when the rebuild finishes and can roll back with `rollback()`. The
+            future resolves to the new version or raises the build error, which is also
+            logged and kept in `manager.build_error`.
+    """
+    manager = SnapshotManager(snapshot_root)
+    future = manager.rebuild_async(lambda: build_index(directory))
+    return manager, future
+
+def start_live_index(directories=("uploads", "data"), dimension=768):
+    """
+    Serve an in-memory index that picks up new and changed files while the app runs.
+
+    Args:
+        directories (list of str): Folders to watch.
+        dimension (int): Embedding dimension of the embedding model.
+
+    Returns:
+        LiveIndex: Running live index; query it with `search` and stop it with `stop`.
+    """
+    api_key = get_huggingface_api_key()
+    live_index = LiveIndex(
+        MutableIndex(dimension),
+        chunk_file=lambda path: list(iter_split_texts(get_document_text(doc) for doc in load_file(path))),
+        embed_fn=lambda chunks: create_embeddings(chunks, api_key=api_key),
+        directories=directories,
+        extensions=set(LOADERS_BY_EXTENSION),
+    )
+    # Files already present are ingested as if they had just been created.
+    live_index.apply({path: {"event": "created", "detected": time.time()} for path in live_index.watcher.scan()})
+    live_index.start()
+    return live_index
+
 if __name__ == "__main__":
     directory = 'readme_files'
     retriever = setup_retrieval_chain(directory)
     conversational_chain = setup_conversational_chain(retriever)
-    
+
     question = "What is the purpose of this project?"
     answer = get_answer(question, conversational_chain)
     print(answer)
@@ -0,0 +1,182 @@
+"""
+Two-stage vector search: binary-quantized prefilter, full-precision rerank.
+
+Stage one keeps one bit per dimension in memory: the sign of each component
+after subtracting the corpus mean. Queries are binarized the same way and
+compared by Hamming distance over packed 64-bit words with a popcount, which
+shortlists `rerank_factor * k` candidates. Stage two reads only those rows
+from a memory-mapped float32 file and reranks them by exact dot product.
+
+The in-memory tier is 32 times smaller than the float32 matrix, and the
+full-precision file is touched only for the shortlisted rows.
+
+Layout of a saved index:
+
+    <directory>/codes.npy     packed sign bits, shape (n, words), uint64
+    <directory>/center.npy    per-dimension mean subtracted before binarizing
+    <directory>/vectors.npy   full-precision float32 embeddings
+"""
+
+import os
+import numpy as np
+from .metrics import recall_at_k
+from .search_kernels import inner_product_scores, top_k
+
+# Bits set in each byte value, for NumPy versions without np.bitwise_count.
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+def popcount(words):
+    """
+    Count the set bits of each element of a uint64 array.
+
+    Args:
+        words (np.ndarray): Array of np.uint64.
+
+    Returns:
+        np.ndarray: Bit counts with the same shape, as np.uint8.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    counts = _POPCOUNT_TABLE[words.view(np.uint8)]
+    return counts.reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+def binarize(embeddings, center):
+    """
+    Pack the signs of centered embeddings into 64-bit words.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        center (np.ndarray): Per-dimension value subtracted before taking signs.
+
+    Returns:
+        np.ndarray: Codes of shape (n, ceil(dim / 64)), dtype np.uint64.
+    """
+    bits = np.packbits(np.atleast_2d(embeddings) > center, axis=1)
+    padding = -bits.shape[1] % 8
+    if padding:
+        bits = np.pad(bits, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+def hamming_distances(query_codes, codes):
+    """
+    Compute Hamming distances between binary query codes and corpus codes.
+
+    Args:
+        query_codes (np.ndarray): Codes of shape (q, words).
+        codes (np.ndarray): Codes of shape (n, words).
+
+    Returns:
+        np.ndarray: Distances of shape (q, n), dtype np.int32.
+    """
+    distances = np.empty((len(query_codes), len(codes)), dtype=np.int32)
+    for i, query_code in enumerate(query_codes):
+        distances[i] = popcount(np.bitwise_xor(codes, query_code)).sum(axis=1, dtype=np.int32)
+    return distances
+
+class BinaryIndex:
+    """
+    Binary prefilter with full-precision rerank from a memory-mapped file.
+
+    Use BinaryIndex.build to create an index from embeddings and BinaryIndex.load to open one.
+
+    Args:
+        directory (str): Directory holding codes.npy, center.npy and vectors.npy.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.codes = np.load(os.path.join(directory, "codes.npy"))
+        self.center = np.load(os.path.join(directory, "center.npy"))
+        self.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+
+    @classmethod
+    def build(cls, embeddings, directory):
+        """
+        Write the binary codes and the full-precision file, then open the index.
+
+        Args:
+            embeddings (np.ndarray): Embeddings of shape (n, dim).
+            directory (str): Output directory.
+
+        Returns:
+            BinaryIndex: The opened index.
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        os.makedirs(directory, exist_ok=True)
+        center = embeddings.mean(axis=0)
+        np.save(os.path.join(directory, "vectors.npy"), embeddings)
+        np.save(os.path.join(directory, "center.npy"), center)
+        np.save(os.path.join(directory, "codes.npy"), binarize(embeddings, center))
+        return cls(directory)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Open an index written by build.
+
+        Args:
+            directory (str): Index directory.
+
+        Returns:
+            BinaryIndex: The opened index.
+        """
+        return cls(directory)
+
+    def search(self, queries, k=4, rerank_factor=10):
+        """
+        Return the top-k rows by dot product, reranked from a binary shortlist.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            k (int): Number of results per query.
+            rerank_factor (int): Shortlist size as a multiple of k.
+
+        Returns:
+            tuple: (indices, scores), each of shape (q, k), highest score first.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        shortlist, _ = top_k(hamming_distances(binarize(queries, self.center), self.codes), k * rerank_factor)
+        indices, scores = [], []
+        for query, candidates in zip(queries, shortlist):
+            # Sorted reads keep the memory-mapped access sequential.
+            candidates = np.sort(candidates)
+            best, best_scores = top_k(inner_product_scores(query, self.vectors[candidates]), k, largest=True)
+            indices.append(candidates[best[0]])
+            scores.append(best_scores[0])
+        return np.array(indices), np.array(scores)
+
+    def exact_search(self, queries, k=4):
+        """
+        Return the exact top-k rows by dot product over the full-precision file.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            k (int): Number of results per query.
+
+        Returns:
+            tuple: (indices, scores), each of shape (q, k), highest score first.
+        """
+        return top_k(inner_product_scores(np.asarray(queries, dtype=np.float32), self.vectors), k, largest=True)
+
+    def evaluate_recall(self, queries, k=10, rerank_factor=10):
+        """
+        Measure the recall of two-stage search against exact search.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+            rerank_factor (int): Shortlist size as a multiple of k.
+
+        Returns:
+            dict: "recall_at_k", "k", "rerank_factor" and the memory of the binary tier
+                ("code_bytes") against the full-precision matrix ("vector_bytes").
+        """
+        approximate, _ = self.search(queries, k, rerank_factor)
+        exact, _ = self.exact_search(queries, k)
+        return {
+            "recall_at_k": recall_at_k(approximate, exact),
+            "k": k,
+            "rerank_factor": rerank_factor,
+            "code_bytes": self.codes.nbytes,
+            "vector_bytes": self.vectors.nbytes,
+        }
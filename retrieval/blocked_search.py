@@ -0,0 +1,87 @@
+"""
+Exact top-k search over embedding files larger than memory.
+
+The embedding file is memory-mapped and scored in fixed-size row blocks: each
+block is read once, scored against the whole batch of queries with one
+matrix multiplication, and reduced to its own top-k with argpartition. A
+running top-k per query is merged with each block's top-k the same way, so
+memory holds only a few blocks and a (q, k) result at any time.
+
+Blocks are scored on a thread pool; NumPy releases the GIL inside the matrix
+multiplication, so reads and scoring overlap across blocks. At most
+`max_in_flight` blocks are submitted at once, which bounds memory use.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from .search_kernels import squared_norms, squared_l2_distances, inner_product_scores, top_k
+
+def _score_block(vectors, start, end, queries, k, metric):
+    """
+    Score one block of rows and return its top-k with global row indices.
+    """
+    block = np.asarray(vectors[start:end], dtype=np.float32)
+    if metric == "l2":
+        indices, values = top_k(squared_l2_distances(queries, block, squared_norms(block)), k)
+    else:
+        indices, values = top_k(inner_product_scores(queries, block), k, largest=True)
+    return indices + start, values
+
+def _merge(best, block_best, k, largest):
+    """
+    Merge two per-query top-k results into one.
+    """
+    if best is None:
+        return block_best
+    indices = np.concatenate([best[0], block_best[0]], axis=1)
+    values = np.concatenate([best[1], block_best[1]], axis=1)
+    order, merged_values = top_k(values, k, largest=largest)
+    return np.take_along_axis(indices, order, axis=1), merged_values
+
+def blocked_search(embeddings, queries, k=4, metric="l2", block_size=262144, max_workers=None, max_in_flight=None):
+    """
+    Exact top-k search streaming the embedding matrix in blocks.
+
+    Args:
+        embeddings (str or np.ndarray): Path of a `.npy` file, memory-mapped, or an array
+            (including an np.memmap) of shape (n, dim).
+        queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+        k (int): Number of results per query.
+        metric (str): "l2" (squared L2 distance, smallest first) or "ip" (inner product, largest first).
+        block_size (int): Rows scored per block.
+        max_workers (int): Threads scoring blocks. Defaults to the CPU count.
+        max_in_flight (int): Maximum blocks submitted but not yet merged.
+            Defaults to twice the number of workers.
+
+    Returns:
+        tuple: (indices, scores), each of shape (q, min(k, n)), best first.
+    """
+    if metric not in ("l2", "ip"):
+        raise ValueError(f"Unknown metric: {metric}. Use 'l2' or 'ip'.")
+    vectors = np.load(embeddings, mmap_mode="r") if isinstance(embeddings, str) else embeddings
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * max_workers
+    largest = metric == "ip"
+
+    best = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for start in range(0, len(vectors), block_size):
+            end = min(start + block_size, len(vectors))
+            pending.add(executor.submit(_score_block, vectors, start, end, queries, k, metric))
+            if len(pending) < max_in_flight:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                best = _merge(best, future.result(), k, largest)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                best = _merge(best, future.result(), k, largest)
+
+    if best is None:
+        empty = np.zeros((len(queries), 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    return best
@@ -0,0 +1,18 @@
+import numpy as np
+
+def recall_at_k(approximate_indices, exact_indices):
+    """
+    Compute the mean share of the exact top-k that an approximate search returned.
+
+    Args:
+        approximate_indices (array-like): Indices returned per query, shape (q, k).
+        exact_indices (array-like): Exact top-k indices per query, shape (q, k).
+
+    Returns:
+        float: Recall@k averaged over queries, between 0 and 1.
+    """
+    recalls = [
+        len(set(np.asarray(approx).tolist()) & set(np.asarray(exact).tolist())) / max(len(exact), 1)
+        for approx, exact in zip(approximate_indices, exact_indices)
+    ]
+    return float(np.mean(recalls)) if recalls else 0.0
@@ -15,6 +15,10 @@ Advanced Retrieval Types:
 - Ensemble: Combines multiple retrieval methods.
 - Long-Context Reorder: Reorders retrieved documents for long-context models.
 
+search_batch retrieves for many queries at once, embedding them with the model's
+query embedding (batched where that gives the same vectors) and using each
+store's batched search where it has one.
+
 Dependencies:
 - faiss
 - pinecone
@@ -24,9 +28,13 @@ Dependencies:
 - lancedb
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from langchain.vectorstores import FAISS, Pinecone, Weaviate, Milvus, Chroma, LanceDB
 from langchain.embeddings import OpenAIEmbeddings
+from typing import Any
+from langchain.schema import BaseRetriever, Document
+from utils.lazy_imports import get_backend
 
 # FAISS Retrieval
 def faiss_retrieval(documents, query, embedding_model):
@@ -266,6 +274,157 @@ def lance_retrieval(documents, query, embedding_model, lance_path):
     return results
 
 
+# Retriever over the repo's indexes
+class IndexRetriever(BaseRetriever):
+    """
+    LangChain retriever over an index with a `search(query_embedding, k)` method,
+    such as DiskVectorStore, MutableIndex or SnapshotManager.
+
+    Args:
+        index: Index whose search returns dicts with "text", "distance" and optional "metadata".
+        embed_query (callable): Function taking a query string and returning its embedding.
+        k (int): Number of documents per query.
+    """
+
+    index: Any
+    embed_query: Any
+    k: int = 4
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        query_embedding = np.asarray(self.embed_query(query), dtype=np.float32)
+        return [
+            Document(page_content=hit["text"], metadata={**(hit.get("metadata") or {}), "distance": hit["distance"]})
+            for hit in self.index.search(query_embedding, self.k)
+        ]
+
+def create_retriever(index, embed_query, k=4):
+    """
+    Create a LangChain retriever over one of the repo's indexes.
+
+    Args:
+        index: Index with a `search(query_embedding, k)` method, e.g. a DiskVectorStore.
+        embed_query (callable): Function taking a query string and returning its embedding.
+        k (int): Number of documents per query.
+
+    Returns:
+        IndexRetriever: Retriever usable by setup_conversational_chain.
+    """
+    return IndexRetriever(index=index, embed_query=embed_query, k=k)
+
+
+# Batched Retrieval
+# Embedding classes whose embed_query is embed_documents on a single text, so queries can share one call.
+SYMMETRIC_EMBEDDINGS = ("OpenAIEmbeddings", "AzureOpenAIEmbeddings", "HuggingFaceEmbeddings")
+
+def embed_queries(embedding_model, queries, max_workers=8):
+    """
+    Embed several queries with the model's query embedding.
+
+    Models with a query instruction (e.g. BGE) embed queries differently from
+    documents, so embed_documents cannot be used as-is. The queries are embedded in
+    one call where that gives the same vectors as embed_query: through the model's
+    own embed_queries, by prefixing the query instruction, or directly for models in
+    SYMMETRIC_EMBEDDINGS. Any other model runs embed_query per query on a thread pool.
+
+    Args:
+        embedding_model: LangChain embedding model.
+        queries (list of str): Query strings.
+        max_workers (int): Threads used when the queries must be embedded one by one.
+
+    Returns:
+        np.ndarray: Query vectors of shape (len(queries), dim).
+    """
+    queries = list(queries)
+    if hasattr(embedding_model, "embed_queries"):
+        vectors = embedding_model.embed_queries(queries)
+    elif hasattr(embedding_model, "query_instruction") and not hasattr(embedding_model, "embed_instruction"):
+        vectors = embedding_model.embed_documents([embedding_model.query_instruction + query for query in queries])
+    elif type(embedding_model).__name__ in SYMMETRIC_EMBEDDINGS:
+        vectors = embedding_model.embed_documents(queries)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            vectors = list(executor.map(embedding_model.embed_query, queries))
+    return np.asarray(vectors, dtype=np.float32)
+
+def _faiss_search_batch(store, query_vectors, k):
+    """
+    Search all queries with one FAISS index.search call.
+
+    Query vectors are normalized like LangChain's FAISS does when the store
+    normalizes its vectors. The raw index ranks by L2 distance or inner product, so
+    stores with another distance strategy are searched per query through LangChain.
+    """
+    if getattr(store, "distance_strategy", "EUCLIDEAN_DISTANCE") not in ("EUCLIDEAN_DISTANCE", "MAX_INNER_PRODUCT"):
+        return [store.similarity_search_by_vector(vector.tolist(), k=k) for vector in query_vectors]
+    query_vectors = np.array(query_vectors, dtype=np.float32)
+    if getattr(store, "_normalize_L2", False):
+        get_backend("faiss").normalize_L2(query_vectors)
+    _, indices = store.index.search(query_vectors, k)
+    return [
+        [store.docstore.search(store.index_to_docstore_id[i]) for i in row if i != -1]
+        for row in indices.tolist()
+    ]
+
+def _chroma_search_batch(store, query_vectors, k):
+    """
+    Search all queries with one Chroma collection.query call.
+
+    LangChain's Chroma wrapper only searches one vector per call, so this goes
+    through its `_collection` attribute, the underlying chromadb Collection. If a
+    LangChain version no longer has it, the queries are searched one by one.
+    """
+    collection = getattr(store, "_collection", None)
+    if collection is None:
+        return [store.similarity_search_by_vector(vector.tolist(), k=k) for vector in query_vectors]
+    results = collection.query(
+        query_embeddings=query_vectors.tolist(), n_results=k, include=["documents", "metadatas"]
+    )
+    return [
+        [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)]
+        for texts, metadatas in zip(results["documents"], results["metadatas"])
+    ]
+
+def search_batch(vectorstore, queries, embedding_model, k=4, max_workers=8, **search_kwargs):
+    """
+    Retrieve for many queries at once.
+
+    The queries are embedded with embed_queries. FAISS and Chroma stores then
+    search every query in one batched call, as do the repo's own indexes
+    (MutableIndex, SnapshotManager, FilteredVectorIndex, PartitionedIndex,
+    DiskVectorStore) through their search_batch method. Other stores (Pinecone,
+    Weaviate, Milvus, LanceDB) search the query vectors concurrently on a thread pool.
+
+    Args:
+        vectorstore: LangChain vector store, e.g. one built by the functions above, or
+            an index with a search_batch method.
+        queries (list of str): Query strings.
+        embedding_model: Model for generating embeddings.
+        k (int): Number of results per query.
+        max_workers (int): Threads used by stores without a batched search.
+        **search_kwargs: Passed to the search_batch method of an index, e.g. filter or scope.
+
+    Returns:
+        list of list: Retrieved documents, or result dicts for the repo's indexes, for each
+            query in query order.
+    """
+    if not queries:
+        return []
+    query_vectors = embed_queries(embedding_model, queries, max_workers)
+    if isinstance(vectorstore, FAISS):
+        return _faiss_search_batch(vectorstore, query_vectors, k)
+    if isinstance(vectorstore, Chroma):
+        return _chroma_search_batch(vectorstore, query_vectors, k)
+    if hasattr(vectorstore, "search_batch"):
+        return vectorstore.search_batch(query_vectors, k, **search_kwargs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda vector: vectorstore.similarity_search_by_vector(vector.tolist(), k=k), query_vectors
+        ))
+
+
 # Example Usage
 if __name__ == "__main__":
     documents = ["Document 1 text", "Document 2 text", "Document 3 text"]
@@ -295,3 +454,8 @@ if __name__ == "__main__":
     # Perform LanceDB retrieval
     lance_results = lance_retrieval(documents, query, embedding_model, lance_path="/tmp/lancedb")
     print("LanceDB Results:", lance_results)
+
+    # Retrieve for several queries in one batch
+    faiss_store = FAISS.from_texts(documents, embedding_model)
+    batch_results = search_batch(faiss_store, ["Sample query", "Another query"], embedding_model, k=2)
+    print("Batched FAISS Results:", batch_results)
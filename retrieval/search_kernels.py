@@ -0,0 +1,78 @@
+"""
+NumPy kernels for exact vector search.
+
+Distances are computed for a block of queries at once with one matrix
+multiplication, and the k best rows are selected with argpartition, which is
+linear in the number of candidates, before sorting only those k.
+"""
+
+import numpy as np
+
+def squared_norms(vectors):
+    """
+    Return the squared L2 norm of each row.
+
+    Args:
+        vectors (np.ndarray): Array of shape (n, dim).
+
+    Returns:
+        np.ndarray: Array of shape (n,).
+    """
+    return np.einsum("ij,ij->i", vectors, vectors)
+
+def squared_l2_distances(queries, vectors, vector_sq_norms=None):
+    """
+    Compute squared L2 distances between queries and vectors, as FAISS IndexFlatL2 reports them.
+
+    Args:
+        queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+        vectors (np.ndarray): Candidate vectors of shape (n, dim).
+        vector_sq_norms (np.ndarray): Precomputed squared norms of `vectors`.
+
+    Returns:
+        np.ndarray: Distances of shape (q, n).
+    """
+    queries = np.atleast_2d(queries)
+    if vector_sq_norms is None:
+        vector_sq_norms = squared_norms(vectors)
+    distances = squared_norms(queries)[:, None] - 2.0 * (queries @ vectors.T) + vector_sq_norms[None, :]
+    return np.maximum(distances, 0.0, out=distances)
+
+def inner_product_scores(queries, vectors):
+    """
+    Compute inner products between queries and vectors.
+
+    Args:
+        queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+        vectors (np.ndarray): Candidate vectors of shape (n, dim).
+
+    Returns:
+        np.ndarray: Scores of shape (q, n).
+    """
+    return np.atleast_2d(queries) @ vectors.T
+
+def top_k(scores, k, largest=False):
+    """
+    Select the k best entries of each row of a score matrix.
+
+    Args:
+        scores (np.ndarray): Scores of shape (q, n).
+        k (int): Number of entries to select; capped at n.
+        largest (bool): Select the largest scores (similarities) instead of the smallest (distances).
+
+    Returns:
+        tuple: (indices, values), each of shape (q, min(k, n)) and ordered best first.
+    """
+    scores = np.atleast_2d(scores)
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+    keyed = -scores if largest else scores
+    if k < scores.shape[1]:
+        candidates = np.argpartition(keyed, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), keyed.shape)
+    order = np.argsort(np.take_along_axis(keyed, candidates, axis=1), axis=1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(scores, indices, axis=1)
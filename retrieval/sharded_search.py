@@ -0,0 +1,247 @@
+"""
+Sharded multi-process exact vector search.
+
+The embedding matrix (for example the output of `create_embeddings`) is
+placed once in shared memory, or saved as a `.npy` file, and split into
+contiguous row ranges. Each worker process maps only its own shard, with no
+copy, and keeps it for the lifetime of the service. The coordinator scatters
+a batch of queries to every worker and gathers each shard's sorted top-k,
+then merges them with a heap.
+
+Messages are plain tuples of NumPy arrays and ints:
+
+    request:  ("search", request_id, queries, k)
+    reply:    (request_id, shard_id, indices, distances, error)
+
+Indices in a reply are global row numbers, so the coordinator never needs to
+know how shards are laid out. A transport other than multiprocessing queues
+(for example sockets between nodes) only needs to carry these tuples.
+
+Searches from several threads run concurrently: a collector thread routes each
+reply to the search that sent the request, by request id. A search waits at
+most `timeout` seconds and checks that every worker is alive while it waits;
+a worker that died is restarted on its shard and the search raises instead of
+hanging.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from .search_kernels import squared_norms, squared_l2_distances, top_k
+
+def _open_shard(source, shape, start, end):
+    """
+    Map rows [start, end) of the embedding matrix without copying.
+
+    Returns:
+        tuple: (shard array, SharedMemory handle or None).
+    """
+    if source.endswith(".npy"):
+        return np.load(source, mmap_mode="r")[start:end], None
+    shm = shared_memory.SharedMemory(name=source)
+    return np.ndarray(shape, dtype=np.float32, buffer=shm.buf)[start:end], shm
+
+def _shard_worker(shard_id, source, shape, start, end, requests, replies):
+    """
+    Serve search requests over one shard until a None request arrives.
+    """
+    shard, shm = _open_shard(source, shape, start, end)
+    sq_norms = squared_norms(shard)
+    try:
+        for message in iter(requests.get, None):
+            _, request_id, queries, k = message
+            try:
+                indices, distances = top_k(squared_l2_distances(queries, shard, sq_norms), k)
+                replies.put((request_id, shard_id, indices + start, distances, None))
+            except Exception as e:
+                replies.put((request_id, shard_id, None, None, f"{type(e).__name__}: {e}"))
+    finally:
+        del shard
+        if shm is not None:
+            shm.close()
+
+def merge_top_k(shard_results, k):
+    """
+    Merge per-shard top-k results into the global top-k.
+
+    Args:
+        shard_results (list of tuple): (indices, distances) per shard, each of shape
+            (num_queries, k_shard) and sorted nearest first.
+        k (int): Number of results per query.
+
+    Returns:
+        tuple: (indices, distances), each a list with one list per query.
+    """
+    merged_indices, merged_distances = [], []
+    for q in range(len(shard_results[0][0])):
+        streams = [zip(distances[q].tolist(), indices[q].tolist()) for indices, distances in shard_results]
+        best = list(itertools.islice(heapq.merge(*streams), k))
+        merged_distances.append([distance for distance, _ in best])
+        merged_indices.append([index for _, index in best])
+    return merged_indices, merged_distances
+
+class ShardedSearchService:
+    """
+    Exact L2 search across worker processes, one shard of rows per worker.
+
+    Args:
+        embeddings (np.ndarray or str): Embedding matrix of shape (n, dim), copied once into
+            shared memory, or the path of a `.npy` file that workers memory-map.
+        num_shards (int): Number of worker processes. Defaults to the CPU count.
+        timeout (float): Default number of seconds a search waits for every shard.
+    """
+
+    def __init__(self, embeddings, num_shards=None, timeout=30.0):
+        self._shm = None
+        if isinstance(embeddings, str):
+            source = embeddings
+            shape = np.load(embeddings, mmap_mode="r").shape
+        else:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            shape = embeddings.shape
+            self._shm = shared_memory.SharedMemory(create=True, size=max(embeddings.nbytes, 1))
+            np.ndarray(shape, dtype=np.float32, buffer=self._shm.buf)[:] = embeddings
+            source = self._shm.name
+        self.shape = shape
+        self.timeout = timeout
+
+        num_shards = max(1, min(num_shards or os.cpu_count() or 1, shape[0]))
+        bounds = np.linspace(0, shape[0], num_shards + 1).astype(int)
+        self._context = multiprocessing.get_context()
+        self._replies = self._context.Queue()
+        self._shard_args = [
+            (shard_id, source, shape, int(bounds[shard_id]), int(bounds[shard_id + 1]))
+            for shard_id in range(num_shards)
+        ]
+        self._requests = [None] * num_shards
+        self._workers = [None] * num_shards
+        for shard_id in range(num_shards):
+            self._start_worker(shard_id)
+
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._collector = threading.Thread(target=self._collect_replies, daemon=True)
+        self._collector.start()
+
+    def _start_worker(self, shard_id):
+        """
+        Start (or restart) the worker process of a shard with a fresh request queue.
+        """
+        requests = self._context.Queue()
+        worker = self._context.Process(
+            target=_shard_worker, args=(*self._shard_args[shard_id], requests, self._replies), daemon=True,
+        )
+        worker.start()
+        self._requests[shard_id] = requests
+        self._workers[shard_id] = worker
+
+    def _collect_replies(self):
+        """
+        Route each reply to the queue of the search waiting for it, until a None reply arrives.
+        """
+        for reply in iter(self._replies.get, None):
+            with self._lock:
+                waiter = self._pending.get(reply[0])
+            # Replies to searches that already timed out are dropped.
+            if waiter is not None:
+                waiter.put(reply)
+
+    def _restart_dead_workers(self):
+        """
+        Restart the workers that are no longer alive.
+
+        Returns:
+            list of int: Shard ids whose worker had died.
+        """
+        with self._lock:
+            dead = [shard_id for shard_id, worker in enumerate(self._workers) if not worker.is_alive()]
+            for shard_id in dead:
+                self._start_worker(shard_id)
+        return dead
+
+    def search(self, queries, k=4, timeout=None):
+        """
+        Search a batch of queries on every shard and merge the results.
+
+        Safe to call from several threads; their requests are served concurrently.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            k (int): Number of results per query.
+            timeout (float): Seconds to wait for every shard. Defaults to the service timeout.
+
+        Returns:
+            tuple: (indices, distances), each a list with one list of up to k entries per
+                query, nearest first. Distances are squared L2, as FAISS IndexFlatL2 reports them.
+
+        Raises:
+            TimeoutError: If a shard did not reply in time.
+            RuntimeError: If a shard failed or its worker died; a dead worker is restarted.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        replies = queue.Queue()
+        with self._lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = replies
+            for requests in self._requests:
+                requests.put(("search", request_id, queries, k))
+        results, errors = {}, []
+        try:
+            while len(results) + len(errors) < len(self._requests):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    missing = sorted(set(range(len(self._requests))) - set(results))
+                    raise TimeoutError(f"Sharded search timed out waiting for shards {missing}")
+                try:
+                    _, shard_id, indices, distances, error = replies.get(timeout=min(remaining, 0.5))
+                except queue.Empty:
+                    dead = self._restart_dead_workers()
+                    if dead:
+                        raise RuntimeError(f"Sharded search failed: workers of shards {dead} died and were restarted")
+                    continue
+                if error:
+                    errors.append(f"shard {shard_id}: {error}")
+                else:
+                    results[shard_id] = (indices, distances)
+        finally:
+            with self._lock:
+                del self._pending[request_id]
+        if errors:
+            raise RuntimeError(f"Sharded search failed on {'; '.join(errors)}")
+        return merge_top_k([results[shard_id] for shard_id in sorted(results)], k)
+
+    def close(self, timeout=5.0):
+        """
+        Stop the worker processes and release the shared memory.
+
+        Args:
+            timeout (float): Seconds to wait for each worker before terminating it.
+        """
+        for requests in self._requests:
+            requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._replies.put(None)
+        self._collector.join()
+        self._requests, self._workers = [], []
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
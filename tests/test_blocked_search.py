@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from retrieval.blocked_search import blocked_search
+from retrieval.search_kernels import inner_product_scores, squared_l2_distances, top_k
+
+def _data(count=1000, dimension=16, queries=7, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.standard_normal((count, dimension)).astype(np.float32),
+        rng.standard_normal((queries, dimension)).astype(np.float32),
+    )
+
+@pytest.mark.parametrize("metric", ["l2", "ip"])
+@pytest.mark.parametrize("block_size,max_workers", [(1000, 1), (97, 1), (64, 4), (1, 2)])
+def test_blocked_search_matches_a_full_scan(metric, block_size, max_workers):
+    vectors, queries = _data()
+    if metric == "l2":
+        expected = top_k(squared_l2_distances(queries, vectors), 10)
+    else:
+        expected = top_k(inner_product_scores(queries, vectors), 10, largest=True)
+    indices, scores = blocked_search(vectors, queries, k=10, metric=metric, block_size=block_size, max_workers=max_workers)
+    np.testing.assert_array_equal(indices, expected[0])
+    np.testing.assert_allclose(scores, expected[1], rtol=1e-5, atol=1e-4)
+
+def test_blocked_search_reads_a_memory_mapped_file(tmp_path):
+    vectors, queries = _data(count=300)
+    path = str(tmp_path / "vectors.npy")
+    np.save(path, vectors)
+    indices, _ = blocked_search(path, queries[0], k=3, block_size=50)
+    np.testing.assert_array_equal(indices, top_k(squared_l2_distances(queries[:1], vectors), 3)[0])
+
+def test_blocked_search_caps_k_and_handles_an_empty_matrix():
+    vectors, queries = _data(count=5)
+    indices, scores = blocked_search(vectors, queries, k=10, block_size=2)
+    assert indices.shape == scores.shape == (len(queries), 5)
+    indices, scores = blocked_search(np.zeros((0, 16), dtype=np.float32), queries, k=3)
+    assert indices.shape == (len(queries), 0)
+    with pytest.raises(ValueError):
+        blocked_search(vectors, queries, metric="cosine")
@@ -0,0 +1,170 @@
+import json
+import threading
+import types
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+from vectorstores.bulk_ingest import bulk_ingest, raise_for_failures
+
+class _StubVectorServer(ThreadingHTTPServer):
+    """
+    Local HTTP server standing in for a vector database's upsert endpoint.
+
+    Rejects the first `failures` requests with a 503, then stores every vector it receives.
+    """
+
+    def __init__(self, failures=0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.failures = failures
+        self.requests = 0
+        self.vectors = {}
+        self.lock = threading.Lock()
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            reject = self.server.requests <= self.server.failures
+            if not reject:
+                self.server.vectors.update(zip(body["ids"], body["vectors"]))
+        self.send_response(503 if reject else 200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(failures=0):
+        server = _StubVectorServer(failures)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def _http_writer(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/upsert"
+
+    def write_batch(ids, vectors):
+        data = json.dumps({"ids": ids, "vectors": vectors.tolist()}).encode("utf-8")
+        request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(request, timeout=5).close()
+
+    return write_batch
+
+def test_bulk_ingest_writes_every_vector_over_http(stub_server):
+    server = stub_server()
+    embeddings = np.random.default_rng(0).random((1000, 8), dtype=np.float32)
+    report = bulk_ingest(embeddings, _http_writer(server), batch_size=64, max_in_flight=4)
+    raise_for_failures(report)
+    assert report["vectors"] == 1000
+    assert report["batches"] == 16
+    assert sorted(server.vectors, key=int) == [str(i) for i in range(1000)]
+    assert np.allclose(server.vectors["123"], embeddings[123])
+
+def test_bulk_ingest_retries_failed_batches(stub_server):
+    server = stub_server(failures=3)
+    embeddings = np.random.default_rng(1).random((100, 4), dtype=np.float32)
+    report = bulk_ingest(embeddings, _http_writer(server), batch_size=10, max_in_flight=2, retry_backoff=0.01)
+    assert report["failed_batches"] == []
+    assert report["retries"] == 3
+    assert len(server.vectors) == 100
+
+def test_bulk_ingest_reports_batches_that_keep_failing(stub_server):
+    server = stub_server(failures=10**6)
+    embeddings = np.zeros((30, 4), dtype=np.float32)
+    report = bulk_ingest(embeddings, _http_writer(server), batch_size=10, max_retries=1, retry_backoff=0.01)
+    assert report["vectors"] == 0
+    assert sorted(failure["start"] for failure in report["failed_batches"]) == [0, 10, 20]
+    with pytest.raises(RuntimeError):
+        raise_for_failures(report)
+
+def test_bulk_ingest_into_local_chroma():
+    chromadb = pytest.importorskip("chromadb")
+    collection = chromadb.EphemeralClient().get_or_create_collection("bulk-ingest-test")
+    embeddings = np.random.default_rng(2).random((500, 16), dtype=np.float32)
+
+    def write_batch(ids, vectors):
+        collection.add(ids=ids, embeddings=vectors)
+
+    report = bulk_ingest(embeddings, write_batch, batch_size=100, max_in_flight=4)
+    raise_for_failures(report)
+    assert collection.count() == 500
+    stored = collection.get(ids=["42"], include=["embeddings"])["embeddings"]
+    assert np.allclose(stored[0], embeddings[42])
+
+class _FakeWeaviateResponse:
+    def __init__(self, results):
+        self.results = results
+
+    def json(self):
+        return self.results
+
+class _FakeObjectsBatchRequest:
+    """
+    Mirrors weaviate-client 3.x: add(class_name, data_object, uuid=None, vector=None, tenant=None).
+    """
+
+    def __init__(self):
+        self.objects = []
+
+    def add(self, class_name, data_object, uuid=None, vector=None, tenant=None):
+        self.objects.append({"class": class_name, "properties": data_object, "id": uuid, "vector": vector})
+
+class _FakeWeaviateBatch:
+    def __init__(self, reject=()):
+        self.stored = {}
+        self.reject = set(reject)
+        self.lock = threading.Lock()
+
+    def create_objects(self):
+        raise AssertionError("integrate_weaviate must not send the client's shared batch buffer")
+
+    def _create_data(self, data_type, request):
+        assert data_type == "objects"
+        results = []
+        with self.lock:
+            for obj in request.objects:
+                if obj["id"] in self.reject:
+                    results.append({"id": obj["id"], "result": {"errors": {"error": [{"message": "rejected"}]}}})
+                else:
+                    self.stored[obj["id"]] = obj
+                    results.append({"id": obj["id"], "result": {}})
+        return _FakeWeaviateResponse(results)
+
+@pytest.fixture
+def fake_weaviate(monkeypatch):
+    from utils import lazy_imports
+    vectorstores = pytest.importorskip("vectorstores.vectorstores")
+    module = types.SimpleNamespace(
+        batch=types.SimpleNamespace(requests=types.SimpleNamespace(ObjectsBatchRequest=_FakeObjectsBatchRequest)),
+        util=types.SimpleNamespace(generate_uuid5=lambda identifier, namespace: f"{namespace}-{identifier}"),
+    )
+    monkeypatch.setitem(lazy_imports._modules, "weaviate", module)
+    monkeypatch.setattr(vectorstores, "Weaviate", lambda client, class_name: (client, class_name))
+    return vectorstores
+
+def test_integrate_weaviate_sends_one_request_per_batch(fake_weaviate):
+    client = type("Client", (), {})()
+    client.batch = _FakeWeaviateBatch()
+    embeddings = np.random.default_rng(3).random((450, 4), dtype=np.float32)
+    fake_weaviate.integrate_weaviate(embeddings, client, "Chunk", batch_size=100, max_in_flight=3)
+    assert len(client.batch.stored) == 450
+    stored = client.batch.stored["Chunk-7"]
+    assert stored["class"] == "Chunk"
+    assert np.allclose(stored["vector"], embeddings[7])
+
+def test_integrate_weaviate_raises_on_rejected_objects(fake_weaviate):
+    client = type("Client", (), {})()
+    client.batch = _FakeWeaviateBatch(reject={"Chunk-5"})
+    embeddings = np.zeros((20, 4), dtype=np.float32)
+    with pytest.raises(RuntimeError, match="rejected"):
+        fake_weaviate.integrate_weaviate(embeddings, client, "Chunk", batch_size=10)
@@ -0,0 +1,23 @@
+from loaders.deduplication import deduplicate_documents
+
+PREDICTION = "The stars favour bold moves at work today, and an old friend brings welcome news by evening."
+
+def _document(source, period, date):
+    return {"content": PREDICTION, "metadata": {"source": source, "period": period, "date": date}}
+
+def test_near_duplicates_are_merged_within_a_date_bucket_only():
+    documents = [
+        _document("06-29-2024/leo.md", "daily", "2024-06-29"),
+        _document("06-29-2024/leo_copy.md", "daily", "2024-06-29"),
+        _document("06-30-2024/leo.md", "daily", "2024-06-30"),
+        _document("week_26/leo_this_week.md", "weekly", "2024-W26"),
+    ]
+    canonical, report = deduplicate_documents(documents)
+    assert [doc["metadata"]["date"] for doc in canonical] == ["2024-06-29", "2024-06-30", "2024-W26"]
+    assert report["groups"] == [{"canonical": "06-29-2024/leo.md", "duplicates": ["06-29-2024/leo_copy.md"]}]
+
+def test_scope_none_merges_across_dates():
+    documents = [_document("a.md", "daily", "2024-06-29"), _document("b.md", "daily", "2024-06-30")]
+    canonical, report = deduplicate_documents(documents, scope=None)
+    assert len(canonical) == 1
+    assert report["duplicates"] == 1
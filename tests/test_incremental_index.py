@@ -0,0 +1,104 @@
+import os
+import zipfile
+import numpy as np
+from vectorstores.incremental_index import (
+    BASE_FILE, _delta_files, _stored_shape, load_index, persisted_dimension, update_index,
+)
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # Bump the mtime so a rewrite within the same second is noticed.
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+def _chunk_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line]
+
+class _Embedder:
+    """Deterministic embedder that records how many texts it embedded."""
+
+    def __init__(self, dimension=4):
+        self.dimension = dimension
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.append(len(texts))
+        return np.array([[len(text) + i for i in range(self.dimension)] for text in texts], dtype=np.float32)
+
+def _update(source, index_dir, embed_fn, model="model-a", **kwargs):
+    return update_index(str(source), str(index_dir), _chunk_file, embed_fn, model, **kwargs)
+
+def test_deltas_replay_adds_modifications_and_deletions(tmp_path):
+    source, index_dir = tmp_path / "source", tmp_path / "index"
+    source.mkdir()
+    _write(source, "a.md", "alpha\nbeta")
+    _write(source, "b.md", "gamma")
+    index, report = _update(source, index_dir, _Embedder())
+    assert (report["added"], report["chunks_embedded"]) == (2, 3)
+    assert sorted(index.ids) == ["a.md:0", "a.md:1", "b.md:0"]
+
+    _write(source, "a.md", "alpha only")
+    os.remove(source / "b.md")
+    _write(source, "c.md", "delta")
+    embedder = _Embedder()
+    index, report = _update(source, index_dir, embedder)
+    assert {key: report[key] for key in ("added", "modified", "deleted", "unchanged")} == {
+        "added": 1, "modified": 1, "deleted": 1, "unchanged": 0,
+    }
+    assert sum(embedder.embedded) == 2
+    assert len(_delta_files(str(index_dir))) == 2
+
+    replayed = load_index(str(index_dir), background_compaction=False)
+    assert sorted(replayed.ids) == ["a.md:0", "c.md:0"]
+    assert replayed.search(np.array([10, 11, 12, 13], dtype=np.float32), k=1)[0]["text"] == "alpha only"
+
+    index, report = _update(source, index_dir, _Embedder())
+    assert (report["unchanged"], report["chunks_embedded"]) == (2, 0)
+
+def test_deltas_are_folded_into_the_base(tmp_path):
+    source, index_dir = tmp_path / "source", tmp_path / "index"
+    source.mkdir()
+    for run in range(3):
+        _write(source, f"{run}.md", f"file {run}")
+        index, _ = _update(source, index_dir, _Embedder(), max_deltas=1)
+    assert os.path.exists(index_dir / BASE_FILE)
+    assert len(_delta_files(str(index_dir))) <= 1
+    assert sorted(load_index(str(index_dir), background_compaction=False).ids) == ["0.md:0", "1.md:0", "2.md:0"]
+
+def test_model_change_rebuilds_the_index(tmp_path):
+    source, index_dir = tmp_path / "source", tmp_path / "index"
+    source.mkdir()
+    _write(source, "a.md", "alpha\nbeta")
+    _update(source, index_dir, _Embedder())
+    index, report = _update(source, index_dir, _Embedder(), model="model-b")
+    assert report["rebuilt"] and report["chunks_embedded"] == 2
+    assert sorted(index.ids) == ["a.md:0", "a.md:1"]
+
+def test_dimension_change_is_probed_before_embedding_and_rebuilds(tmp_path):
+    source, index_dir = tmp_path / "source", tmp_path / "index"
+    source.mkdir()
+    _write(source, "a.md", "alpha\nbeta")
+    _update(source, index_dir, _Embedder(dimension=4))
+    assert persisted_dimension(str(index_dir)) == 4
+
+    _write(source, "b.md", "gamma\ndelta\nepsilon")
+    embedder = _Embedder(dimension=6)
+    index, report = _update(source, index_dir, embedder, model="model-a")
+    # One probe text, then every chunk of the directory at the new dimension.
+    assert embedder.embedded[0] == 1
+    assert sum(embedder.embedded[1:]) == 5
+    assert report["rebuilt"] and index.dimension == 6
+    assert persisted_dimension(str(index_dir)) == 6
+    assert sorted(index.ids) == ["a.md:0", "a.md:1", "b.md:0", "b.md:1", "b.md:2"]
+
+def test_stored_shape_reads_npy_format_2_headers(tmp_path):
+    path = str(tmp_path / "vectors.npz")
+    vectors = np.zeros((3, 5), dtype=np.float32)
+    with open(tmp_path / "vectors.npy", "wb") as f:
+        np.lib.format.write_array(f, vectors, version=(2, 0))
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.write(tmp_path / "vectors.npy", "vectors.npy")
+    assert tuple(_stored_shape(path)) == (3, 5)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from vectorstores.mutable_index import MutableIndex
+
+def _vectors(count, dimension=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+def _index(**kwargs):
+    kwargs.setdefault("background_compaction", False)
+    return MutableIndex(8, initial_capacity=4, **kwargs)
+
+def test_upsert_replaces_rows_with_the_same_id():
+    index = _index(compaction_threshold=1.0)
+    vectors = _vectors(6)
+    index.upsert(["a", "b", "c"], vectors[:3], texts=["a0", "b0", "c0"])
+    index.upsert(["b", "d"], vectors[3:5], texts=["b1", "d0"])
+
+    assert len(index) == 4
+    assert sorted(index.ids) == ["a", "b", "c", "d"]
+    hit = index.search(vectors[3], k=1)[0]
+    assert (hit["id"], hit["text"], hit["distance"]) == ("b", "b1", pytest.approx(0.0, abs=1e-4))
+    assert all(result["text"] != "b0" for result in index.search(vectors[1], k=4))
+
+def test_delete_then_upsert_revives_an_id():
+    index = _index(compaction_threshold=1.0)
+    vectors = _vectors(3)
+    index.upsert(["a", "b"], vectors[:2])
+    assert index.delete(["a", "missing"]) == 1
+    assert "a" not in index
+    assert [result["id"] for result in index.search(vectors[0], k=4)] == ["b"]
+
+    index.upsert(["a"], vectors[2:])
+    assert "a" in index
+    assert index.search(vectors[2], k=1)[0]["id"] == "a"
+
+def test_upsert_publishes_new_rows_before_tombstoning_old_ones():
+    index = _index(compaction_threshold=1.0)
+    vectors = _vectors(2)
+    index.upsert(["a"], vectors[:1])
+    seen = []
+    tombstone = index._tombstone
+
+    def search_then_tombstone(state, ids):
+        # A search racing the upsert at this point must still find the id.
+        seen.append([result["id"] for result in index.search(vectors[1], k=4)])
+        return tombstone(state, ids)
+
+    index._tombstone = search_then_tombstone
+    index.upsert(["a"], vectors[1:])
+    assert seen == [["a", "a"]]
+    assert [result["id"] for result in index.search(vectors[1], k=4)] == ["a"]
+
+def test_upsert_rejects_mismatched_and_repeated_ids():
+    index = _index()
+    with pytest.raises(ValueError):
+        index.upsert(["a", "b"], _vectors(1))
+    with pytest.raises(ValueError):
+        index.upsert(["a", "a"], _vectors(2))
+
+def test_compaction_drops_tombstones_and_keeps_results():
+    index = _index(compaction_threshold=0.3)
+    vectors = _vectors(10)
+    ids = [f"row{i}" for i in range(10)]
+    index.upsert(ids, vectors, texts=ids)
+    index.delete(ids[:5])
+
+    assert index.tombstone_ratio == 0.0
+    assert index._state.count == 5
+    fresh = _index(compaction_threshold=1.0)
+    fresh.upsert(ids[5:], vectors[5:], texts=ids[5:])
+    assert index.search_batch(vectors, k=3) == fresh.search_batch(vectors, k=3)
+
+def test_background_compaction_finishes_with_the_same_live_rows():
+    index = MutableIndex(8, compaction_threshold=0.1, initial_capacity=4)
+    vectors = _vectors(20)
+    ids = [f"row{i}" for i in range(20)]
+    index.upsert(ids, vectors)
+    index.delete(ids[::2])
+    index.wait_for_compaction()
+    assert sorted(index.ids) == sorted(ids[1::2])
+    assert index.search(vectors[1], k=1)[0]["id"] == "row1"
+
+@pytest.mark.parametrize("storage_dtype", ["float32", "float16", "int8"])
+def test_save_and_load_keep_live_rows_and_dtype(tmp_path, storage_dtype):
+    index = _index(compaction_threshold=1.0, storage_dtype=storage_dtype)
+    vectors = _vectors(6)
+    index.upsert([f"row{i}" for i in range(6)], vectors, texts=[str(i) for i in range(6)])
+    index.delete(["row0"])
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+
+    loaded = MutableIndex.load(path, block_size=2, background_compaction=False)
+    assert loaded.storage_dtype == storage_dtype
+    assert sorted(loaded.ids) == [f"row{i}" for i in range(1, 6)]
+    np.testing.assert_array_equal(loaded._state.vectors[:5], index._state.vectors[1:6])
+    assert loaded.search(vectors[3], k=1)[0]["text"] == "3"
@@ -0,0 +1,20 @@
+from datetime import date
+from loaders.path_metadata import date_labels, parse_path_metadata
+
+def test_week_labels_include_its_days_and_containing_months_and_year():
+    labels = date_labels("weekly", date(2024, 7, 29), date(2024, 8, 4))
+    assert labels == [
+        "2024", "2024-07", "2024-07-29", "2024-07-30", "2024-07-31",
+        "2024-08", "2024-08-01", "2024-08-02", "2024-08-03", "2024-08-04", "2024-W31",
+    ]
+
+def test_day_labels_match_the_files_that_cover_the_day():
+    labels = set(date_labels("daily", date(2024, 6, 29), date(2024, 6, 29)))
+    covering = [
+        parse_path_metadata("data/06-29-2024/leo.md")["date"],
+        parse_path_metadata("data/week_26/leo_this_week.md", date(2024, 6, 29))["date"],
+        parse_path_metadata("data/June/leo_this_month.md", date(2024, 6, 29))["date"],
+        parse_path_metadata("data/2024/leo_2024.md")["date"],
+    ]
+    assert covering == ["2024-06-29", "2024-W26", "2024-06", "2024"]
+    assert labels == set(covering)
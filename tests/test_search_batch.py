@@ -0,0 +1,130 @@
+import types
+import numpy as np
+import pytest
+
+retrievers = pytest.importorskip("retrieval.retrievers")
+
+class _QueryModel:
+    """Embedding model with a batched query embedding."""
+
+    def __init__(self, vectors):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.calls = []
+
+    def embed_queries(self, queries):
+        self.calls.append(list(queries))
+        return self.vectors[:len(queries)]
+
+class _FakeFaissIndex:
+    def __init__(self, indices):
+        self.indices = np.asarray(indices)
+        self.queries = []
+
+    def search(self, queries, k):
+        self.queries.append(queries.copy())
+        return np.zeros(self.indices[:, :k].shape, dtype=np.float32), self.indices[:len(queries), :k]
+
+class _FakeFaiss(retrievers.FAISS):
+    def __init__(self, indices, normalize=False, distance_strategy="EUCLIDEAN_DISTANCE"):
+        self.index = _FakeFaissIndex(indices)
+        self._normalize_L2 = normalize
+        self.distance_strategy = distance_strategy
+        self.index_to_docstore_id = {i: f"doc{i}" for i in range(10)}
+        self.docstore = types.SimpleNamespace(search=lambda doc_id: doc_id)
+        self.per_query = []
+
+    def similarity_search_by_vector(self, vector, k=4):
+        self.per_query.append(vector)
+        return [f"per-query-{len(self.per_query)}"]
+
+@pytest.fixture
+def fake_faiss(monkeypatch):
+    from utils import lazy_imports
+
+    def normalize_L2(vectors):
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setitem(lazy_imports._modules, "faiss", types.SimpleNamespace(normalize_L2=normalize_L2))
+
+def test_faiss_searches_all_queries_in_one_call_and_drops_missing_hits(fake_faiss):
+    store = _FakeFaiss([[3, 1, -1], [2, -1, -1]])
+    model = _QueryModel([[3.0, 4.0], [1.0, 0.0]])
+    results = retrievers.search_batch(store, ["q1", "q2"], model, k=3)
+    assert results == [["doc3", "doc1"], ["doc2"]]
+    assert len(store.index.queries) == 1
+    np.testing.assert_array_equal(store.index.queries[0], model.vectors)
+    assert model.calls == [["q1", "q2"]]
+
+def test_faiss_normalizes_queries_when_the_store_does(fake_faiss):
+    store = _FakeFaiss([[0], [1]], normalize=True)
+    model = _QueryModel([[3.0, 4.0], [0.0, 2.0]])
+    retrievers.search_batch(store, ["q1", "q2"], model, k=1)
+    np.testing.assert_allclose(store.index.queries[0], [[0.6, 0.8], [0.0, 1.0]])
+    # The model's own vectors are left untouched.
+    np.testing.assert_array_equal(model.vectors, [[3.0, 4.0], [0.0, 2.0]])
+
+def test_faiss_with_another_distance_strategy_searches_per_query(fake_faiss):
+    store = _FakeFaiss([[0], [1]], distance_strategy="COSINE")
+    results = retrievers.search_batch(store, ["q1", "q2"], _QueryModel([[1.0, 0.0], [0.0, 1.0]]), k=1)
+    assert results == [["per-query-1"], ["per-query-2"]]
+    assert store.index.queries == []
+
+class _FakeChroma(retrievers.Chroma):
+    def __init__(self, collection=None):
+        if collection is not None:
+            self._collection = collection
+        self.per_query = []
+
+    def similarity_search_by_vector(self, vector, k=4):
+        self.per_query.append(vector)
+        return [f"per-query-{len(self.per_query)}"]
+
+def test_chroma_queries_the_collection_once():
+    chromadb = pytest.importorskip("chromadb")
+    collection = chromadb.EphemeralClient().get_or_create_collection("search-batch-test")
+    collection.add(
+        ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]],
+        documents=["first", "second"], metadatas=[{"n": 1}, {"n": 2}],
+    )
+    results = retrievers.search_batch(_FakeChroma(collection), ["q1", "q2"], _QueryModel([[0.0, 1.0], [1.0, 0.0]]), k=1)
+    assert [[(doc.page_content, doc.metadata) for doc in docs] for docs in results] == [
+        [("second", {"n": 2})], [("first", {"n": 1})],
+    ]
+
+def test_chroma_without_a_collection_falls_back_to_per_query_search():
+    store = _FakeChroma()
+    results = retrievers.search_batch(store, ["q1", "q2"], _QueryModel([[1.0, 0.0], [0.0, 1.0]]), k=1)
+    assert results == [["per-query-1"], ["per-query-2"]]
+
+def test_indexes_receive_the_query_block_and_search_kwargs():
+    calls = []
+    index = types.SimpleNamespace(search_batch=lambda vectors, k, **kwargs: calls.append((vectors, k, kwargs)) or "ok")
+    model = _QueryModel([[1.0, 0.0], [0.0, 1.0]])
+    assert retrievers.search_batch(index, ["q1", "q2"], model, k=2, scope="this_week") == "ok"
+    vectors, k, kwargs = calls[0]
+    np.testing.assert_array_equal(vectors, model.vectors)
+    assert (k, kwargs) == (2, {"scope": "this_week"})
+
+def test_other_stores_are_searched_per_query_in_order():
+    store = types.SimpleNamespace(similarity_search_by_vector=lambda vector, k=4: [vector])
+    results = retrievers.search_batch(store, ["q1", "q2", "q3"], _QueryModel(np.eye(3)), k=1, max_workers=3)
+    assert results == [[[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]], [[0.0, 0.0, 1.0]]]
+
+def test_embed_queries_prefixes_the_query_instruction():
+    class InstructModel:
+        query_instruction = "query: "
+
+        def embed_documents(self, texts):
+            return [[float(len(text))] for text in texts]
+
+    np.testing.assert_array_equal(retrievers.embed_queries(InstructModel(), ["ab", "abcd"]), [[9.0], [11.0]])
+
+def test_embed_queries_falls_back_to_embed_query():
+    class QueryOnlyModel:
+        def embed_query(self, text):
+            return [float(len(text))]
+
+        def embed_documents(self, texts):
+            raise AssertionError("documents must not be embedded as queries")
+
+    np.testing.assert_array_equal(retrievers.embed_queries(QueryOnlyModel(), ["a", "abc"]), [[1.0], [3.0]])
@@ -0,0 +1,37 @@
+import numpy as np
+from loaders.semantic_splitter import _semantic_cuts, split_texts_semantic
+import loaders.semantic_splitter as semantic_splitter
+
+def test_semantic_cuts_respect_max_tokens_without_peaks():
+    cuts = _semantic_cuts(np.zeros(3), np.array([10, 10, 10, 10]), threshold=0.5, min_tokens=5, max_tokens=25)
+    assert cuts == [1, 3]
+
+def test_semantic_cuts_ignore_peaks_before_min_tokens():
+    distances = np.array([0.9, 0.1, 0.1])
+    cuts = _semantic_cuts(distances, np.array([5, 5, 5, 5]), threshold=0.5, min_tokens=12, max_tokens=100)
+    assert cuts == [3]
+
+def test_semantic_cuts_cut_at_peaks_once_min_tokens_is_reached():
+    distances = np.array([0.9, 0.1])
+    cuts = _semantic_cuts(distances, np.array([20, 5, 5]), threshold=0.5, min_tokens=10, max_tokens=100)
+    assert cuts == [0, 2]
+
+def test_semantic_cuts_give_an_oversize_sentence_its_own_chunk():
+    cuts = _semantic_cuts(np.zeros(2), np.array([5, 500, 5]), threshold=0.5, min_tokens=1, max_tokens=100)
+    assert cuts == [0, 1, 2]
+
+def test_split_texts_semantic_embedding_does_not_depend_on_batching(monkeypatch):
+    monkeypatch.setattr(semantic_splitter, "count_tokens", lambda texts, model_name: np.array([len(t.split()) for t in texts]))
+    texts = ["Stars align today. Money matters rise. " * 3 + "A new topic starts here with many more words."]
+
+    def embed_fn(batch):
+        # Depends only on each sentence, as masked mean pooling does.
+        return np.array([[len(s), s.count("a") + 1.0, 1.0] for s in batch])
+
+    spans = [
+        split_texts_semantic(texts, embed_fn=embed_fn, min_tokens=2, max_tokens=12, batch_size=batch_size)
+        for batch_size in (1, 2, 64)
+    ]
+    for other in spans[1:]:
+        assert other.starts.tolist() == spans[0].starts.tolist()
+        assert other.ends.tolist() == spans[0].ends.tolist()
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from vectorstores.snapshots import SnapshotManager, current_version, list_versions
+
+def _publish(manager, value, count=3):
+    embeddings = np.full((count, 4), value, dtype=np.float32)
+    return manager.publish(embeddings, [f"v{value}-{i}" for i in range(count)])
+
+def test_swap_keeps_the_held_snapshot_until_its_query_finishes(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    first = _publish(manager, 1.0)
+    with manager.acquire() as held:
+        second = _publish(manager, 2.0)
+        assert manager.version == second
+        assert current_version(str(tmp_path)) == second
+        assert held.version == first
+        assert manager._refcounts == {first: 1, second: 0}
+        assert held.search(np.ones(4), k=1)[0]["text"] == "v1.0-0"
+    assert manager._refcounts == {second: 0}
+    assert manager._retired == {}
+    assert manager.search(np.ones(4), k=1)[0]["text"] == "v2.0-0"
+
+def test_rollback_serves_the_parent_version(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    first = _publish(manager, 1.0)
+    _publish(manager, 2.0)
+    assert manager.rollback() == first
+    assert current_version(str(tmp_path)) == first
+    assert manager.search(np.zeros(4), k=1)[0]["text"] == "v1.0-0"
+    with pytest.raises(RuntimeError):
+        manager.rollback()
+
+def test_manager_reopens_the_current_version(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    _publish(manager, 1.0)
+    version = _publish(manager, 2.0)
+    assert SnapshotManager(str(tmp_path)).version == version
+
+def test_prune_keeps_newest_parent_and_held_versions(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    versions = [_publish(manager, float(value)) for value in range(2)]
+    with manager.acquire():
+        versions += [_publish(manager, float(value)) for value in range(2, 5)]
+        # versions[1] is still held by the query, versions[3] is the parent of the current one.
+        assert manager.prune(keep=1) == [versions[0], versions[2]]
+        assert list_versions(str(tmp_path)) == [versions[1], versions[3], versions[4]]
+    assert manager.prune(keep=1) == [versions[1]]
+    assert list_versions(str(tmp_path)) == versions[3:]
+
+def test_failed_rebuild_keeps_serving_the_current_snapshot(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    version = _publish(manager, 1.0)
+
+    def build():
+        raise RuntimeError("embedding service unavailable")
+
+    future = manager.rebuild_async(build)
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    assert isinstance(manager.build_error, RuntimeError)
+    assert manager.version == version
+
+    future = manager.rebuild_async(lambda: (np.full((2, 4), 3.0, dtype=np.float32), ["a", "b"], None))
+    assert future.result(timeout=5) == manager.version
+    assert manager.build_error is None
@@ -0,0 +1,46 @@
+from loaders.text_splitters import split_texts_parallel, split_texts_spans
+
+def _texts():
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8
+    long_text = "\n\n".join(f"Section {i}. {paragraph}" for i in range(60))
+    return [long_text, "A short document.", paragraph * 3, long_text[::-1]]
+
+def test_split_texts_parallel_is_independent_of_worker_count():
+    texts = _texts()
+    results = [
+        split_texts_parallel(texts, chunk_size=200, chunk_overlap=20, max_workers=workers, segment_chars=2000)
+        for workers in (1, 2, 4)
+    ]
+    expected = results[0]
+    assert len(expected) > 0
+    for spans in results[1:]:
+        assert spans.chunk_ids() == expected.chunk_ids()
+        assert spans.starts.tolist() == expected.starts.tolist()
+        assert spans.ends.tolist() == expected.ends.tolist()
+
+def test_split_texts_parallel_chunks_stay_within_their_document():
+    texts = _texts()
+    spans = split_texts_parallel(texts, chunk_size=200, chunk_overlap=20, max_workers=2, segment_chars=2000)
+    for doc_id, start, end in zip(spans.doc_ids.tolist(), spans.starts.tolist(), spans.ends.tolist()):
+        assert 0 <= start < end <= len(texts[doc_id])
+
+def _assert_every_chunk_adds_new_text(spans):
+    previous_doc, previous_end = None, None
+    for doc_id, end in zip(spans.doc_ids.tolist(), spans.ends.tolist()):
+        if doc_id == previous_doc:
+            assert end > previous_end
+        previous_doc, previous_end = doc_id, end
+
+def test_small_chunks_never_consist_of_overlap_only():
+    texts = ["tiny words then averyveryverylongword and more tiny words follow here"] + _texts()[:2]
+    for chunk_size, chunk_overlap in ((12, 11), (8, 50), (30, 20)):
+        spans = split_texts_spans(texts, "recursive", chunk_size, chunk_overlap)
+        _assert_every_chunk_adds_new_text(spans)
+        assert spans.ends[spans.doc_ids == 0].max() == len(texts[0])
+
+def test_word_windows_cover_the_text_when_overlap_exceeds_size():
+    text = " ".join(f"w{i}" for i in range(20))
+    spans = split_texts_spans([text], "word", chunk_size=3, chunk_overlap=50)
+    _assert_every_chunk_adds_new_text(spans)
+    assert spans.ends.max() == len(text)
+    assert all(len(chunk.split()) <= 3 for chunk in spans.materialize())
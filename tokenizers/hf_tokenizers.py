@@ -9,23 +9,23 @@ Available Tokenizers:
 - BERT
 """
 
-from transformers import AutoTokenizer
+from embeddings.tokenizer_service import get_tokenizer
 
 def get_hf_minilm_tokenizer():
     """
-    Returns a tokenizer for the Hugging Face MiniLM model.
+    Returns the cached fast tokenizer for the Hugging Face MiniLM model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The MiniLM tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The MiniLM tokenizer.
     """
-    return AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+    return get_tokenizer('sentence-transformers/all-MiniLM-L6-v2')
 
 def get_hf_bert_tokenizer():
     """
-    Returns a tokenizer for the Hugging Face BERT model.
+    Returns the cached fast tokenizer for the Hugging Face BERT model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The BERT tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The BERT tokenizer.
     """
-    return AutoTokenizer.from_pretrained('bert-base-uncased')
+    return get_tokenizer('bert-base-uncased')
 
@@ -13,59 +13,59 @@ Available Tokenizers:
 - GPT-2
 """
 
-from transformers import AutoTokenizer
+from embeddings.tokenizer_service import get_tokenizer
 
 def get_local_minilm_tokenizer():
     """
-    Returns a tokenizer for the local MiniLM model.
+    Returns the cached fast tokenizer for the local MiniLM model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The MiniLM tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The MiniLM tokenizer.
     """
-    return AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+    return get_tokenizer('sentence-transformers/all-MiniLM-L6-v2')
 
 def get_local_bert_tokenizer():
     """
-    Returns a tokenizer for the local BERT model.
+    Returns the cached fast tokenizer for the local BERT model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The BERT tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The BERT tokenizer.
     """
-    return AutoTokenizer.from_pretrained('bert-base-uncased')
+    return get_tokenizer('bert-base-uncased')
 
 def get_local_roberta_tokenizer():
     """
-    Returns a tokenizer for the local RoBERTa model.
+    Returns the cached fast tokenizer for the local RoBERTa model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The RoBERTa tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The RoBERTa tokenizer.
     """
-    return AutoTokenizer.from_pretrained('roberta-base')
+    return get_tokenizer('roberta-base')
 
 def get_local_distilbert_tokenizer():
     """
-    Returns a tokenizer for the local DistilBERT model.
+    Returns the cached fast tokenizer for the local DistilBERT model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The DistilBERT tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The DistilBERT tokenizer.
     """
-    return AutoTokenizer.from_pretrained('distilbert-base-uncased')
+    return get_tokenizer('distilbert-base-uncased')
 
 def get_local_t5_tokenizer():
     """
-    Returns a tokenizer for the local T5 model.
+    Returns the cached fast tokenizer for the local T5 model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The T5 tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The T5 tokenizer.
     """
-    return AutoTokenizer.from_pretrained('t5-base')
+    return get_tokenizer('t5-base')
 
 def get_local_gpt2_tokenizer():
     """
-    Returns a tokenizer for the local GPT-2 model.
+    Returns the cached fast tokenizer for the local GPT-2 model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The GPT-2 tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The GPT-2 tokenizer.
     """
-    return AutoTokenizer.from_pretrained('gpt2')
+    return get_tokenizer('gpt2')
 
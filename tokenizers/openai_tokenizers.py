@@ -8,14 +8,14 @@ Available Tokenizers:
 - Ada
 """
 
-from transformers import GPT2Tokenizer
+from embeddings.tokenizer_service import get_tokenizer
 
 def get_openai_ada_tokenizer():
     """
-    Returns a tokenizer for the OpenAI Ada model.
+    Returns the cached fast tokenizer for the OpenAI Ada model.
     
     Returns:
-        tokenizer (transformers.PreTrainedTokenizer): The Ada tokenizer.
+        tokenizer (transformers.PreTrainedTokenizerFast): The Ada tokenizer.
     """
-    return GPT2Tokenizer.from_pretrained('openai-gpt')
+    return get_tokenizer('openai-gpt')
 
@@ -0,0 +1,77 @@
+import threading
+from queue import Queue, Full
+
+_DONE = object()
+
+def batched(iterable, batch_size):
+    """
+    Group an iterable into lists of at most `batch_size` items.
+
+    Args:
+        iterable (iterable): Items to group.
+        batch_size (int): Maximum number of items per batch.
+
+    Yields:
+        list: Consecutive batches of items.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def prefetch(iterable, max_pending=2):
+    """
+    Run an iterable in a background thread, buffering at most `max_pending` items.
+
+    The producer blocks once the buffer is full, so a slow consumer applies
+    back-pressure to the stage feeding it instead of letting items pile up.
+    Exceptions raised by the producer are re-raised in the consumer.
+
+    Args:
+        iterable (iterable): Upstream stage to run ahead.
+        max_pending (int): Maximum number of items buffered between the stages.
+
+    Yields:
+        object: Items from the upstream iterable, in order.
+    """
+    queue = Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(entry):
+        # Time out periodically so a producer never blocks forever once the consumer stops.
+        while not stop.is_set():
+            try:
+                queue.put(entry, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
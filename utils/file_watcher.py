@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+class PollingWatcher:
+    """
+    Watch directories by polling and report debounced file changes.
+
+    Every `interval` seconds the watched trees are scanned for file mtimes and
+    sizes. A changed file is reported once it has not changed again for
+    `debounce` seconds, so a file still being written or a burst of edits
+    produces a single event. Polling needs no platform-specific support and
+    works on network and container mounts where inotify events are not
+    delivered.
+
+    Args:
+        directories (list of str): Directories to watch recursively. Missing ones are skipped.
+        callback (callable): Called with a dict mapping each changed path to
+            {"event": "created" | "modified" | "deleted", "detected": time.time() of the first change}.
+        interval (float): Seconds between scans.
+        debounce (float): Seconds a file must stay unchanged before it is reported.
+        extensions (iterable of str): File extensions to watch. Defaults to every file.
+    """
+
+    def __init__(self, directories, callback, interval=1.0, debounce=2.0, extensions=None):
+        self.directories = list(directories)
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self.extensions = set(extensions) if extensions is not None else None
+        self._files = self.scan()
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def scan(self):
+        """
+        Return the (mtime, size) of every watched file.
+
+        Returns:
+            dict: File path mapped to (mtime, size).
+        """
+        files = {}
+        for directory in self.directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    if self.extensions is not None and os.path.splitext(name)[1].lower() not in self.extensions:
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[path] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def poll(self):
+        """
+        Scan once and report the changes whose debounce period has elapsed.
+
+        Returns:
+            dict: Changes passed to the callback, empty if none were due.
+        """
+        now = time.time()
+        files = self.scan()
+        for path in set(files) | set(self._files):
+            before, after = self._files.get(path), files.get(path)
+            if before == after:
+                continue
+            event = "deleted" if after is None else "created" if before is None else "modified"
+            pending = self._pending.get(path)
+            if pending is not None and pending["event"] == "created" and event != "deleted":
+                event = "created"
+            self._pending[path] = {
+                "event": event,
+                "detected": pending["detected"] if pending else now,
+                "last_change": now,
+            }
+        self._files = files
+
+        due = {
+            path: {"event": change["event"], "detected": change["detected"]}
+            for path, change in self._pending.items()
+            if now - change["last_change"] >= self.debounce
+        }
+        for path in due:
+            del self._pending[path]
+        if due:
+            self.callback(due)
+        return due
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error occurred while watching {', '.join(self.directories)}: {e}")
+
+    def start(self):
+        """
+        Start polling on a background thread.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop polling and wait for the background thread to exit.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
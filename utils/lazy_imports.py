@@ -0,0 +1,71 @@
+import importlib
+import threading
+import time
+
+# Backend name -> module imported the first time the backend is selected.
+BACKENDS = {
+    "faiss": "faiss",
+    "pinecone": "pinecone",
+    "weaviate": "weaviate",
+    "milvus": "pymilvus",
+    "chroma": "chromadb",
+    "lance": "lancedb",
+    "torch": "torch",
+    "transformers": "transformers",
+    "arrow": "pyarrow",
+}
+
+_modules = {}
+_import_seconds = {}
+_lock = threading.Lock()
+
+def register_backend(name, module_name):
+    """
+    Register a backend so it can be imported lazily by name.
+
+    Args:
+        name (str): Backend name, e.g. 'faiss'.
+        module_name (str): Module to import when the backend is first selected.
+    """
+    BACKENDS[name] = module_name
+
+def get_backend(name):
+    """
+    Return the client module of a backend, importing it on first use.
+
+    Args:
+        name (str): Backend name, one of BACKENDS.
+
+    Returns:
+        module: The imported client module.
+    """
+    module = _modules.get(name)
+    if module is not None:
+        return module
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}. Available backends: {', '.join(sorted(BACKENDS))}")
+    with _lock:
+        if name not in _modules:
+            start = time.perf_counter()
+            _modules[name] = importlib.import_module(BACKENDS[name])
+            _import_seconds[name] = time.perf_counter() - start
+        return _modules[name]
+
+def import_report():
+    """
+    Report which backends have been imported and how long each import took.
+
+    Import times are measured when a backend is first selected, so a module
+    already imported elsewhere reports close to zero.
+
+    Returns:
+        dict: Backend name mapped to {"module", "loaded", "seconds"}.
+    """
+    return {
+        name: {
+            "module": module_name,
+            "loaded": name in _modules,
+            "seconds": _import_seconds.get(name),
+        }
+        for name, module_name in BACKENDS.items()
+    }
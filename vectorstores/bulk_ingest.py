@@ -0,0 +1,98 @@
+"""
+Bulk, batched vector ingestion shared by the vector store integrations.
+
+Embeddings are written in fixed-size batches taken as slices of the NumPy
+array, with several batches in flight on a thread pool. A failed batch is
+retried with exponential backoff; batches that still fail are reported
+instead of aborting the whole load. Each integration only provides a
+`write_batch(ids, vectors)` callable for its client.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+def _write_with_retries(write_batch, ids, vectors, max_retries, retry_backoff):
+    """
+    Write one batch, retrying on failure.
+
+    Returns:
+        tuple: (number of retries used, error message or None).
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            write_batch(ids, vectors)
+            return attempt, None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < max_retries:
+                time.sleep(retry_backoff * 2 ** attempt)
+    return max_retries, error
+
+def bulk_ingest(embeddings, write_batch, ids=None, batch_size=256, max_in_flight=4, max_retries=3, retry_backoff=0.5):
+    """
+    Write embeddings to a vector store in parallel fixed-size batches.
+
+    Args:
+        embeddings (np.ndarray): Embeddings to write, one row per vector.
+        write_batch (callable): Function taking (ids, vectors) for one batch, where ids is a
+            list of str and vectors an np.ndarray slice of `embeddings`.
+        ids (list of str): Id of each vector. Defaults to the row number.
+        batch_size (int): Number of vectors per batch.
+        max_in_flight (int): Maximum number of batches written concurrently.
+        max_retries (int): Number of retries for a failed batch.
+        retry_backoff (float): Initial delay in seconds before a retry, doubled on each attempt.
+
+    Returns:
+        dict: Report with the number of "vectors" and "batches" written, "retries",
+            "failed_batches" (start row and error of each batch that could not be written),
+            "seconds" and "vectors_per_second".
+    """
+    if ids is None:
+        ids = [str(i) for i in range(len(embeddings))]
+    if len(ids) != len(embeddings):
+        raise ValueError("ids and embeddings must have the same length.")
+
+    start_time = time.perf_counter()
+    written, retries, failed_batches = 0, 0, []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = {}
+        for start in range(0, len(embeddings), batch_size):
+            end = min(start + batch_size, len(embeddings))
+            future = executor.submit(
+                _write_with_retries, write_batch, ids[start:end], embeddings[start:end], max_retries, retry_backoff
+            )
+            pending[future] = (start, end)
+            while len(pending) >= max_in_flight or (end == len(embeddings) and pending):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_start, batch_end = pending.pop(future)
+                    batch_retries, error = future.result()
+                    retries += batch_retries
+                    if error:
+                        failed_batches.append({"start": batch_start, "error": error})
+                    else:
+                        written += batch_end - batch_start
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "vectors": written,
+        "batches": -(-len(embeddings) // batch_size),
+        "retries": retries,
+        "failed_batches": failed_batches,
+        "seconds": seconds,
+        "vectors_per_second": written / seconds if seconds > 0 else 0.0,
+    }
+
+def raise_for_failures(report):
+    """
+    Raise if a bulk ingest left batches unwritten.
+
+    Args:
+        report (dict): Report returned by bulk_ingest.
+    """
+    if report["failed_batches"]:
+        first = report["failed_batches"][0]
+        raise RuntimeError(
+            f"{len(report['failed_batches'])} batches failed after retries; "
+            f"first failure at row {first['start']}: {first['error']}"
+        )
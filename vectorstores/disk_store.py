@@ -0,0 +1,157 @@
+"""
+On-disk vector store built from a stream of embedding batches.
+
+Each batch is appended to disk as it arrives: vectors to a raw float32 file
+and chunk texts to a JSON-lines docstore. Only the byte offset of each chunk
+stays in memory, so building the store uses memory proportional to one batch
+rather than to the corpus. Searches memory-map the vector file and scan it in
+blocks with retrieval.blocked_search, giving the same exact L2 results as a
+FAISS IndexFlatL2.
+
+Layout:
+
+    <directory>/vectors.f32     row-major float32 vectors
+    <directory>/chunks.jsonl    one JSON-encoded chunk text per line
+    <directory>/meta.json       {"count", "dimension"}
+"""
+
+import json
+import os
+import numpy as np
+from retrieval.blocked_search import blocked_search
+from utils.lazy_imports import get_backend
+
+class DiskDocstore:
+    """
+    Chunk texts stored one per line in a JSON-lines file, read back by offset.
+
+    Args:
+        path (str): Path of the JSON-lines file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = []
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    self.offsets.append(offset)
+                    offset += len(line)
+
+    def extend(self, texts):
+        """
+        Append texts to the end of the file.
+
+        Args:
+            texts (list of str): Texts to append.
+        """
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            for text in texts:
+                line = (json.dumps(text) + "\n").encode("utf-8")
+                f.write(line)
+                self.offsets.append(offset)
+                offset += len(line)
+
+    def __getitem__(self, index):
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[index])
+            return json.loads(f.readline())
+
+    def __len__(self):
+        return len(self.offsets)
+
+class DiskVectorStore:
+    """
+    Exact L2 search over vectors and chunks stored in a directory.
+
+    Args:
+        directory (str): Directory written by integrate_disk_stream.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.vectors = np.memmap(
+            os.path.join(directory, "vectors.f32"), dtype=np.float32, mode="r",
+            shape=(meta["count"], meta["dimension"]),
+        )
+        self.docstore = DiskDocstore(os.path.join(directory, "chunks.jsonl"))
+
+    def search(self, query_embedding, k=4):
+        """
+        Return the k nearest chunks.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+
+        Returns:
+            list of dict: Results with "row", "distance" and "text", nearest first.
+        """
+        return self.search_batch(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), k)[0]
+
+    def search_batch(self, query_embeddings, k=4):
+        """
+        Return the k nearest chunks for each of several queries, in one pass over the vectors.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+
+        Returns:
+            list of list of dict: Results of search for each query, in query order.
+        """
+        indices, distances = blocked_search(self.vectors, query_embeddings, k)
+        return [
+            [{"row": row, "distance": float(distance), "text": self.docstore[row]} for row, distance in zip(rows, row_distances)]
+            for rows, row_distances in zip(indices.tolist(), distances.tolist())
+        ]
+
+    def to_faiss(self, block_size=65536):
+        """
+        Load the vectors into a FAISS IndexFlatL2, block by block, for when they fit in memory.
+
+        Returns:
+            faiss.IndexFlatL2: The index, with rows in docstore order.
+        """
+        faiss = get_backend("faiss")
+        index = faiss.IndexFlatL2(self.vectors.shape[1])
+        for start in range(0, len(self.vectors), block_size):
+            index.add(np.ascontiguousarray(self.vectors[start:start + block_size]))
+        return index
+
+def integrate_disk_stream(batches, directory):
+    """
+    Build an on-disk vector store from a stream of embedding batches.
+
+    Args:
+        batches (iterable of tuple): (chunks, embeddings) pairs, where embeddings is an np.ndarray.
+        directory (str): Output directory; an existing store there is replaced.
+
+    Returns:
+        DiskVectorStore: The store, with chunk texts in its docstore aligned with vector rows.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in ("vectors.f32", "chunks.jsonl", "meta.json"):
+        if os.path.exists(os.path.join(directory, name)):
+            os.remove(os.path.join(directory, name))
+    docstore = DiskDocstore(os.path.join(directory, "chunks.jsonl"))
+    count, dimension = 0, None
+    with open(os.path.join(directory, "vectors.f32"), "ab") as vectors_file:
+        for chunks, embeddings in batches:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            if dimension is None:
+                dimension = embeddings.shape[1]
+            elif embeddings.shape[1] != dimension:
+                raise ValueError(f"Batch has dimension {embeddings.shape[1]}, expected {dimension}.")
+            vectors_file.write(embeddings.tobytes())
+            docstore.extend(chunks)
+            count += len(embeddings)
+    if dimension is None:
+        raise ValueError("No embeddings were produced.")
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"count": count, "dimension": int(dimension)}, f)
+    return DiskVectorStore(directory)
@@ -0,0 +1,334 @@
+"""
+Incremental ingestion with a per-file manifest and a delta-log index.
+
+The manifest records, for every source file, its content hash, mtime, size,
+the ids of its chunks and the embedding model that produced them. A run
+compares the manifest with the directory: new and modified files are loaded,
+split and embedded, and the chunks of deleted or modified files are removed.
+A file whose mtime and size are unchanged is not even re-read.
+
+Vectors from different models, or of different dimensions, cannot share an
+index. When the embedding model differs from the one in the manifest, or the
+new embeddings have another dimension than the persisted ones, the base,
+deltas and manifest are discarded and the whole directory is re-embedded.
+The dimension is probed by embedding a single text before the rest of the
+delta, and nothing is written until the check passes, so the index directory
+is never left holding mixed vectors.
+
+The persisted index is a base file plus numbered delta files, so a run only
+writes its own changes:
+
+    <index_dir>/manifest.json
+    <index_dir>/base.npz            MutableIndex.save of the last compaction
+    <index_dir>/deltas/000001.npz   upserted rows and deleted ids of one run
+
+Loading replays the deltas onto the base in order. Once there are more than
+`max_deltas` delta files they are folded into a new base.
+
+Base and delta files keep the vectors in the index's storage dtype (float32,
+float16 or int8, see vectorstores.quantization). An int8 delta carries its own
+scale and offset and is re-encoded with the index's when it is replayed.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+import numpy as np
+from .mutable_index import MutableIndex, read_stored_vectors
+from .quantization import quantize
+
+MANIFEST_FILE = "manifest.json"
+BASE_FILE = "base.npz"
+DELTAS_DIR = "deltas"
+
+def file_hash(path, block_size=1 << 20):
+    """
+    Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path (str): File path.
+        block_size (int): Bytes read per block.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(index_dir):
+    """
+    Load the ingestion manifest of an index, or an empty one.
+
+    Args:
+        index_dir (str): Index directory.
+
+    Returns:
+        dict: Relative file path mapped to {"hash", "mtime", "size", "chunk_ids", "embedding_model"}.
+    """
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(index_dir, manifest):
+    """
+    Write the ingestion manifest atomically.
+
+    Args:
+        index_dir (str): Index directory.
+        manifest (dict): Manifest from load_manifest.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def compute_delta(manifest, directory, embedding_model, extensions=None):
+    """
+    Compare a directory with the manifest.
+
+    Args:
+        manifest (dict): Manifest from load_manifest.
+        directory (str): Source directory.
+        embedding_model (str): Name of the embedding model used for this run.
+        extensions (iterable of str): File extensions to include, e.g. {".md", ".pdf"}.
+            Defaults to every file.
+
+    Returns:
+        dict: "added", "modified", "deleted" and "unchanged" lists of relative paths, and
+            "stats" mapping each current relative path to {"hash", "mtime", "size"}.
+    """
+    delta = {"added": [], "modified": [], "deleted": [], "unchanged": [], "stats": {}}
+    seen = set()
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, directory)
+            seen.add(relpath)
+            stat = os.stat(path)
+            entry = manifest.get(relpath)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                content_hash = entry["hash"]
+            else:
+                content_hash = file_hash(path)
+            delta["stats"][relpath] = {"hash": content_hash, "mtime": stat.st_mtime, "size": stat.st_size}
+            if entry is None:
+                delta["added"].append(relpath)
+            elif entry["hash"] != content_hash or entry.get("embedding_model") != embedding_model:
+                delta["modified"].append(relpath)
+            else:
+                delta["unchanged"].append(relpath)
+    delta["deleted"] = sorted(set(manifest) - seen)
+    return delta
+
+def _delta_files(index_dir):
+    deltas_dir = os.path.join(index_dir, DELTAS_DIR)
+    if not os.path.isdir(deltas_dir):
+        return []
+    return [os.path.join(deltas_dir, name) for name in sorted(os.listdir(deltas_dir)) if name.endswith(".npz")]
+
+def write_delta(index_dir, ids, embeddings, texts, metadata, deleted_ids, storage_dtype="float32"):
+    """
+    Append one delta file to the persisted index.
+
+    Args:
+        index_dir (str): Index directory.
+        ids (list of str): Ids of the upserted rows.
+        embeddings (np.ndarray): Embeddings of the upserted rows.
+        texts (list of str): Text of the upserted rows.
+        metadata (list of dict): Metadata of the upserted rows.
+        deleted_ids (list of str): Ids removed in this run.
+        storage_dtype (str): Dtype the vectors are written in.
+
+    Returns:
+        str: Path of the delta file.
+    """
+    deltas_dir = os.path.join(index_dir, DELTAS_DIR)
+    os.makedirs(deltas_dir, exist_ok=True)
+    existing = _delta_files(index_dir)
+    number = int(os.path.basename(existing[-1])[:-4]) + 1 if existing else 1
+    path = os.path.join(deltas_dir, f"{number:06d}.npz")
+    header = {"ids": list(ids), "texts": list(texts), "metadata": list(metadata), "deleted": list(deleted_ids)}
+    stored = quantize(np.asarray(embeddings, dtype=np.float32), storage_dtype)
+    arrays = {"vectors": stored.codes, "header": np.array(json.dumps(header))}
+    if stored.scale is not None:
+        arrays.update(scale=stored.scale, offset=stored.offset)
+    np.savez(path + ".tmp.npz", **arrays)
+    os.replace(path + ".tmp.npz", path)
+    return path
+
+def _stored_shape(path):
+    """
+    Read the shape of the vectors in a saved .npz file without loading them.
+
+    Headers of .npy format 1.0 and 2.0 are parsed directly; any other format
+    version falls back to loading the vectors.
+    """
+    header_readers = {1: np.lib.format.read_array_header_1_0, 2: np.lib.format.read_array_header_2_0}
+    with zipfile.ZipFile(path) as archive, archive.open("vectors.npy") as f:
+        major, _ = np.lib.format.read_magic(f)
+        if major in header_readers:
+            return header_readers[major](f)[0]
+    with np.load(path) as data:
+        return data["vectors"].shape
+
+def persisted_dimension(index_dir):
+    """
+    Return the dimension of the vectors persisted in an index directory.
+
+    Args:
+        index_dir (str): Index directory.
+
+    Returns:
+        int: Dimension of the base or delta vectors, or None if no vectors are persisted.
+    """
+    base_path = os.path.join(index_dir, BASE_FILE)
+    for path in ([base_path] if os.path.exists(base_path) else []) + _delta_files(index_dir):
+        shape = _stored_shape(path)
+        if len(shape) == 2 and shape[0] and shape[1]:
+            return shape[1]
+    return None
+
+def reset_index(index_dir):
+    """
+    Delete the manifest, base and delta files of an index directory.
+
+    Args:
+        index_dir (str): Index directory.
+    """
+    for path in [os.path.join(index_dir, MANIFEST_FILE), os.path.join(index_dir, BASE_FILE)] + _delta_files(index_dir):
+        if os.path.exists(path):
+            os.remove(path)
+
+def load_index(index_dir, dimension=None, **kwargs):
+    """
+    Load a persisted index by replaying its deltas onto the base.
+
+    Args:
+        index_dir (str): Index directory.
+        dimension (int): Embedding dimension, needed only when nothing has been persisted yet.
+        **kwargs: Arguments passed to MutableIndex.
+
+    Returns:
+        MutableIndex: The index, or None if nothing is persisted and `dimension` is unset.
+    """
+    base_path = os.path.join(index_dir, BASE_FILE)
+    index = MutableIndex.load(base_path, **kwargs) if os.path.exists(base_path) else None
+    for path in _delta_files(index_dir):
+        with np.load(path) as data:
+            vectors = read_stored_vectors(data).dequantize()
+            header = json.loads(str(data["header"]))
+        if index is None and len(vectors):
+            index = MutableIndex(vectors.shape[1], **kwargs)
+        if index is not None and len(vectors) and vectors.shape[1] != index.dimension:
+            raise ValueError(
+                f"{path} holds {vectors.shape[1]}-dimensional vectors but the index is {index.dimension}-dimensional; "
+                "reset the index directory and rebuild it."
+            )
+        if index is not None:
+            index.delete(header["deleted"])
+            if len(vectors):
+                index.upsert(header["ids"], vectors, header["texts"], header["metadata"])
+    if index is None and dimension is not None:
+        index = MutableIndex(dimension, **kwargs)
+    return index
+
+def compact_index(index_dir, index):
+    """
+    Fold the delta files into a new base file.
+
+    Args:
+        index_dir (str): Index directory.
+        index (MutableIndex): Index loaded from `index_dir` with every delta applied.
+    """
+    base_path = os.path.join(index_dir, BASE_FILE)
+    index.save(base_path + ".tmp.npz")
+    os.replace(base_path + ".tmp.npz", base_path)
+    for path in _delta_files(index_dir):
+        os.remove(path)
+
+def update_index(directory, index_dir, chunk_file, embed_fn, embedding_model, extensions=None, max_deltas=20,
+                 storage_dtype="float32"):
+    """
+    Bring a persisted index up to date with a directory, processing only the delta.
+
+    Args:
+        directory (str): Source directory.
+        index_dir (str): Index directory holding the manifest, base and deltas.
+        chunk_file (callable): Function taking a file path and returning its list of chunk texts.
+        embed_fn (callable): Function taking a list of texts and returning an np.ndarray.
+        embedding_model (str): Name of the model behind `embed_fn`, recorded in the manifest.
+        extensions (iterable of str): File extensions to include. Defaults to every file.
+        max_deltas (int): Number of delta files after which they are folded into the base.
+        storage_dtype (str): Dtype the index stores its vectors in, in memory and on disk.
+
+    Returns:
+        tuple: (MutableIndex, report with the "added", "modified", "deleted" and
+            "unchanged" file counts, the number of "chunks_embedded" and whether the
+            index was "rebuilt" from scratch).
+    """
+    manifest = load_manifest(index_dir)
+    rebuilt = False
+    if any(entry.get("embedding_model") != embedding_model for entry in manifest.values()):
+        reset_index(index_dir)
+        manifest, rebuilt = {}, True
+    delta = compute_delta(manifest, directory, embedding_model, extensions)
+    deleted_ids = [
+        chunk_id
+        for relpath in delta["deleted"] + delta["modified"]
+        for chunk_id in manifest[relpath]["chunk_ids"]
+    ]
+
+    ids, texts, metadata = [], [], []
+    for relpath in delta["added"] + delta["modified"]:
+        chunks = chunk_file(os.path.join(directory, relpath))
+        chunk_ids = [f"{relpath}:{ordinal}" for ordinal in range(len(chunks))]
+        ids.extend(chunk_ids)
+        texts.extend(chunks)
+        metadata.extend({"source": relpath, "chunk": ordinal} for ordinal in range(len(chunks)))
+        manifest[relpath] = {**delta["stats"][relpath], "chunk_ids": chunk_ids, "embedding_model": embedding_model}
+    for relpath in delta["deleted"]:
+        del manifest[relpath]
+    for relpath in delta["unchanged"]:
+        # Refresh mtimes of touched-but-unchanged files so they are not re-hashed next run.
+        manifest[relpath].update(delta["stats"][relpath])
+
+    embeddings = np.zeros((0, 0), dtype=np.float32)
+    if texts:
+        # Probe the dimension with one text, so a dimension change is caught before the delta is embedded.
+        probe = np.asarray(embed_fn(texts[:1]), dtype=np.float32)
+        stored_dimension = persisted_dimension(index_dir)
+        if probe.ndim == 2 and stored_dimension is not None and stored_dimension != probe.shape[1]:
+            # Nothing has been written yet; start over so every file is embedded at the new dimension.
+            reset_index(index_dir)
+            index, report = update_index(
+                directory, index_dir, chunk_file, embed_fn, embedding_model, extensions, max_deltas, storage_dtype
+            )
+            report["rebuilt"] = True
+            return index, report
+        embeddings = probe
+        if len(texts) > 1:
+            embeddings = np.concatenate([probe, np.asarray(embed_fn(texts[1:]), dtype=np.float32)])
+        if embeddings.ndim != 2 or len(embeddings) != len(texts):
+            raise ValueError(f"embed_fn returned shape {embeddings.shape} for {len(texts)} texts.")
+    if ids or deleted_ids:
+        write_delta(index_dir, ids, embeddings, texts, metadata, deleted_ids, storage_dtype)
+    save_manifest(index_dir, manifest)
+
+    index = load_index(
+        index_dir, dimension=embeddings.shape[1] or None, background_compaction=False, storage_dtype=storage_dtype
+    )
+    if len(_delta_files(index_dir)) > max_deltas and index is not None:
+        compact_index(index_dir, index)
+    report = {key: len(delta[key]) for key in ("added", "modified", "deleted", "unchanged")}
+    report["chunks_embedded"] = len(ids)
+    report["rebuilt"] = rebuilt
+    return index, report
@@ -1,7 +1,8 @@
 # indexing.py
 import numpy as np
-from langchain_community.vectorstores import FAISS, Pinecone, Weaviate, Milvus, Chroma, LanceDB
+from langchain_community.vectorstores import FAISS, Pinecone, Weaviate, Milvus, Chroma
 from langchain_openai import OpenAIEmbeddings
+from .lance_ingest import ingest_lance
 
 def index_with_faiss(documents, embeddings):
     """
@@ -61,17 +62,26 @@ def index_with_chroma(documents, embeddings):
     db = Chroma.from_documents(documents, embeddings)
     return db
 
-def index_with_lance(documents, embeddings, db_path):
+def index_with_lance(documents, embeddings, db_path, build_index=False, num_partitions=256):
     """
     Index documents with LanceDB.
+
+    Documents are embedded in one batched call and written as Arrow record batches.
     
     Args:
         documents (list): List of document objects.
         embeddings (object): Embedding model to use.
         db_path (str): Path to LanceDB database.
-    """
-    db = lancedb.connect(db_path)
-    table = db.create_table("my_table", data=[{"vector": embeddings.embed_query(doc["content"]), "text": doc["content"], "id": doc["id"]} for doc in documents], mode="overwrite")
+        build_index (bool): Whether to build an IVF-PQ index after loading.
+        num_partitions (int): Number of IVF partitions of the index.
+    """
+    texts = [doc["content"] for doc in documents]
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    table = ingest_lance(
+        vectors, "my_table", db_path,
+        ids=[str(doc["id"]) for doc in documents], texts=texts,
+        build_index=build_index, num_partitions=num_partitions,
+    )
     return table
 
 def store_embeddings(embeddings, file_path):
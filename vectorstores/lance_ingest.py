@@ -0,0 +1,123 @@
+"""
+Arrow-native ingestion into LanceDB.
+
+The embedding matrix is wrapped as an Arrow FixedSizeList column over the
+NumPy buffer instead of being converted into one Python list per vector.
+Rows are streamed to LanceDB as record batches that are zero-copy slices of
+that buffer, so memory stays bounded by the batch size regardless of how many
+vectors are loaded.
+"""
+
+import numpy as np
+from utils.lazy_imports import get_backend
+
+def embeddings_to_arrow(embeddings):
+    """
+    Wrap an embedding matrix as an Arrow FixedSizeList array without copying.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim). Copied only if not
+            already C-contiguous float32.
+
+    Returns:
+        pyarrow.FixedSizeListArray: One list of `dim` float32 values per row.
+    """
+    pa = get_backend("arrow")
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2:
+        raise ValueError("Embeddings must be a 2D array of shape (n, dim).")
+    values = pa.Array.from_buffers(pa.float32(), embeddings.size, [None, pa.py_buffer(embeddings)])
+    return pa.FixedSizeListArray.from_arrays(values, embeddings.shape[1])
+
+def lance_schema(dimension, with_text=False):
+    """
+    Return the Arrow schema of a Lance vector table.
+
+    Args:
+        dimension (int): Embedding dimension.
+        with_text (bool): Whether the table has a text column.
+
+    Returns:
+        pyarrow.Schema: Schema with "vector", "id" and optionally "text" columns.
+    """
+    pa = get_backend("arrow")
+    fields = [pa.field("vector", pa.list_(pa.float32(), dimension)), pa.field("id", pa.string())]
+    if with_text:
+        fields.append(pa.field("text", pa.string()))
+    return pa.schema(fields)
+
+def iter_record_batches(embeddings, ids=None, texts=None, batch_size=65536):
+    """
+    Yield record batches that slice the embedding buffer without copying.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        ids (list of str): Id of each row. Defaults to the row number.
+        texts (list of str): Optional text of each row.
+        batch_size (int): Rows per record batch.
+
+    Yields:
+        pyarrow.RecordBatch: Batches following lance_schema.
+    """
+    pa = get_backend("arrow")
+    vectors = embeddings_to_arrow(embeddings)
+    schema = lance_schema(vectors.type.list_size, with_text=texts is not None)
+    for start in range(0, len(vectors), batch_size):
+        end = min(start + batch_size, len(vectors))
+        batch_ids = ids[start:end] if ids is not None else np.arange(start, end).astype(str)
+        columns = [vectors.slice(start, end - start), pa.array(batch_ids, type=pa.string())]
+        if texts is not None:
+            columns.append(pa.array(texts[start:end], type=pa.string()))
+        yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def _default_sub_vectors(dimension):
+    """
+    Return the largest divisor of the dimension that is at most dimension / 8.
+    """
+    target = max(1, dimension // 8)
+    return next(d for d in range(target, 0, -1) if dimension % d == 0)
+
+def ingest_lance(embeddings, table_name, db_path="/tmp/lancedb", ids=None, texts=None, batch_size=65536,
+                 mode="overwrite", build_index=False, num_partitions=256, num_sub_vectors=None, metric="L2"):
+    """
+    Write embeddings to a LanceDB table as Arrow record batches.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        table_name (str): LanceDB table name.
+        db_path (str): Path to the LanceDB database.
+        ids (list of str): Id of each row. Defaults to the row number.
+        texts (list of str): Optional text of each row.
+        batch_size (int): Rows per record batch.
+        mode (str): "overwrite" to replace the table or "append" to add to it.
+        build_index (bool): Whether to build an IVF-PQ index after loading.
+        num_partitions (int): IVF partitions, capped at the number of rows.
+        num_sub_vectors (int): PQ sub-vectors; must divide the dimension. Defaults to
+            the largest divisor of the dimension up to dimension / 8.
+        metric (str): Distance metric of the index, "L2" or "cosine".
+
+    Returns:
+        lancedb.table.Table: The loaded table.
+    """
+    pa = get_backend("arrow")
+    lancedb = get_backend("lance")
+    db = lancedb.connect(db_path)
+    dimension = embeddings.shape[1]
+    schema = lance_schema(dimension, with_text=texts is not None)
+    reader = pa.RecordBatchReader.from_batches(schema, iter_record_batches(embeddings, ids, texts, batch_size))
+
+    if mode == "append" and table_name in db.table_names():
+        table = db.open_table(table_name)
+        table.add(reader)
+    else:
+        table = db.create_table(table_name, data=reader, schema=schema, mode="overwrite")
+
+    if build_index:
+        table.create_index(
+            metric=metric,
+            num_partitions=max(1, min(num_partitions, len(embeddings))),
+            num_sub_vectors=num_sub_vectors or _default_sub_vectors(dimension),
+            vector_column_name="vector",
+            replace=True,
+        )
+    return table
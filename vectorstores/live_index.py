@@ -0,0 +1,219 @@
+"""
+Live-updating vector index for a running app.
+
+A PollingWatcher reports debounced changes under the watched folders (for
+example `uploads/` and `data/`). A background thread loads, splits and embeds
+only the affected files and then applies the result to the in-memory index.
+MutableIndex searches read a published snapshot of the index without taking
+any lock, so queries never wait on loading, embedding, upserts or compaction.
+A file's new chunks are upserted before its leftover old chunks are deleted,
+so a query during the update sees the file's old or new chunks, never neither.
+
+A file that fails to load or embed is retried on a later poll, up to
+`max_retries` times, instead of being dropped.
+
+Freshness lag is the time from a change being detected to it being
+searchable; it is reported for the last applied batch and, while changes are
+waiting, for the oldest unapplied change.
+"""
+
+import os
+import queue
+import threading
+import time
+from utils.file_watcher import PollingWatcher
+
+class LiveIndex:
+    """
+    Keep a MutableIndex in sync with source folders.
+
+    Args:
+        index (MutableIndex): Index to update, possibly already populated.
+        chunk_file (callable): Function taking a file path and returning its list of chunk texts.
+        embed_fn (callable): Function taking a list of texts and returning an np.ndarray.
+        directories (list of str): Folders to watch.
+        interval (float): Seconds between scans of the folders.
+        debounce (float): Seconds a file must stay unchanged before it is ingested.
+        extensions (iterable of str): File extensions to watch, e.g. set(LOADERS_BY_EXTENSION).
+            Defaults to every file.
+        max_retries (int): Number of later polls on which a failed file is retried.
+    """
+
+    def __init__(self, index, chunk_file, embed_fn, directories=("uploads", "data"),
+                 interval=1.0, debounce=2.0, extensions=None, max_retries=3):
+        self.index = index
+        self.chunk_file = chunk_file
+        self.embed_fn = embed_fn
+        self.interval = interval
+        self.max_retries = max_retries
+        # Serializes writers only; searches never take it.
+        self._write_lock = threading.Lock()
+        self._failed = {}
+        self._retry_at = 0.0
+        self.watcher = PollingWatcher(directories, self._enqueue,
+                                      interval=interval, debounce=debounce, extensions=extensions)
+        self._changes = queue.Queue()
+        self._pending_detected = {}
+        self._pending_lock = threading.Lock()
+        # Chunk ids are "<relpath>:<ordinal>" with the path relative to its watched folder, as
+        # update_index writes them, so an index built by update_index from a watched folder is tracked too.
+        self._chunk_ids = {}
+        for id_ in index.ids:
+            self._chunk_ids.setdefault(id_.rsplit(":", 1)[0], []).append(id_)
+        self._worker = None
+        self._stop = threading.Event()
+        self.metrics = {
+            "batches_applied": 0, "files_applied": 0, "failures": 0, "files_dropped": 0, "last_lag_seconds": None,
+        }
+
+    def _enqueue(self, changes):
+        with self._pending_lock:
+            for path, change in changes.items():
+                self._pending_detected.setdefault(path, change["detected"])
+        self._changes.put(changes)
+
+    def search(self, query_embedding, k=4):
+        """
+        Search the index as of the last applied change.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+
+        Returns:
+            list of dict: Results of MutableIndex.search.
+        """
+        return self.index.search(query_embedding, k)
+
+    def freshness_lag(self):
+        """
+        Return the seconds the oldest unapplied change has been waiting, or 0.0 if the index is current.
+
+        Returns:
+            float: Freshness lag in seconds.
+        """
+        with self._pending_lock:
+            if not self._pending_detected:
+                return 0.0
+            return time.time() - min(self._pending_detected.values())
+
+    def _relpath(self, path):
+        """
+        Return a path relative to the watched folder that contains it.
+
+        Files with the same relative path in two watched folders share their chunk ids.
+        """
+        absolute = os.path.abspath(path)
+        for directory in self.watcher.directories:
+            root = os.path.abspath(directory)
+            if os.path.commonpath([absolute, root]) == root:
+                return os.path.relpath(absolute, root)
+        return path
+
+    def _prepare(self, path, event):
+        """
+        Chunk and embed one changed file outside the lock.
+
+        Returns:
+            tuple: (chunk ids, embeddings, texts) to upsert; empty for a deleted file.
+        """
+        if event == "deleted":
+            return [], None, []
+        chunks = self.chunk_file(path)
+        if not chunks:
+            return [], None, []
+        relpath = self._relpath(path)
+        return [f"{relpath}:{ordinal}" for ordinal in range(len(chunks))], self.embed_fn(chunks), chunks
+
+    def apply(self, changes):
+        """
+        Ingest a batch of file changes and apply them to the index.
+
+        Files that fail are kept and retried on a later poll, see max_retries.
+
+        Args:
+            changes (dict): Changes reported by PollingWatcher.
+        """
+        prepared, failed, dropped = {}, {}, []
+        for path, change in changes.items():
+            try:
+                prepared[path] = self._prepare(path, change["event"])
+            except Exception as e:
+                self.metrics["failures"] += 1
+                attempts = change.get("attempts", 0) + 1
+                if attempts <= self.max_retries:
+                    failed[path] = {**change, "attempts": attempts}
+                    print(f"Error occurred while ingesting {path} (attempt {attempts}), will retry: {e}")
+                else:
+                    dropped.append(path)
+                    print(f"Error occurred while ingesting {path}, giving up after {attempts} attempts: {e}")
+
+        with self._write_lock:
+            for path, (ids, embeddings, texts) in prepared.items():
+                relpath = self._relpath(path)
+                stale = set(self._chunk_ids.pop(relpath, [])) - set(ids)
+                if ids:
+                    metadata = [{"source": relpath, "chunk": ordinal} for ordinal in range(len(ids))]
+                    self.index.upsert(ids, embeddings, texts, metadata)
+                    self._chunk_ids[relpath] = ids
+                self.index.delete(sorted(stale))
+            for path in prepared:
+                self._failed.pop(path, None)
+            self._failed.update(failed)
+            if failed:
+                self._retry_at = time.time() + self.interval
+
+        applied_at = time.time()
+        with self._pending_lock:
+            detected = [self._pending_detected.pop(path, applied_at) for path in list(prepared) + dropped]
+        self.metrics["batches_applied"] += 1
+        self.metrics["files_applied"] += len(prepared)
+        self.metrics["files_dropped"] += len(dropped)
+        self.metrics["last_lag_seconds"] = applied_at - min(detected) if detected else 0.0
+
+    def _due_retries(self):
+        """
+        Take the failed changes whose retry time has come.
+
+        Returns:
+            dict: Changes to retry, empty if none are due.
+        """
+        with self._write_lock:
+            if not self._failed or time.time() < self._retry_at:
+                return {}
+            retries, self._failed = self._failed, {}
+            return retries
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                changes = self._changes.get(timeout=0.5)
+            except queue.Empty:
+                changes = {}
+            # A newer event for a failed file replaces its retry but keeps the attempt count.
+            retries = self._due_retries()
+            for path, change in changes.items():
+                if path in retries:
+                    change = {**change, "attempts": retries.pop(path)["attempts"]}
+                retries[path] = change
+            if retries:
+                self.apply(retries)
+
+    def start(self):
+        """
+        Start watching the folders and applying changes in the background.
+        """
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        self.watcher.start()
+
+    def stop(self):
+        """
+        Stop watching and wait for the background threads to exit.
+        """
+        self.watcher.stop()
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,222 @@
+"""
+Metadata pre-filtered vector search.
+
+Document metadata is stored column by column: each field keeps its distinct
+values and one packed bitmap per value marking the rows that hold it. A filter
+expression such as "sign=leo, period=weekly, date=this week" is evaluated to a
+single bitmap with bitwise operations before any vector is touched, and the
+similarity computation then runs only over the matching rows. The more
+selective the filter, the less work a search does, and scoped queries always
+get k results when k rows match.
+
+Filter syntax: comma-separated conditions that must all hold. Each condition
+is `field=value`, `field=value1|value2` (any of the values) or `field!=value`.
+Values are case-insensitive and spaces are read as underscores. A relative
+"date" value such as "this week" or "yesterday" is resolved against the
+current day when the filter is evaluated (see loaders.path_metadata).
+"""
+
+import numpy as np
+from loaders.path_metadata import RELATIVE_DATES, resolve_relative_date, date_labels
+from retrieval.search_kernels import squared_norms, squared_l2_distances, top_k
+
+def _normalize(value):
+    return str(value).strip().lower().replace(" ", "_")
+
+def _resolve_values(field, values, today):
+    """
+    Replace relative "date" values with the concrete labels of their span.
+    """
+    if field != "date":
+        return values
+    resolved = []
+    for value in values:
+        if value in RELATIVE_DATES:
+            resolved.extend(_normalize(label) for label in date_labels(*resolve_relative_date(value, today)))
+        else:
+            resolved.append(value)
+    return resolved
+
+def parse_filter(expression, today=None):
+    """
+    Parse a filter expression into conditions.
+
+    Args:
+        expression (str or dict): Filter string, or a dict mapping fields to a value
+            or a list of accepted values.
+        today (datetime.date): Day relative "date" values are resolved against. Defaults to today.
+
+    Returns:
+        list of tuple: (field, values, negate) conditions.
+    """
+    if isinstance(expression, dict):
+        clauses = [
+            (field, [_normalize(v) for v in (values if isinstance(values, (list, tuple, set)) else [values])], False)
+            for field, values in expression.items()
+        ]
+    else:
+        clauses = []
+        for clause in expression.split(","):
+            if not clause.strip():
+                continue
+            negate = "!=" in clause
+            field, sep, values = clause.partition("!=" if negate else "=")
+            if not sep:
+                raise ValueError(f"Invalid filter condition: {clause.strip()!r}. Expected field=value.")
+            clauses.append((field.strip().lower(), [_normalize(v) for v in values.split("|")], negate))
+    return [(field, _resolve_values(field, values, today), negate) for field, values, negate in clauses]
+
+class MetadataIndex:
+    """
+    Columnar metadata with one packed bitmap per field value.
+
+    Args:
+        records (list of dict): Metadata of each row. Missing fields are stored as "".
+        fields (list of str): Fields to index. Defaults to every key found in the records.
+    """
+
+    def __init__(self, records, fields=None):
+        self.num_rows = len(records)
+        if fields is None:
+            fields = sorted({field for record in records for field in record})
+        self.fields = list(fields)
+        self.values = {}
+        self.codes = {}
+        self.bitmaps = {}
+        for field in self.fields:
+            column = [_normalize(record.get(field, "")) for record in records]
+            values, codes = np.unique(np.array(column, dtype=object), return_inverse=True)
+            self.values[field] = values.tolist()
+            self.codes[field] = codes.astype(np.int32)
+            self.bitmaps[field] = {
+                value: np.packbits(self.codes[field] == code)
+                for code, value in enumerate(self.values[field])
+            }
+
+    def _empty(self):
+        return np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+
+    def _full(self):
+        return np.packbits(np.ones(self.num_rows, dtype=bool))
+
+    def bitmap(self, expression, today=None):
+        """
+        Evaluate a filter expression to a packed bitmap of matching rows.
+
+        Args:
+            expression (str or dict): Filter expression, see parse_filter.
+            today (datetime.date): Day relative dates are resolved against. Defaults to today.
+
+        Returns:
+            np.ndarray: Packed bitmap (np.uint8) with one bit per row.
+        """
+        result = self._full()
+        for field, values, negate in parse_filter(expression, today):
+            if field not in self.bitmaps:
+                raise ValueError(f"Unknown metadata field: {field}. Indexed fields: {', '.join(self.fields)}")
+            matched = self._empty()
+            for value in values:
+                if value in self.bitmaps[field]:
+                    np.bitwise_or(matched, self.bitmaps[field][value], out=matched)
+            if negate:
+                matched = np.bitwise_and(np.invert(matched), self._full())
+            np.bitwise_and(result, matched, out=result)
+        return result
+
+    def rows(self, expression, today=None):
+        """
+        Return the indices of the rows matching a filter expression.
+
+        Args:
+            expression (str or dict): Filter expression, see parse_filter.
+            today (datetime.date): Day relative dates are resolved against. Defaults to today.
+
+        Returns:
+            np.ndarray: Sorted row indices.
+        """
+        return np.flatnonzero(np.unpackbits(self.bitmap(expression, today), count=self.num_rows))
+
+    def column(self, field):
+        """
+        Return the values of a field for every row.
+
+        Args:
+            field (str): Indexed field.
+
+        Returns:
+            np.ndarray: Values of the field, one per row.
+        """
+        return np.array(self.values[field], dtype=object)[self.codes[field]]
+
+class FilteredVectorIndex:
+    """
+    Exact L2 vector search restricted to the rows that match a metadata filter.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        metadata (list of dict): Metadata of each row, e.g. from loaders.path_metadata.
+        texts (list of str): Optional text of each row, returned with the results.
+        fields (list of str): Metadata fields to index. Defaults to every field.
+    """
+
+    def __init__(self, embeddings, metadata, texts=None, fields=None):
+        if len(embeddings) != len(metadata):
+            raise ValueError("embeddings and metadata must have the same length.")
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.sq_norms = squared_norms(self.embeddings)
+        self.metadata = metadata
+        self.texts = texts
+        self.index = MetadataIndex(metadata, fields)
+
+    def search(self, query_embedding, k=4, filter=None, today=None):
+        """
+        Return the k nearest rows that match a filter.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+            filter (str or dict): Filter expression, see parse_filter. None searches every row.
+            today (datetime.date): Day relative dates in the filter are resolved against.
+                Defaults to today.
+
+        Returns:
+            list of dict: Results with "row", "distance", "metadata" and "text", nearest first.
+        """
+        return self.search_batch(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), k, filter, today)[0]
+
+    def search_batch(self, query_embeddings, k=4, filter=None, today=None):
+        """
+        Return the k nearest matching rows for each of several queries.
+
+        The filter is evaluated once and all queries are scored in one pass over the matching rows.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+            filter (str or dict): Filter expression, see parse_filter. None searches every row.
+            today (datetime.date): Day relative dates in the filter are resolved against.
+
+        Returns:
+            list of list of dict: Results of search for each query, in query order.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if filter is None:
+            rows = None
+            distances = squared_l2_distances(queries, self.embeddings, self.sq_norms)
+        else:
+            rows = self.index.rows(filter, today)
+            distances = squared_l2_distances(queries, self.embeddings[rows], self.sq_norms[rows])
+        indices, values = top_k(distances, k)
+        hits = indices if rows is None else rows[indices]
+        return [
+            [
+                {
+                    "row": int(row),
+                    "distance": float(distance),
+                    "metadata": self.metadata[row],
+                    "text": self.texts[row] if self.texts is not None else None,
+                }
+                for row, distance in zip(query_hits, query_distances)
+            ]
+            for query_hits, query_distances in zip(hits.tolist(), values.tolist())
+        ]
@@ -0,0 +1,318 @@
+"""
+Mutable vector index with stable ids, tombstone deletes and background compaction.
+
+Rows are addressed by external ids (for example a file path plus chunk
+ordinal). Deleting an id only marks its row as a tombstone, and upserting an
+id tombstones the old row and appends the new one, so updates cost as much as
+the change rather than a rebuild. Once the share of tombstoned rows crosses a
+threshold, a background thread rewrites the index without them.
+
+Searches never take the write lock. They read the current state once and use
+only the rows that existed at that moment, so they keep running while writes
+append rows and while a compaction builds the replacement state, which is
+swapped in with a single reference assignment.
+
+Vectors can be stored as float16 or int8 (see vectorstores.quantization) to fit
+more rows in memory; the dtype is kept by save and load. An int8 index fits its
+scale and offset on the first rows upserted, and later rows are clipped to that
+range.
+"""
+
+import json
+import threading
+import numpy as np
+from retrieval.search_kernels import squared_l2_distances, top_k
+from .quantization import QuantizedEmbeddings, check_storage_dtype, quantize
+
+class _IndexState:
+    """
+    Row storage of a MutableIndex. Rows below `count` are never modified except
+    for their live flag, so readers can use them without locking.
+    """
+
+    def __init__(self, dimension, capacity, dtype="float32", scale=None, offset=None):
+        self.vectors = np.zeros((capacity, dimension), dtype=dtype)
+        self.sq_norms = np.zeros(capacity, dtype=np.float32)
+        self.scale = scale
+        self.offset = offset
+        self.live = np.zeros(capacity, dtype=bool)
+        self.ids = []
+        self.texts = []
+        self.metadata = []
+        self.row_of = {}
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return len(self.vectors)
+
+    def stored(self):
+        """Return the first `count` rows as QuantizedEmbeddings."""
+        return QuantizedEmbeddings(self.vectors[:self.count], self.sq_norms[:self.count], self.scale, self.offset)
+
+    def grown(self, capacity):
+        """Return a copy of this state with room for `capacity` rows."""
+        state = _IndexState(self.vectors.shape[1], capacity, self.vectors.dtype, self.scale, self.offset)
+        state.vectors[:self.count] = self.vectors[:self.count]
+        state.sq_norms[:self.count] = self.sq_norms[:self.count]
+        state.live[:self.count] = self.live[:self.count]
+        state.ids, state.texts, state.metadata = list(self.ids), list(self.texts), list(self.metadata)
+        state.row_of = dict(self.row_of)
+        state.count = self.count
+        return state
+
+class MutableIndex:
+    """
+    Exact L2 vector index supporting upsert and delete by id.
+
+    Args:
+        dimension (int): Embedding dimension.
+        compaction_threshold (float): Tombstone ratio above which the index is compacted.
+        background_compaction (bool): Compact on a background thread instead of inline.
+        initial_capacity (int): Number of rows allocated up front; grows by doubling.
+        storage_dtype (str): Dtype vectors are stored in, one of
+            vectorstores.quantization.STORAGE_DTYPES.
+    """
+
+    def __init__(self, dimension, compaction_threshold=0.2, background_compaction=True, initial_capacity=1024,
+                 storage_dtype="float32"):
+        check_storage_dtype(storage_dtype)
+        self.dimension = dimension
+        self.compaction_threshold = compaction_threshold
+        self.background_compaction = background_compaction
+        self.storage_dtype = storage_dtype
+        self._state = _IndexState(dimension, initial_capacity, storage_dtype)
+        self._write_lock = threading.RLock()
+        self._compaction = None
+
+    def upsert(self, ids, embeddings, texts=None, metadata=None):
+        """
+        Insert rows, replacing any existing rows with the same ids.
+
+        Args:
+            ids (list of str): External id of each row.
+            embeddings (np.ndarray): Embeddings of shape (n, dim).
+            texts (list of str): Optional text of each row.
+            metadata (list of dict): Optional metadata of each row.
+        """
+        if len(ids) == 0:
+            return
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if len(ids) != len(embeddings):
+            raise ValueError("ids and embeddings must have the same length.")
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must be unique within one upsert.")
+        texts = texts if texts is not None else [None] * len(ids)
+        metadata = metadata if metadata is not None else [None] * len(ids)
+        with self._write_lock:
+            state = self._state
+            encoded = quantize(embeddings, self.storage_dtype, scale=state.scale, offset=state.offset)
+            if state.count + len(ids) > state.capacity:
+                capacity = state.capacity
+                while state.count + len(ids) > capacity:
+                    capacity *= 2
+                state = state.grown(capacity)
+            start, end = state.count, state.count + len(ids)
+            state.vectors[start:end] = encoded.codes
+            state.sq_norms[start:end] = encoded.sq_norms
+            if state.scale is None:
+                state.scale, state.offset = encoded.scale, encoded.offset
+            state.live[start:end] = True
+            state.ids.extend(ids)
+            state.texts.extend(texts)
+            state.metadata.extend(metadata)
+            # Publish the new rows before tombstoning the rows they replace, so a
+            # concurrent search sees an upserted id at least once, never zero times.
+            state.count = end
+            self._state = state
+            self._tombstone(state, ids)
+            state.row_of.update(zip(ids, range(start, end)))
+        self._maybe_compact()
+
+    def delete(self, ids):
+        """
+        Delete rows by id. Unknown ids are ignored.
+
+        Args:
+            ids (list of str): Ids to delete.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        with self._write_lock:
+            deleted = self._tombstone(self._state, ids)
+        self._maybe_compact()
+        return deleted
+
+    def _tombstone(self, state, ids):
+        rows = [state.row_of.pop(id_) for id_ in ids if id_ in state.row_of]
+        state.live[rows] = False
+        return len(rows)
+
+    def search(self, query_embedding, k=4):
+        """
+        Return the k nearest live rows.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+
+        Returns:
+            list of dict: Results with "id", "distance", "text" and "metadata", nearest first.
+        """
+        return self.search_batch(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), k)[0]
+
+    def search_batch(self, query_embeddings, k=4):
+        """
+        Return the k nearest live rows for each of several queries, scored in one pass.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+
+        Returns:
+            list of list of dict: Results of search for each query, in query order.
+        """
+        state = self._state
+        count = state.count
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if self.storage_dtype == "float32":
+            distances = squared_l2_distances(queries, state.vectors[:count], state.sq_norms[:count])
+        else:
+            distances = state.stored().squared_l2_distances(queries)
+        distances[:, ~state.live[:count]] = np.inf
+        indices, values = top_k(distances, k)
+        return [
+            [
+                {"id": state.ids[row], "distance": float(distance), "text": state.texts[row], "metadata": state.metadata[row]}
+                for row, distance in zip(rows, row_distances)
+                if np.isfinite(distance)
+            ]
+            for rows, row_distances in zip(indices.tolist(), values.tolist())
+        ]
+
+    def __contains__(self, id_):
+        return id_ in self._state.row_of
+
+    def __len__(self):
+        return len(self._state.row_of)
+
+    @property
+    def ids(self):
+        """Ids of the live rows."""
+        return list(self._state.row_of)
+
+    @property
+    def tombstone_ratio(self):
+        """Share of stored rows that are deleted or replaced."""
+        state = self._state
+        return 1.0 - len(state.row_of) / state.count if state.count else 0.0
+
+    def _maybe_compact(self):
+        if self.tombstone_ratio <= self.compaction_threshold:
+            return
+        if not self.background_compaction:
+            self.compact()
+        elif self._compaction is None or not self._compaction.is_alive():
+            self._compaction = threading.Thread(target=self.compact, daemon=True)
+            self._compaction.start()
+
+    def compact(self):
+        """
+        Rewrite the index without tombstoned rows.
+
+        Writes wait for the compaction; searches keep using the previous state
+        until the compacted one is swapped in.
+        """
+        with self._write_lock:
+            state = self._state
+            rows = np.flatnonzero(state.live[:state.count])
+            compacted = _IndexState(
+                self.dimension, max(len(rows) * 2, 1024), self.storage_dtype, state.scale, state.offset
+            )
+            compacted.vectors[:len(rows)] = state.vectors[rows]
+            compacted.sq_norms[:len(rows)] = state.sq_norms[rows]
+            compacted.live[:len(rows)] = True
+            row_list = rows.tolist()
+            compacted.ids = [state.ids[row] for row in row_list]
+            compacted.texts = [state.texts[row] for row in row_list]
+            compacted.metadata = [state.metadata[row] for row in row_list]
+            compacted.row_of = {id_: row for row, id_ in enumerate(compacted.ids)}
+            compacted.count = len(rows)
+            self._state = compacted
+
+    def wait_for_compaction(self):
+        """
+        Block until a running background compaction has finished.
+        """
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def save(self, path):
+        """
+        Save the live rows to an .npz file, keeping the storage dtype.
+
+        Args:
+            path (str): File path.
+        """
+        with self._write_lock:
+            state = self._state
+            rows = np.flatnonzero(state.live[:state.count])
+            row_list = rows.tolist()
+            header = {
+                "ids": [state.ids[row] for row in row_list],
+                "texts": [state.texts[row] for row in row_list],
+                "metadata": [state.metadata[row] for row in row_list],
+            }
+            arrays = {"vectors": state.vectors[rows], "header": np.array(json.dumps(header))}
+            if state.scale is not None:
+                arrays.update(scale=state.scale, offset=state.offset)
+            np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path, block_size=65536, **kwargs):
+        """
+        Load an index saved with save.
+
+        The index keeps the storage dtype it was saved with unless `storage_dtype` is
+        passed; an int8 index keeps its scale and offset, so its codes are unchanged.
+
+        Args:
+            path (str): File path.
+            block_size (int): Rows converted to float32 at a time while loading.
+            **kwargs: Arguments passed to MutableIndex.
+
+        Returns:
+            MutableIndex: The loaded index.
+        """
+        with np.load(path) as data:
+            stored = read_stored_vectors(data)
+            header = json.loads(str(data["header"]))
+        kwargs.setdefault("storage_dtype", stored.dtype)
+        index = cls(stored.codes.shape[1], **kwargs)
+        if index.storage_dtype == stored.dtype:
+            index._state.scale, index._state.offset = stored.scale, stored.offset
+        for start in range(0, len(stored), block_size):
+            end = start + block_size
+            index.upsert(
+                header["ids"][start:end], stored.dequantize(start, end),
+                header["texts"][start:end], header["metadata"][start:end],
+            )
+        return index
+
+def read_stored_vectors(data):
+    """
+    Read the vectors of a loaded .npz written by MutableIndex.save or write_delta.
+
+    Args:
+        data (NpzFile): Open .npz file with "vectors" and, for int8, "scale" and "offset".
+
+    Returns:
+        QuantizedEmbeddings: The vectors in their stored dtype. Row norms are not read.
+    """
+    return QuantizedEmbeddings(
+        data["vectors"],
+        None,
+        data["scale"] if "scale" in data else None,
+        data["offset"] if "offset" in data else None,
+    )
@@ -0,0 +1,290 @@
+"""
+Date-partitioned vector index with query routing and TTL retirement.
+
+Every time bucket the scraper writes (a dated folder, a `week_N` folder, a
+month folder or a year folder) becomes its own sub-index covering a date
+span. A query is routed to the partitions implied by its time scope, such as
+"today" or "this_week", so its cost tracks the live window rather than the
+whole history. Partitions whose span ended more than a TTL ago are retired:
+dropped, or written to cold storage from which they can be restored.
+
+Rows without a time bucket (a README, an uploaded manual) go to a single
+"undated" partition. It is searched when a query has no time scope and is
+never retired.
+"""
+
+import heapq
+import json
+import os
+from datetime import date, timedelta
+import numpy as np
+from loaders.path_metadata import MONTHS, RELATIVE_DATES, bucket_span, date_label, iso_week_start
+from .metadata_index import FilteredVectorIndex
+
+# Scope name -> (period of the window to search, offset from the current bucket).
+SCOPES = RELATIVE_DATES
+UNDATED = "undated"
+
+def infer_reference_year(metadata):
+    """
+    Infer the year of weekly and monthly folders from the dated records of a corpus.
+
+    Daily folders carry a full date, so the latest year among them is the year the
+    corpus was scraped in.
+
+    Args:
+        metadata (list of dict): Path metadata of the corpus rows.
+
+    Returns:
+        int: The latest daily year, or None if no row is daily.
+    """
+    years = [int(record["year"]) for record in metadata if record.get("period") == "daily" and record.get("year")]
+    return max(years) if years else None
+
+def partition_key(metadata, reference_year=None):
+    """
+    Return the partition key and date span of a document from its path metadata.
+
+    Metadata from parse_path_metadata carries the resolved span of each file in
+    "start_date"/"end_date". Records without it fall back to `reference_year` for
+    weekly and monthly folders, which do not record their year.
+
+    Args:
+        metadata (dict): Metadata from loaders.path_metadata.parse_path_metadata.
+        reference_year (int): Year of weekly and monthly folders without a resolved span.
+
+    Returns:
+        tuple: (key, period, (first day, last day)), or ("undated", "undated", None) for a
+            document without a time bucket.
+    """
+    period = metadata.get("period")
+    if period not in ("daily", "weekly", "monthly", "yearly"):
+        return UNDATED, UNDATED, None
+    if metadata.get("start_date"):
+        start = date.fromisoformat(metadata["start_date"])
+    elif period == "daily":
+        start = date.fromisoformat(metadata["date"])
+    elif period == "yearly":
+        start = date(int(metadata["year"]), 1, 1)
+    elif reference_year is None:
+        raise ValueError(
+            f"The year of {metadata.get('source', metadata)} is unknown; pass reference_year "
+            "or load it with parse_path_metadata."
+        )
+    elif period == "weekly":
+        start = iso_week_start(reference_year, int(metadata["week"]))
+    else:
+        start = date(reference_year, MONTHS.index(metadata["month"]) + 1, 1)
+    span = bucket_span(period, start)
+    return f"{period}:{date_label(period, span[0])}", period, span
+
+class Partition:
+    """
+    One time bucket with its own vector index.
+
+    Args:
+        key (str): Partition key, e.g. 'weekly:2024-W26'.
+        period (str): Period of the bucket.
+        span (tuple): (first day, last day) covered by the bucket, or None for the undated partition.
+    """
+
+    def __init__(self, key, period, span):
+        self.key = key
+        self.period = period
+        self.span = span
+        self.embeddings = []
+        self.metadata = []
+        self.texts = []
+        self._index = None
+
+    def add(self, embeddings, metadata, texts):
+        self.embeddings.append(np.asarray(embeddings, dtype=np.float32))
+        self.metadata.extend(metadata)
+        self.texts.extend(texts)
+        self._index = None
+
+    @property
+    def index(self):
+        """FilteredVectorIndex over the partition, rebuilt after additions."""
+        if self._index is None:
+            self.embeddings = [np.concatenate(self.embeddings)]
+            self._index = FilteredVectorIndex(self.embeddings[0], self.metadata, self.texts)
+        return self._index
+
+    def __len__(self):
+        return len(self.metadata)
+
+class PartitionedIndex:
+    """
+    Vector index split into one partition per time bucket.
+
+    Args:
+        reference_year (int): Year of weekly and monthly folders whose metadata has no
+            resolved span. Defaults to the latest daily year of the first add() that has
+            daily rows, and stays fixed from then on so partition keys never move.
+    """
+
+    def __init__(self, reference_year=None):
+        self.reference_year = reference_year
+        self.partitions = {}
+        self.cold = {}
+
+    def add(self, embeddings, metadata, texts=None):
+        """
+        Add rows, each routed to the partition of its time bucket.
+
+        Rows without a time bucket, or whose year cannot be resolved, go to the undated partition.
+
+        Args:
+            embeddings (np.ndarray): Embeddings of shape (n, dim).
+            metadata (list of dict): Path metadata of each row.
+            texts (list of str): Optional text of each row.
+
+        Returns:
+            int: Number of rows added to the undated partition.
+        """
+        texts = texts if texts is not None else [None] * len(metadata)
+        if self.reference_year is None:
+            self.reference_year = infer_reference_year(metadata)
+        groups = {}
+        for row, record in enumerate(metadata):
+            try:
+                key, period, span = partition_key(record, self.reference_year)
+            except ValueError as e:
+                # A weekly or monthly row whose year is unknown cannot be placed in time.
+                print(f"Error occurred while partitioning {record.get('source', row)}: {e}")
+                key, period, span = UNDATED, UNDATED, None
+            if key not in self.partitions:
+                self.partitions[key] = Partition(key, period, span)
+            groups.setdefault(key, []).append(row)
+        for key, rows in groups.items():
+            self.partitions[key].add(embeddings[rows], [metadata[r] for r in rows], [texts[r] for r in rows])
+        return len(groups.get(UNDATED, []))
+
+    def route(self, scope=None, today=None, start=None, end=None):
+        """
+        Select the partitions a query needs to search.
+
+        Every dated partition whose span overlaps the window is searched, whatever its
+        period: "this_week" searches the daily partitions of the week, the weekly one, and
+        the monthly and yearly partitions that contain it. The undated partition is only
+        searched when the query has no window.
+
+        Args:
+            scope (str): One of SCOPES, e.g. "today" or "this_week". None routes by
+                `start`/`end` only, or to every partition if those are unset too.
+            today (datetime.date): Reference day for the scope. Defaults to today.
+            start (datetime.date): First day of an explicit date window, across all periods.
+            end (datetime.date): Last day of an explicit date window.
+
+        Returns:
+            list of Partition: Partitions overlapping the requested window.
+        """
+        if scope is not None:
+            if scope not in SCOPES:
+                raise ValueError(f"Unknown scope: {scope}. Available scopes: {', '.join(SCOPES)}")
+            period, offset = SCOPES[scope]
+            start, end = bucket_span(period, today or date.today(), offset)
+        if start is None and end is None:
+            return list(self.partitions.values())
+        start = start or date.min
+        end = end or date.max
+        return [
+            partition for partition in self.partitions.values()
+            if partition.span is not None and partition.span[0] <= end and partition.span[1] >= start
+        ]
+
+    def search(self, query_embedding, k=4, scope=None, today=None, start=None, end=None, filter=None):
+        """
+        Search the partitions routed for a query and merge their results.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+            scope, today, start, end: Time scope of the query, see route.
+            filter (str or dict): Metadata filter applied within each partition.
+
+        Returns:
+            list of dict: Results with "row", "distance", "metadata", "text" and "partition",
+                nearest first. "row" is relative to the partition.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.search_batch(query, k, scope, today, start, end, filter)[0]
+
+    def search_batch(self, query_embeddings, k=4, scope=None, today=None, start=None, end=None, filter=None):
+        """
+        Search several queries with the same time scope; each partition scores them in one pass.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+            scope, today, start, end: Time scope of the queries, see route.
+            filter (str or dict): Metadata filter applied within each partition.
+
+        Returns:
+            list of list of dict: Results of search for each query, in query order.
+        """
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        candidates = [[] for _ in range(len(query_embeddings))]
+        for partition in self.route(scope, today, start, end):
+            for query_candidates, hits in zip(candidates, partition.index.search_batch(query_embeddings, k, filter, today)):
+                for hit in hits:
+                    hit["partition"] = partition.key
+                query_candidates.extend(hits)
+        return [heapq.nsmallest(k, hits, key=lambda hit: hit["distance"]) for hits in candidates]
+
+    def retire(self, ttl_days, today=None, cold_dir=None):
+        """
+        Retire partitions whose span ended more than `ttl_days` before today.
+
+        Args:
+            ttl_days (int): Days a partition stays live after its span ends.
+            today (datetime.date): Reference day. Defaults to today.
+            cold_dir (str): Directory to move retired partitions to. If None they are dropped.
+
+        Returns:
+            list of str: Keys of the retired partitions.
+        """
+        cutoff = (today or date.today()) - timedelta(days=ttl_days)
+        expired = [
+            key for key, partition in self.partitions.items()
+            if partition.span is not None and partition.span[1] < cutoff
+        ]
+        for key in expired:
+            partition = self.partitions.pop(key)
+            if cold_dir is not None:
+                self.cold[key] = self._save_cold(partition, cold_dir)
+        return expired
+
+    def _save_cold(self, partition, cold_dir):
+        os.makedirs(cold_dir, exist_ok=True)
+        path = os.path.join(cold_dir, partition.key.replace(":", "_") + ".npz")
+        header = {
+            "key": partition.key,
+            "period": partition.period,
+            "span": [day.isoformat() for day in partition.span],
+            "metadata": partition.metadata,
+            "texts": partition.texts,
+        }
+        np.savez(path, embeddings=partition.index.embeddings, header=np.array(json.dumps(header)))
+        return path
+
+    def restore(self, key):
+        """
+        Bring a partition back from cold storage.
+
+        Args:
+            key (str): Key of a retired partition.
+
+        Returns:
+            Partition: The restored partition.
+        """
+        with np.load(self.cold.pop(key)) as data:
+            header = json.loads(str(data["header"]))
+            partition = Partition(header["key"], header["period"], tuple(date.fromisoformat(d) for d in header["span"]))
+            partition.add(data["embeddings"], header["metadata"], header["texts"])
+        self.partitions[key] = partition
+        return partition
+
+    def __len__(self):
+        return sum(len(partition) for partition in self.partitions.values())
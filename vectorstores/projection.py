@@ -0,0 +1,140 @@
+"""
+Corpus-fitted dimension reduction for stored embeddings.
+
+A Projection maps embeddings to fewer dimensions before they are stored, and
+the same projection is applied to every query:
+
+- "pca" fits the principal components of the corpus and keeps the top ones.
+- "truncate" keeps the leading dimensions, for models trained Matryoshka-style
+  whose prefixes are themselves usable embeddings; rows are re-normalized.
+
+Index memory and search time scale with the stored dimension, so
+recall_by_dimension reports how much recall each target dimension keeps
+before one is chosen.
+"""
+
+import numpy as np
+from retrieval.metrics import recall_at_k
+from retrieval.search_kernels import squared_l2_distances, top_k
+
+METHODS = ("pca", "truncate")
+
+class Projection:
+    """
+    Linear projection of embeddings to `dimension` components.
+
+    Args:
+        method (str): "pca" or "truncate".
+        dimension (int): Target dimension.
+    """
+
+    def __init__(self, method, dimension):
+        if method not in METHODS:
+            raise ValueError(f"Unknown projection method: {method}. Available methods: {', '.join(METHODS)}")
+        self.method = method
+        self.dimension = dimension
+        self.mean = None
+        self.components = None
+
+    def fit(self, embeddings, max_samples=100_000, seed=0):
+        """
+        Fit the projection on the corpus.
+
+        Args:
+            embeddings (np.ndarray): Corpus embeddings of shape (n, dim).
+            max_samples (int): Rows sampled to estimate the principal components.
+            seed (int): Seed of the row sample.
+
+        Returns:
+            Projection: self.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.dimension > embeddings.shape[1]:
+            raise ValueError(f"Target dimension {self.dimension} exceeds the embedding dimension {embeddings.shape[1]}.")
+        if self.method == "pca":
+            if len(embeddings) > max_samples:
+                rows = np.random.default_rng(seed).choice(len(embeddings), max_samples, replace=False)
+                embeddings = embeddings[rows]
+            self.mean = embeddings.mean(axis=0)
+            centered = embeddings - self.mean
+            # The covariance is dim x dim, so its eigendecomposition is cheap for any corpus size.
+            eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+            self.components = np.ascontiguousarray(eigenvectors[:, ::-1][:, :self.dimension], dtype=np.float32)
+        return self
+
+    def transform(self, embeddings):
+        """
+        Project embeddings or queries.
+
+        Args:
+            embeddings (np.ndarray): Array of shape (n, dim) or (dim,).
+
+        Returns:
+            np.ndarray: Projected float32 array of shape (n, dimension) or (dimension,).
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.method == "pca":
+            if self.components is None:
+                raise RuntimeError("The projection must be fitted before it is applied.")
+            return (embeddings - self.mean) @ self.components
+        truncated = embeddings[..., :self.dimension]
+        norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+        return truncated / np.maximum(norms, 1e-12)
+
+    def save(self, path):
+        """
+        Save the projection to an .npz file.
+
+        Args:
+            path (str): File path.
+        """
+        arrays = {"method": np.array(self.method), "dimension": np.array(self.dimension)}
+        if self.method == "pca":
+            arrays.update(mean=self.mean, components=self.components)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a projection saved with save.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            Projection: The loaded projection.
+        """
+        with np.load(path) as data:
+            projection = cls(str(data["method"]), int(data["dimension"]))
+            if projection.method == "pca":
+                projection.mean = data["mean"]
+                projection.components = data["components"]
+        return projection
+
+def recall_by_dimension(embeddings, queries, dimensions, method="pca", k=10):
+    """
+    Measure recall@k of L2 search after projecting to each target dimension.
+
+    Args:
+        embeddings (np.ndarray): Corpus embeddings of shape (n, dim).
+        queries (np.ndarray): Query embeddings of shape (q, dim).
+        dimensions (list of int): Target dimensions to evaluate.
+        method (str): "pca" or "truncate".
+        k (int): Number of results per query.
+
+    Returns:
+        dict: Target dimension mapped to recall@k against search at full dimension.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    if method == "truncate":
+        # Truncated vectors are re-normalized, so compare against normalized full vectors.
+        full = Projection("truncate", embeddings.shape[1])
+        embeddings, queries = full.transform(embeddings), full.transform(queries)
+    exact, _ = top_k(squared_l2_distances(queries, embeddings), k)
+    recalls = {}
+    for dimension in dimensions:
+        projection = Projection(method, dimension).fit(embeddings)
+        approximate, _ = top_k(squared_l2_distances(projection.transform(queries), projection.transform(embeddings)), k)
+        recalls[dimension] = recall_at_k(approximate, exact)
+    return recalls
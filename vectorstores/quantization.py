@@ -0,0 +1,215 @@
+"""
+Scalar-quantized embedding storage.
+
+Embeddings can be stored as float32, float16 (half the memory) or int8 (a
+quarter), where int8 uses a per-dimension scale and offset fitted on the
+corpus so that each dimension's range maps onto [-127, 127]:
+
+    embedding ~= codes * scale + offset
+
+Search runs on the stored form directly. Rows are converted to float32 one
+block at a time, so only `block_size` rows are ever upcast; for int8 the
+scale is folded into the query and the offset into a per-query constant:
+
+    query . embedding ~= (query * scale) . codes + query . offset
+
+Squared row norms are computed once at quantization time from the
+dequantized values, so L2 distances need no extra pass over the matrix.
+
+MutableIndex, index snapshots and incremental_index deltas take a
+`storage_dtype` and keep their vectors in that dtype in memory and on disk.
+"""
+
+import numpy as np
+from retrieval.search_kernels import top_k
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+class QuantizedEmbeddings:
+    """
+    Embedding matrix stored as float32, float16 or int8.
+
+    Use quantize to create one and load to read one saved with save.
+
+    Args:
+        codes (np.ndarray): Stored values of shape (n, dim).
+        sq_norms (np.ndarray): Squared norm of each dequantized row.
+        scale (np.ndarray): Per-dimension scale for int8 storage, else None.
+        offset (np.ndarray): Per-dimension offset for int8 storage, else None.
+    """
+
+    def __init__(self, codes, sq_norms, scale=None, offset=None):
+        self.codes = codes
+        self.sq_norms = sq_norms
+        self.scale = scale
+        self.offset = offset
+
+    @property
+    def dtype(self):
+        """Storage dtype name."""
+        return self.codes.dtype.name
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored values and norms."""
+        return self.codes.nbytes + self.sq_norms.nbytes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def dequantize(self, start=0, end=None):
+        """
+        Return rows [start, end) as float32.
+
+        Args:
+            start (int): First row.
+            end (int): End row (exclusive). Defaults to the last row.
+
+        Returns:
+            np.ndarray: Array of shape (end - start, dim).
+        """
+        block = self.codes[start:end].astype(np.float32)
+        if self.scale is not None:
+            block *= self.scale
+            block += self.offset
+        return block
+
+    def inner_products(self, queries, block_size=65536):
+        """
+        Compute query-embedding inner products block by block on the stored form.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            block_size (int): Rows converted to float32 at a time.
+
+        Returns:
+            np.ndarray: Scores of shape (q, n).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self.scale is not None:
+            weights = (queries * self.scale).T
+            constant = (queries @ self.offset)[:, None]
+        else:
+            weights, constant = queries.T, 0.0
+        scores = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        for start in range(0, len(self.codes), block_size):
+            end = start + block_size
+            scores[:, start:end] = (self.codes[start:end].astype(np.float32) @ weights).T
+        scores += constant
+        return scores
+
+    def squared_l2_distances(self, queries, block_size=65536):
+        """
+        Compute squared L2 distances between queries and the stored embeddings.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            block_size (int): Rows converted to float32 at a time.
+
+        Returns:
+            np.ndarray: Distances of shape (q, n).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        distances = self.inner_products(queries, block_size)
+        distances *= -2.0
+        distances += np.einsum("ij,ij->i", queries, queries)[:, None]
+        distances += self.sq_norms[None, :]
+        return np.maximum(distances, 0.0, out=distances)
+
+    def search(self, queries, k=4, metric="l2", block_size=65536):
+        """
+        Return the top-k rows for each query.
+
+        Args:
+            queries (np.ndarray): Query vectors of shape (q, dim) or (dim,).
+            k (int): Number of results per query.
+            metric (str): "l2" (smallest squared distance) or "ip" (largest inner product).
+            block_size (int): Rows converted to float32 at a time.
+
+        Returns:
+            tuple: (indices, scores), each of shape (q, k), best first.
+        """
+        if metric == "l2":
+            return top_k(self.squared_l2_distances(queries, block_size), k)
+        if metric == "ip":
+            return top_k(self.inner_products(queries, block_size), k, largest=True)
+        raise ValueError(f"Unknown metric: {metric}. Use 'l2' or 'ip'.")
+
+    def save(self, path):
+        """
+        Save to an .npz file, keeping the storage dtype.
+
+        Args:
+            path (str): File path.
+        """
+        arrays = {"codes": self.codes, "sq_norms": self.sq_norms}
+        if self.scale is not None:
+            arrays.update(scale=self.scale, offset=self.offset)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load embeddings saved with save.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            QuantizedEmbeddings: The loaded embeddings, in their stored dtype.
+        """
+        with np.load(path) as data:
+            return cls(
+                data["codes"],
+                data["sq_norms"],
+                data["scale"] if "scale" in data else None,
+                data["offset"] if "offset" in data else None,
+            )
+
+def check_storage_dtype(dtype):
+    """
+    Raise if a storage dtype is not one of STORAGE_DTYPES.
+
+    Args:
+        dtype (str): Storage dtype name.
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unknown storage dtype: {dtype}. Available dtypes: {', '.join(STORAGE_DTYPES)}")
+
+def quantize(embeddings, dtype="int8", block_size=65536, scale=None, offset=None):
+    """
+    Convert embeddings to a storage dtype.
+
+    Args:
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        dtype (str): One of STORAGE_DTYPES.
+        block_size (int): Rows converted at a time when computing row norms.
+        scale (np.ndarray): int8 scale to encode with instead of fitting one on `embeddings`,
+            e.g. the scale of an index the rows are added to. Values outside its range are clipped.
+        offset (np.ndarray): int8 offset to encode with, given together with `scale`.
+
+    Returns:
+        QuantizedEmbeddings: The stored embeddings.
+    """
+    check_storage_dtype(dtype)
+    embeddings = np.atleast_2d(np.asarray(embeddings))
+    if dtype == "int8":
+        if scale is None:
+            if len(embeddings):
+                low, high = embeddings.min(axis=0), embeddings.max(axis=0)
+            else:
+                low = high = np.zeros(embeddings.shape[1], dtype=np.float32)
+            offset = ((high + low) / 2).astype(np.float32)
+            scale = np.maximum((high - low) / 254, 1e-12).astype(np.float32)
+        codes = np.empty(embeddings.shape, dtype=np.int8)
+        for start in range(0, len(embeddings), block_size):
+            block = (embeddings[start:start + block_size] - offset) / scale
+            codes[start:start + block_size] = np.clip(np.rint(block), -127, 127)
+    else:
+        scale = offset = None
+        codes = embeddings.astype(dtype)
+    quantized = QuantizedEmbeddings(codes, np.empty(len(codes), dtype=np.float32), scale, offset)
+    for start in range(0, len(codes), block_size):
+        block = quantized.dequantize(start, start + block_size)
+        quantized.sq_norms[start:start + block_size] = np.einsum("ij,ij->i", block, block)
+    return quantized
@@ -0,0 +1,398 @@
+"""
+Versioned on-disk index snapshots with atomic hot swap and rollback.
+
+A snapshot is a directory holding the vectors, chunk texts, per-chunk
+metadata and a manifest. It is written under a temporary name and renamed
+into place, so a reader never sees a partial snapshot. The `CURRENT` file
+names the live version and is replaced with `os.replace`, which is atomic.
+
+SnapshotManager serves queries from the current snapshot while a new one is
+built in the background, then swaps it in. Queries hold a reference to the
+snapshot they started on; the previous snapshot is released once its last
+query finishes, and stays on disk so the app can roll back to it.
+
+Layout:
+
+    <root>/CURRENT
+    <root>/versions/<version>/manifest.json
+    <root>/versions/<version>/vectors.npy
+    <root>/versions/<version>/chunks.json
+    <root>/versions/<version>/metadata.json
+    <root>/versions/<version>/projection.npz   (optional, see vectorstores.projection)
+    <root>/versions/<version>/quantization.npz (float16/int8 storage, see vectorstores.quantization)
+
+vectors.npy holds the vectors in the snapshot's storage dtype and is
+memory-mapped as is; for float16 and int8 the row norms, scale and offset are
+in quantization.npz.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from retrieval.search_kernels import squared_norms, squared_l2_distances, top_k
+from .projection import Projection
+from .quantization import QuantizedEmbeddings, quantize
+
+logger = logging.getLogger(__name__)
+
+def _versions_dir(root):
+    return os.path.join(root, "versions")
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def list_versions(root):
+    """
+    List the snapshot versions under a root, oldest first.
+
+    Args:
+        root (str): Snapshot root directory.
+
+    Returns:
+        list of str: Version names.
+    """
+    versions_dir = _versions_dir(root)
+    if not os.path.isdir(versions_dir):
+        return []
+    return sorted(name for name in os.listdir(versions_dir) if not name.startswith("."))
+
+def current_version(root):
+    """
+    Return the version named by the CURRENT file, or None if there is none.
+
+    Args:
+        root (str): Snapshot root directory.
+
+    Returns:
+        str: Current version name.
+    """
+    try:
+        with open(os.path.join(root, "CURRENT"), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def set_current_version(root, version):
+    """
+    Point CURRENT at a version atomically.
+
+    Args:
+        root (str): Snapshot root directory.
+        version (str): Version name.
+    """
+    if not os.path.isdir(os.path.join(_versions_dir(root), version)):
+        raise ValueError(f"Unknown snapshot version: {version}")
+    temp_path = os.path.join(root, f".CURRENT.{os.getpid()}.{threading.get_ident()}")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, os.path.join(root, "CURRENT"))
+
+def write_snapshot(root, embeddings, chunks, metadata=None, projection=None, storage_dtype="float32", **info):
+    """
+    Write a new snapshot version. The snapshot is not made current.
+
+    Args:
+        root (str): Snapshot root directory.
+        embeddings (np.ndarray): Embeddings of shape (n, dim).
+        chunks (list of str): Chunk text of each row.
+        metadata (list of dict): Optional metadata of each row.
+        projection (Projection): Optional fitted projection. Vectors are stored projected
+            and the projection is saved with the snapshot so queries are projected too.
+        storage_dtype (str): Dtype the vectors are stored and searched in, one of
+            vectorstores.quantization.STORAGE_DTYPES.
+        **info: Extra manifest fields, e.g. the embedding model name.
+
+    Returns:
+        str: Name of the new version.
+    """
+    if projection is not None:
+        embeddings = projection.transform(embeddings)
+        info["projection"] = {"method": projection.method, "dimension": projection.dimension}
+    stored = quantize(np.asarray(embeddings, dtype=np.float32), storage_dtype)
+    embeddings = stored.codes
+    if len(embeddings) != len(chunks):
+        raise ValueError("embeddings and chunks must have the same length.")
+    versions_dir = _versions_dir(root)
+    os.makedirs(versions_dir, exist_ok=True)
+    now_ns = time.time_ns()
+    version = time.strftime("%Y%m%dT%H%M%S", time.localtime(now_ns // 10**9)) + f"-{now_ns % 10**9:09d}"
+    temp_dir = os.path.join(versions_dir, f".{version}.tmp")
+    os.makedirs(temp_dir)
+    np.save(os.path.join(temp_dir, "vectors.npy"), embeddings)
+    if storage_dtype != "float32":
+        codec = {"sq_norms": stored.sq_norms}
+        if stored.scale is not None:
+            codec.update(scale=stored.scale, offset=stored.offset)
+        np.savez(os.path.join(temp_dir, "quantization.npz"), **codec)
+    if projection is not None:
+        projection.save(os.path.join(temp_dir, "projection.npz"))
+    _write_json(os.path.join(temp_dir, "chunks.json"), list(chunks))
+    _write_json(os.path.join(temp_dir, "metadata.json"), list(metadata) if metadata is not None else [None] * len(chunks))
+    _write_json(os.path.join(temp_dir, "manifest.json"), {
+        "version": version,
+        "created": time.time(),
+        "parent": current_version(root),
+        "count": int(embeddings.shape[0]),
+        "dimension": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        "storage_dtype": storage_dtype,
+        **info,
+    })
+    os.rename(temp_dir, os.path.join(versions_dir, version))
+    return version
+
+class Snapshot:
+    """
+    A loaded snapshot version. Vectors are memory-mapped from disk.
+
+    Args:
+        root (str): Snapshot root directory.
+        version (str): Version name.
+    """
+
+    def __init__(self, root, version):
+        path = os.path.join(_versions_dir(root), version)
+        self.version = version
+        self.manifest = _read_json(os.path.join(path, "manifest.json"))
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        quantization_path = os.path.join(path, "quantization.npz")
+        if os.path.exists(quantization_path):
+            # The vectors stay memory-mapped in their stored dtype; only norms, scale and offset are read.
+            with np.load(quantization_path) as codec:
+                self.sq_norms = codec["sq_norms"]
+                scale = codec["scale"] if "scale" in codec else None
+                offset = codec["offset"] if "offset" in codec else None
+            self.stored = QuantizedEmbeddings(self.vectors, self.sq_norms, scale, offset)
+        else:
+            self.stored = None
+            self.sq_norms = squared_norms(self.vectors)
+        self.chunks = _read_json(os.path.join(path, "chunks.json"))
+        self.metadata = _read_json(os.path.join(path, "metadata.json"))
+        projection_path = os.path.join(path, "projection.npz")
+        self.projection = Projection.load(projection_path) if os.path.exists(projection_path) else None
+
+    def search(self, query_embedding, k=4):
+        """
+        Return the k nearest chunks of the snapshot.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,), before any projection.
+            k (int): Number of results.
+
+        Returns:
+            list of dict: Results with "row", "distance", "text" and "metadata", nearest first.
+        """
+        return self.search_batch(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), k)[0]
+
+    def search_batch(self, query_embeddings, k=4):
+        """
+        Return the k nearest chunks for each of several queries, scored in one pass.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim), before any projection.
+            k (int): Number of results per query.
+
+        Returns:
+            list of list of dict: Results of search for each query, in query order.
+        """
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if self.projection is not None:
+            query_embeddings = self.projection.transform(query_embeddings)
+        if self.stored is not None:
+            distances = self.stored.squared_l2_distances(query_embeddings)
+        else:
+            distances = squared_l2_distances(query_embeddings, self.vectors, self.sq_norms)
+        indices, values = top_k(distances, k)
+        return [
+            [
+                {"row": row, "distance": float(distance), "text": self.chunks[row], "metadata": self.metadata[row]}
+                for row, distance in zip(rows, row_distances)
+            ]
+            for rows, row_distances in zip(indices.tolist(), values.tolist())
+        ]
+
+class SnapshotManager:
+    """
+    Serve queries from the current snapshot and hot-swap new versions.
+
+    Args:
+        root (str): Snapshot root directory. The CURRENT version, if any, is loaded.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._current = None
+        self._refcounts = {}
+        self._retired = {}
+        self._build = None
+        self.build_error = None
+        version = current_version(root)
+        if version is not None:
+            self._current = Snapshot(root, version)
+            self._refcounts[version] = 0
+
+    @property
+    def version(self):
+        """Version currently served, or None."""
+        return self._current.version if self._current is not None else None
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """
+        Hold the current snapshot for the duration of a query.
+
+        Yields:
+            Snapshot: The snapshot that was current when the query started.
+        """
+        with self._lock:
+            snapshot = self._current
+            if snapshot is None:
+                raise RuntimeError(f"No snapshot has been published under {self.root}.")
+            self._refcounts[snapshot.version] += 1
+        try:
+            yield snapshot
+        finally:
+            with self._lock:
+                self._refcounts[snapshot.version] -= 1
+                self._release_if_unused(snapshot.version)
+
+    def search(self, query_embedding, k=4):
+        """
+        Search the current snapshot.
+
+        Args:
+            query_embedding (np.ndarray): Query vector of shape (dim,).
+            k (int): Number of results.
+
+        Returns:
+            list of dict: Results of Snapshot.search.
+        """
+        with self.acquire() as snapshot:
+            return snapshot.search(query_embedding, k)
+
+    def search_batch(self, query_embeddings, k=4):
+        """
+        Search the current snapshot for several queries; all of them see the same version.
+
+        Args:
+            query_embeddings (np.ndarray): Query vectors of shape (q, dim).
+            k (int): Number of results per query.
+
+        Returns:
+            list of list of dict: Results of Snapshot.search_batch.
+        """
+        with self.acquire() as snapshot:
+            return snapshot.search_batch(query_embeddings, k)
+
+    def _release_if_unused(self, version):
+        if version in self._retired and self._refcounts[version] == 0:
+            del self._retired[version]
+            del self._refcounts[version]
+
+    def swap(self, version):
+        """
+        Make a version current. Running queries finish on the snapshot they hold.
+
+        Args:
+            version (str): Version to serve.
+        """
+        snapshot = Snapshot(self.root, version)
+        set_current_version(self.root, version)
+        with self._lock:
+            previous, self._current = self._current, snapshot
+            self._refcounts.setdefault(version, 0)
+            self._retired.pop(version, None)
+            if previous is not None and previous.version != version:
+                self._retired[previous.version] = previous
+                self._release_if_unused(previous.version)
+
+    def publish(self, embeddings, chunks, metadata=None, projection=None, storage_dtype="float32", **info):
+        """
+        Write a snapshot and swap it in. Arguments are those of write_snapshot.
+
+        Returns:
+            str: Name of the new version.
+        """
+        version = write_snapshot(self.root, embeddings, chunks, metadata, projection, storage_dtype, **info)
+        self.swap(version)
+        return version
+
+    def rebuild_async(self, build_fn):
+        """
+        Build and publish a new snapshot on a background thread.
+
+        A failed build is logged and kept in `build_error`; the current snapshot
+        keeps serving queries.
+
+        Args:
+            build_fn (callable): Function returning (embeddings, chunks, metadata).
+
+        Returns:
+            concurrent.futures.Future: Resolves to the published version, or raises the build error.
+        """
+        if self._build is not None and not self._build.done():
+            raise RuntimeError("A rebuild is already running.")
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                version = self.publish(*build_fn())
+            except Exception as e:
+                logger.exception("Snapshot rebuild under %s failed", self.root)
+                self.build_error = e
+                future.set_exception(e)
+            else:
+                self.build_error = None
+                future.set_result(version)
+
+        self._build = future
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def rollback(self):
+        """
+        Swap back to the parent of the current snapshot.
+
+        Returns:
+            str: Version now served.
+        """
+        if self._current is None or not self._current.manifest.get("parent"):
+            raise RuntimeError("There is no previous snapshot to roll back to.")
+        self.swap(self._current.manifest["parent"])
+        return self.version
+
+    def prune(self, keep=2):
+        """
+        Delete old versions from disk, keeping the newest `keep` and any in use.
+
+        Args:
+            keep (int): Number of newest versions to keep.
+
+        Returns:
+            list of str: Deleted versions.
+        """
+        with self._lock:
+            in_use = set(self._refcounts) | {self.version}
+            versions = list_versions(self.root)
+            parent = self._current.manifest.get("parent") if self._current is not None else None
+            removable = [
+                version for version in versions[:max(len(versions) - keep, 0)]
+                if version not in in_use and version != parent
+            ]
+        for version in removable:
+            shutil.rmtree(os.path.join(_versions_dir(self.root), version))
+        return removable
@@ -1,10 +1,8 @@
-from langchain.vectorstores import FAISS, Pinecone, Weaviate, Milvus, Chroma, Lance
+from langchain.vectorstores import FAISS, Pinecone, Weaviate, Milvus, Chroma
 import numpy as np
-import faiss
-import pinecone
-import weaviate
-from pymilvus import connections, utility, CollectionSchema, FieldSchema, DataType, Collection
-import chromadb
+from utils.lazy_imports import get_backend
+from .bulk_ingest import bulk_ingest, raise_for_failures
+from .lance_ingest import ingest_lance
 
 def integrate_faiss(embeddings):
     """
@@ -16,48 +14,85 @@ def integrate_faiss(embeddings):
     Returns:
         FAISS: FAISS vector store instance.
     """
+    faiss = get_backend("faiss")
     dimension = embeddings.shape[1]
     index = faiss.IndexFlatL2(dimension)
     index.add(embeddings)
     return FAISS(index)
 
-def integrate_pinecone(embeddings, namespace, api_key):
+def integrate_pinecone(embeddings, namespace, api_key, batch_size=100, max_in_flight=4):
     """
     Integrate Pinecone vector store for similarity search.
 
+    Vectors are upserted in fixed-size batches with several batches in flight.
+
     Args:
         embeddings (np.ndarray): Embeddings to index.
         namespace (str): Pinecone namespace to use.
         api_key (str): Pinecone API key.
+        batch_size (int): Number of vectors per upsert request.
+        max_in_flight (int): Maximum number of concurrent upsert requests.
 
     Returns:
         Pinecone: Pinecone vector store instance.
     """
+    pinecone = get_backend("pinecone")
     pinecone.init(api_key=api_key)
     dimension = embeddings.shape[1]
     index_name = f"{namespace}-index"
     if index_name not in pinecone.list_indexes():
         pinecone.create_index(index_name, dimension=dimension)
     index = pinecone.Index(index_name)
-    vectors = [(str(i), vector.tolist()) for i, vector in enumerate(embeddings)]
-    index.upsert(vectors)
+
+    def write_batch(ids, vectors):
+        # One tolist() per batch instead of one per row.
+        index.upsert(vectors=list(zip(ids, vectors.tolist())))
+
+    report = bulk_ingest(embeddings, write_batch, batch_size=batch_size, max_in_flight=max_in_flight)
+    raise_for_failures(report)
+    print(f"Upserted {report['vectors']} vectors to Pinecone at {report['vectors_per_second']:.0f} vectors/s")
     return Pinecone(index)
 
-def integrate_weaviate(embeddings, weaviate_client, class_name):
+def integrate_weaviate(embeddings, weaviate_client, class_name, batch_size=200, max_in_flight=4):
     """
     Integrate Weaviate vector store for similarity search.
 
+    Each batch is sent as one request to Weaviate's batch endpoint, with several
+    batches in flight. Object UUIDs are derived from the vector ids, so a retried
+    batch overwrites the objects it already wrote instead of duplicating them.
+
     Args:
         embeddings (np.ndarray): Embeddings to index.
-        weaviate_client (weaviate.Client): Weaviate client instance.
+        weaviate_client (weaviate.Client): Weaviate client instance (weaviate-client 3.x).
         class_name (str): Weaviate class name.
+        batch_size (int): Number of objects per batch request.
+        max_in_flight (int): Maximum number of concurrent batch requests.
 
     Returns:
         Weaviate: Weaviate vector store instance.
     """
-    for i, vector in enumerate(embeddings):
-        weaviate_client.batch.add_data_object({"vector": vector.tolist()}, class_name)
-    weaviate_client.batch.create_objects()
+    weaviate = get_backend("weaviate")
+
+    def write_batch(ids, vectors):
+        # A request object per batch, so concurrent batches do not share the client's buffer.
+        # The v3 client's public create_objects() only sends that shared buffer, so the request
+        # goes through Batch._create_data, which create_objects uses internally (weaviate-client 3.x).
+        request = weaviate.batch.requests.ObjectsBatchRequest()
+        for object_id, vector in zip(ids, vectors.tolist()):
+            request.add(
+                class_name=class_name,
+                data_object={},
+                uuid=weaviate.util.generate_uuid5(object_id, class_name),
+                vector=vector,
+            )
+        results = weaviate_client.batch._create_data("objects", request).json()
+        errors = [result["result"]["errors"] for result in results or [] if (result.get("result") or {}).get("errors")]
+        if errors:
+            raise RuntimeError(f"{len(errors)} objects were rejected: {errors[0]}")
+
+    report = bulk_ingest(embeddings, write_batch, batch_size=batch_size, max_in_flight=max_in_flight)
+    raise_for_failures(report)
+    print(f"Wrote {report['vectors']} vectors to Weaviate at {report['vectors_per_second']:.0f} vectors/s")
     return Weaviate(weaviate_client, class_name)
 
 def integrate_milvus(embeddings, collection_name):
@@ -71,66 +106,67 @@ def integrate_milvus(embeddings, collection_name):
     Returns:
         Milvus: Milvus vector store instance.
     """
-    connections.connect()
-    if not utility.has_collection(collection_name):
+    pymilvus = get_backend("milvus")
+    pymilvus.connections.connect()
+    if not pymilvus.utility.has_collection(collection_name):
         fields = [
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embeddings.shape[1])
+            pymilvus.FieldSchema(name="id", dtype=pymilvus.DataType.INT64, is_primary=True, auto_id=True),
+            pymilvus.FieldSchema(name="embedding", dtype=pymilvus.DataType.FLOAT_VECTOR, dim=embeddings.shape[1])
         ]
-        schema = CollectionSchema(fields)
-        collection = Collection(name=collection_name, schema=schema)
+        schema = pymilvus.CollectionSchema(fields)
+        collection = pymilvus.Collection(name=collection_name, schema=schema)
     else:
-        collection = Collection(name=collection_name)
+        collection = pymilvus.Collection(name=collection_name)
     collection.insert([embeddings])
     return Milvus(collection)
 
-def integrate_chroma(embeddings, collection_name, api_key):
+def integrate_chroma(embeddings, collection_name, api_key, batch_size=1000, max_in_flight=4):
     """
     Integrate Chroma vector store for similarity search.
 
+    Vectors are added in fixed-size batches with several batches in flight;
+    each batch is passed to Chroma as a NumPy array without per-row conversion.
+
     Args:
         embeddings (np.ndarray): Embeddings to index.
         collection_name (str): Chroma collection name.
         api_key (str): Chroma API key.
+        batch_size (int): Number of vectors per add request.
+        max_in_flight (int): Maximum number of concurrent add requests.
 
     Returns:
         Chroma: Chroma vector store instance.
     """
+    chromadb = get_backend("chroma")
     client = chromadb.Client(api_key)
     collection = client.get_or_create_collection(collection_name)
-    for i, vector in enumerate(embeddings):
-        collection.add_document(vector.tolist(), metadata={"id": str(i)})
+
+    def write_batch(ids, vectors):
+        collection.add(ids=ids, embeddings=vectors, metadatas=[{"id": i} for i in ids])
+
+    report = bulk_ingest(embeddings, write_batch, batch_size=batch_size, max_in_flight=max_in_flight)
+    raise_for_failures(report)
+    print(f"Added {report['vectors']} vectors to Chroma at {report['vectors_per_second']:.0f} vectors/s")
     return Chroma(client, collection_name)
 
-def integrate_lance(embeddings, collection_name, db_path="/tmp/lancedb"):
+def integrate_lance(embeddings, collection_name, db_path="/tmp/lancedb", build_index=False, num_partitions=256):
     """
     Integrate Lance vector store for similarity search.
 
+    Embeddings are streamed to LanceDB as Arrow record batches over the array's
+    buffer, without building one Python object per vector.
+
     Args:
         embeddings (np.ndarray): Embeddings to index.
         collection_name (str): Lance collection name.
         db_path (str): Path to the LanceDB database.
+        build_index (bool): Whether to build an IVF-PQ index after loading.
+        num_partitions (int): Number of IVF partitions of the index.
 
     Returns:
-        LanceDB: Lance vector store instance.
+        lancedb.table.Table: The Lance table, opened through the "lance" backend.
     """
-    # Connect to LanceDB
-    db = lancedb.connect(db_path)
-    
-    # Create or overwrite the collection in LanceDB
-    table = db.create_table(
-        collection_name,
-        data=[
-            {
-                "vector": embedding,
-                "id": str(i),
-            }
-            for i, embedding in enumerate(embeddings)
-        ],
-        mode="overwrite",
-    )
-    
-    return LanceDB(db, collection_name)
+    return ingest_lance(embeddings, collection_name, db_path, build_index=build_index, num_partitions=num_partitions)
 
 """
 Pros and Cons of Various Vector Stores: